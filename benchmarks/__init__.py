@@ -0,0 +1,42 @@
+"""
+Headless benchmarks for the hot paths of the app.
+
+Each bench_* module can be run on its own and exposes suite(repeat) for
+benchmarks.run, which compares all results with benchmarks/baseline.json.
+"""
+import os
+import shutil
+import tempfile
+import time
+from contextlib import contextmanager
+
+
+def best_of(repeat, func, setup=None):
+    """Schnellste von repeat Ausführungen in Millisekunden; setup() läuft jeweils ungemessen davor."""
+    best = None
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        started = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best * 1000
+
+
+@contextmanager
+def isolated_database():
+    """
+    Lenkt database.DATABASE_FILE auf eine temporäre Datei um, damit init_db()
+    und der Import von data_manager die dnd.db im Projekt nicht anfassen.
+    """
+    import database
+
+    directory = tempfile.mkdtemp(prefix="dnd_bench_")
+    original = database.DATABASE_FILE
+    database.DATABASE_FILE = os.path.join(directory, "dnd.db")
+    try:
+        yield database.DATABASE_FILE
+    finally:
+        database.DATABASE_FILE = original
+        shutil.rmtree(directory, ignore_errors=True)
@@ -0,0 +1,88 @@
+"""
+Benchmark für Charaktererstellung und Stufenaufstieg.
+
+    python -m benchmarks.bench_character [--count 20] [--repeat 5]
+
+Für jede Klasse werden count Charaktere erstellt (initialize_character)
+und von Stufe 1 auf 20 gebracht (level_up). Die Auswahl (Würfe, Zauber,
+Attributswerterhöhungen) kommt aus dem Generator und wird vorab erzeugt,
+gemessen werden nur die Methoden von Character.
+"""
+import argparse
+import copy
+import random
+import sys
+import time
+
+from benchmarks import isolated_database
+from core import dice
+
+MAX_LEVEL = 20
+RACE = "Mensch"
+
+
+def _prepare(char_class, seed):
+    """Ein Charakter direkt vor initialize_character() und seine 19 Aufstiegs-Entscheidungen."""
+    from core.character import Character
+    from core.generator import ABILITIES, _initial_choices, _level_up_choices
+
+    rng = random.Random(seed)
+    roller = dice.Roller(seed)
+    issues = []
+    character = Character(f"Bench {seed}", RACE, char_class)
+    for ability in ABILITIES:
+        character.base_abilities[ability] = roller.total("4d6kh3")
+    character.update_race_bonuses_and_speed()
+    character.collect_proficiencies_and_languages()
+    character.chosen_skills = _initial_choices(character, rng, issues)
+    snapshot = copy.deepcopy(character)
+
+    # Die Entscheidungen hängen vom Zustand ab; einmal durchspielen und merken.
+    character.initialize_character()
+    history = []
+    while character.level < MAX_LEVEL:
+        choices = _level_up_choices(character, rng, roller, issues)
+        history.append(choices)
+        character.level_up(choices)
+    return snapshot, history
+
+
+def run(classes, count, repeat):
+    prepared = [_prepare(char_class, seed) for char_class in classes for seed in range(count)]
+    best_init = best_level = None
+    for _ in range(repeat):
+        characters = [copy.deepcopy(snapshot) for snapshot, _ in prepared]
+        started = time.perf_counter()
+        for character in characters:
+            character.initialize_character()
+        init_ms = (time.perf_counter() - started) * 1000
+
+        started = time.perf_counter()
+        for character, (_, history) in zip(characters, prepared):
+            for choices in history:
+                character.level_up(choices)
+        level_ms = (time.perf_counter() - started) * 1000
+        best_init = init_ms if best_init is None else min(best_init, init_ms)
+        best_level = level_ms if best_level is None else min(best_level, level_ms)
+    return {"character.initialize_ms": best_init, "character.level_up_1_to_20_ms": best_level}
+
+
+def suite(repeat=5, count=20):
+    with isolated_database():
+        from data_manager import CLASS_DATA
+
+        return run(sorted(CLASS_DATA), count, repeat)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark für Charaktererstellung und Stufenaufstieg")
+    parser.add_argument("--count", type=int, default=20, help="Charaktere je Klasse")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args(argv)
+    for key, value in suite(args.repeat, args.count).items():
+        print(f"  {key:32} {value:.2f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
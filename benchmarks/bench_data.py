@@ -0,0 +1,69 @@
+"""
+Benchmark für das Laden der Spieldaten.
+
+    python -m benchmarks.bench_data [--repeat 5]
+
+Misst init_db() beim Neuaufbau der Referenztabellen aus data/*.json und
+bei unveränderten Daten, get_data_from_db() und den Import von
+data_manager in einem frischen Interpreter, also alles, was vor dem ersten Screen passiert. Alle Läufe
+arbeiten auf einer temporären Datenbank.
+"""
+import argparse
+import contextlib
+import io
+import os
+import subprocess
+import sys
+
+from benchmarks import best_of, isolated_database
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Läuft im Kindprozess: misst nur den Import, nicht den Interpreterstart.
+IMPORT_SCRIPT = """
+import sys, time
+import database
+database.DATABASE_FILE = sys.argv[1]
+started = time.perf_counter()
+import data_manager
+print((time.perf_counter() - started) * 1000)
+"""
+
+
+def time_import(db_path):
+    output = subprocess.run([sys.executable, "-c", IMPORT_SCRIPT, db_path], cwd=PROJECT_DIR,
+                            capture_output=True, text=True, check=True).stdout
+    return float(output.strip().splitlines()[-1])
+
+
+def _quiet_init_db(force=True):
+    import database
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        database.init_db(force)
+
+
+def suite(repeat=5):
+    import database
+
+    with isolated_database() as db_path:
+        results = {
+            "data.init_db_ms": best_of(repeat, _quiet_init_db),
+            "data.init_db_unchanged_ms": best_of(repeat, lambda: _quiet_init_db(force=False)),
+            "data.get_data_from_db_ms": best_of(repeat, database.get_data_from_db),
+        }
+        results["data.import_data_manager_ms"] = min(time_import(db_path) for _ in range(repeat))
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark für das Laden der Spieldaten")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args(argv)
+    for key, value in suite(args.repeat).items():
+        print(f"  {key:32} {value:.2f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
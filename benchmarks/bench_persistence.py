@@ -0,0 +1,77 @@
+"""
+Benchmark für das Speichern und Laden von .char-Dateien.
+
+    python -m benchmarks.bench_persistence [--repeat 5]
+
+Speichert 1, 100 und 1000 Charaktere der Stufe 10 wie der Charakterbogen
+(pickle.dump je Datei) und lädt sie wie das Lade-Popup wieder (Verzeichnis
+auflisten, pickle.load je Datei).
+"""
+import argparse
+import os
+import pickle
+import shutil
+import sys
+import tempfile
+
+from benchmarks import best_of, isolated_database
+
+COUNTS = (1, 100, 1000)
+
+
+def _characters(count):
+    from core.generator import CharacterSpec, generate_character
+
+    classes = ("Magier", "Kämpfer", "Kleriker", "Barde")
+    templates = [generate_character(CharacterSpec("Mensch", char_class, 10, seed=i))
+                 for i, char_class in enumerate(classes)]
+    return [templates[i % len(templates)] for i in range(count)]
+
+
+def save_all(characters, directory):
+    for i, character in enumerate(characters):
+        with open(os.path.join(directory, f"held_{i}.char"), "wb") as f:
+            pickle.dump(character, f)
+
+
+def load_all(directory):
+    characters = []
+    for filename in sorted(os.listdir(directory)):
+        if filename.endswith(".char"):
+            with open(os.path.join(directory, filename), "rb") as f:
+                characters.append(pickle.load(f))
+    return characters
+
+
+def run(counts, repeat):
+    results = {}
+    directory = tempfile.mkdtemp(prefix="dnd_bench_chars_")
+    try:
+        for count in counts:
+            characters = _characters(count)
+            # Wie beim erneuten Speichern im Charakterbogen: vorhandene Dateien überschreiben.
+            results[f"persistence.save_{count}_ms"] = best_of(repeat, lambda: save_all(characters, directory))
+            results[f"persistence.load_{count}_ms"] = best_of(repeat, lambda: load_all(directory))
+            for filename in os.listdir(directory):
+                os.remove(os.path.join(directory, filename))
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+    return results
+
+
+def suite(repeat=5, counts=COUNTS):
+    with isolated_database():
+        return run(counts, repeat)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark für .char-Dateien")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args(argv)
+    for key, value in suite(args.repeat).items():
+        print(f"  {key:32} {value:.2f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
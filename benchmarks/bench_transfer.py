@@ -0,0 +1,77 @@
+"""
+Benchmark für das Übertragungsprotokoll über Loopback.
+
+    python -m benchmarks.bench_transfer [--repeat 3]
+
+Ein FileSender und ein FileReceiver übertragen zwanzig kleine .char-Dateien
+und eine große Datei (4 MB) über 127.0.0.1, einschließlich Manifest,
+Prüfsummen und Umbenennen der .part-Dateien.
+"""
+import argparse
+import os
+import random
+import shutil
+import sys
+import tempfile
+import threading
+
+from benchmarks import best_of
+from utils.transfer import FileReceiver, FileSender
+
+SMALL_FILES = 20
+SMALL_SIZE = 8 * 1024
+LARGE_SIZE = 4 * 1024 * 1024
+
+
+def _make_files(directory, seed=0):
+    rng = random.Random(seed)
+    sizes = [SMALL_SIZE] * SMALL_FILES + [LARGE_SIZE]
+    paths = []
+    for i, size in enumerate(sizes):
+        path = os.path.join(directory, f"held_{i}.char")
+        with open(path, "wb") as f:
+            f.write(rng.randbytes(size))
+        paths.append(path)
+    return paths
+
+
+def transfer(paths, dest_dir):
+    sender = FileSender(paths, host="127.0.0.1", idle_timeout=10)
+    thread = threading.Thread(target=sender.serve, daemon=True)
+    thread.start()
+    try:
+        received = FileReceiver("127.0.0.1", sender.port, dest_dir=dest_dir, retries=0).run()
+    finally:
+        thread.join(timeout=10)
+        sender.stop()
+    if len(received) != len(paths):
+        raise RuntimeError(f"Nur {len(received)} von {len(paths)} Dateien empfangen")
+
+
+def suite(repeat=3):
+    root = tempfile.mkdtemp(prefix="dnd_bench_transfer_")
+    try:
+        src_dir, dst_dir = os.path.join(root, "src"), os.path.join(root, "dst")
+        os.mkdir(src_dir)
+        paths = _make_files(src_dir)
+
+        def clear():
+            shutil.rmtree(dst_dir, ignore_errors=True)
+            os.mkdir(dst_dir)
+
+        return {"transfer.loopback_batch_ms": best_of(repeat, lambda: transfer(paths, dst_dir), clear)}
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark für das Übertragungsprotokoll")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args(argv)
+    for key, value in suite(args.repeat).items():
+        print(f"  {key:32} {value:.2f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,83 @@
+"""
+Benchmark für Sichtlinien und Nebel.
+
+    python -m benchmarks.bench_visibility [--viewers 8] [--repeat 5]
+
+Misst auf 100x100 und 300x300 Karten (zufällige Wände, Sichtweite
+unbegrenzt und 24 Felder): erste Berechnung für alle Figuren, eine
+bewegte Figur, eine umgeschaltete Tür sowie Nebel-Update und -Paket.
+"""
+import argparse
+import sys
+
+import numpy as np
+
+from benchmarks import best_of
+from core.battle_map import BattleMap
+from core.visibility import VisibilityEngine
+
+
+def _random_map(size, rng, wall_ratio=0.12):
+    battle_map = BattleMap(size, size)
+    battle_map.tiles[:] = (rng.random((size, size)) < wall_ratio).astype(np.uint8)
+    return battle_map
+
+
+def run(size, viewers, radius, repeat, seed=0):
+    rng = np.random.default_rng(seed)
+    battle_map = _random_map(size, rng)
+    floor = np.argwhere(battle_map.tiles == 0)
+    positions = [tuple(int(v) for v in floor[i]) for i in rng.choice(len(floor), viewers + 1, replace=False)]
+    door = positions.pop()
+    battle_map.set_tile(door[0], door[1], "Door")
+    ids = [f"v{i}" for i in range(viewers)]
+
+    def initial():
+        engine = VisibilityEngine(battle_map)
+        engine.set_viewers({vid: (pos, radius) for vid, pos in zip(ids, positions)})
+        return engine
+
+    results = {"initial_ms": best_of(repeat, initial)}
+    engine = initial()
+
+    def move_one():
+        origin, _ = engine.viewers[ids[0]]
+        target = positions[1] if origin == positions[0] else positions[0]
+        engine.set_viewer(ids[0], target, radius)
+
+    results["move_one_ms"] = best_of(repeat, move_one)
+    results["door_toggle_ms"] = best_of(repeat, lambda: engine.toggle_door(*door))
+
+    def fog():
+        engine.update_fog("client", ids)
+        return engine.fog_packet("client")
+
+    results["fog_update_ms"] = best_of(repeat, fog)
+    results["fog_packet_bytes"] = len(fog())
+    return results
+
+
+def suite(repeat=5):
+    """Kleine Karte mit Sichtweite für benchmarks.run: nur Zeiten in ms."""
+    results = run(100, 8, 24, repeat)
+    return {f"visibility.{key}": value for key, value in results.items() if key.endswith("_ms")}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark für Sichtlinien und Nebel")
+    parser.add_argument("--viewers", type=int, default=8)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    for size in (100, 300):
+        for radius in (None, 24):
+            results = run(size, args.viewers, radius, args.repeat)
+            label = f"{size}x{size}, Sichtweite {radius or 'unbegrenzt'}"
+            print(label)
+            for key, value in results.items():
+                print(f"  {key:18} {value:.2f}" if isinstance(value, float) else f"  {key:18} {value}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
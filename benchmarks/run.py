@@ -0,0 +1,118 @@
+"""
+Runs all benchmark suites and compares them with benchmarks/baseline.json.
+
+    python -m benchmarks.run                     # compare, exit code 1 on regression
+    python -m benchmarks.run --update-baseline   # store the current numbers
+    python -m benchmarks.run --only data character --threshold 0.3
+
+Every value is the best of --repeat runs in milliseconds. A value counts as a
+regression when it is more than --threshold (relative) and --min-ms
+(absolute) slower than the baseline; suites with a suspected regression are
+measured once more and the faster value counts, so one noisy run does not
+fail the build. Baselines depend on the machine, so
+update them on the machine that runs the comparison and commit the file.
+"""
+import argparse
+import importlib
+import json
+import os
+import platform
+import sys
+import time
+
+SUITES = ("data", "character", "persistence", "transfer", "visibility")
+BASELINE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+DEFAULT_THRESHOLD = 0.5
+DEFAULT_MIN_MS = 2.0
+
+
+def machine_info():
+    return {"python": platform.python_version(), "platform": platform.platform(),
+            "machine": platform.machine(), "cpus": os.cpu_count()}
+
+
+def run_suites(names=SUITES, repeat=5):
+    results = {}
+    for name in names:
+        module = importlib.import_module(f"benchmarks.bench_{name}")
+        started = time.perf_counter()
+        results.update(module.suite(repeat))
+        print(f"{name}: {time.perf_counter() - started:.1f} s")
+    return results
+
+
+def compare(baseline, current, threshold=DEFAULT_THRESHOLD, min_ms=DEFAULT_MIN_MS):
+    """(name, vorher, jetzt) für jede Messung, die deutlich langsamer wurde; langsamste zuerst."""
+    regressions = []
+    for name, ms in current.items():
+        before = baseline.get(name)
+        if before is not None and ms - before > min_ms and ms > before * (1 + threshold):
+            regressions.append((name, before, ms))
+    return sorted(regressions, key=lambda item: item[1] / item[2])
+
+
+def load_baseline(path=BASELINE_FILE):
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_baseline(results, repeat, path=BASELINE_FILE, previous=None):
+    merged = dict(previous["results"]) if previous else {}
+    merged.update({name: round(ms, 3) for name, ms in results.items()})
+    baseline = {"machine": machine_info(), "repeat": repeat, "results": dict(sorted(merged.items()))}
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(baseline, f, indent=2)
+        f.write("\n")
+    os.replace(tmp_path, path)
+
+
+def format_table(baseline, current):
+    lines = [f"{'Messung':36} {'Basis':>10} {'Jetzt':>10} {'Änderung':>9}"]
+    for name, ms in current.items():
+        before = baseline.get(name)
+        change = f"{(ms / before - 1) * 100:+8.0f}%" if before else "      neu"
+        lines.append(f"{name:36} {before if before is not None else float('nan'):10.2f} {ms:10.2f} {change}")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmarks ausführen und mit der Basis vergleichen")
+    parser.add_argument("--only", nargs="+", choices=SUITES, default=list(SUITES))
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD, help="Erlaubte relative Verlangsamung")
+    parser.add_argument("--min-ms", type=float, default=DEFAULT_MIN_MS, help="Kleinere Unterschiede ignorieren")
+    parser.add_argument("--baseline", default=BASELINE_FILE)
+    parser.add_argument("--update-baseline", action="store_true")
+    args = parser.parse_args(argv)
+
+    current = run_suites(args.only, args.repeat)
+    stored = load_baseline(args.baseline)
+    if args.update_baseline:
+        save_baseline(current, args.repeat, args.baseline, stored)
+        print(f"Basis gespeichert in {args.baseline}")
+        return 0
+    if stored is None:
+        print(f"Keine Basis in {args.baseline}; zuerst mit --update-baseline anlegen.")
+        return 2
+
+    regressions = compare(stored["results"], current, args.threshold, args.min_ms)
+    suspects = [name for name in args.only if any(r[0].startswith(f"{name}.") for r in regressions)]
+    if suspects:
+        print(f"Verdacht auf Verlangsamung, miss erneut: {', '.join(suspects)}")
+        for name, ms in run_suites(suspects, args.repeat).items():
+            current[name] = min(current[name], ms)
+        regressions = compare(stored["results"], current, args.threshold, args.min_ms)
+
+    print(format_table(stored["results"], current))
+    if stored.get("machine", {}).get("platform") != machine_info()["platform"]:
+        print("Hinweis: Die Basis wurde auf einem anderen System gemessen.")
+    for name, before, after in regressions:
+        print(f"LANGSAMER  {name}: {before:.2f} -> {after:.2f} ms")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
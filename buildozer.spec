@@ -3,9 +3,9 @@ title = DnDApp
 package.name = dndapp
 package.domain = org.example
 source.dir = .
-source.include_exts = py,png,jpg,kv,db,json,txt,enemies,session,char
+source.include_exts = py,png,jpg,kv,db,json,jsonl,txt,enemies,session,char
 version = 0.1
-requirements = python3,kivy,zeroconf
+requirements = python3,kivy,zeroconf,numpy
 orientation = landscape
 fullscreen = 1
 android.accept_licenses = True
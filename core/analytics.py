@@ -0,0 +1,228 @@
+"""
+Schadensanalyse für Waffen und Zauber.
+
+Alle Verteilungen sind exakt (aus core.dice) und berücksichtigen Fehlschläge
+(Schaden 0), kritische Treffer bei einer natürlichen 20 (doppelte Würfel)
+und Fehlschläge bei einer natürlichen 1. Ergebnisse werden je
+(Würfel, Schadensbonus, Angriffsbonus, RK) zwischengespeichert, so dass
+der Charakterbogen den Erwartungswert beim Waffenwechsel sofort anzeigen
+und der DM alle Waffen in einem Aufruf vergleichen kann.
+
+Annahme: Der Charakter ist mit jeder Waffe geübt, da der Bogen keine
+Waffenkategorien kennt.
+"""
+import re
+from functools import lru_cache
+
+import numpy as np
+
+from core.dice import parse
+
+DEFAULT_TARGET_AC = 13
+DEFAULT_SAVE_BONUS = 2
+PERCENTILES = (10, 25, 50, 75, 90)
+
+SPELLCASTING_ABILITY = {
+    "Magier": "Intelligenz",
+    "Kleriker": "Weisheit",
+    "Druide": "Weisheit",
+    "Waldläufer": "Weisheit",
+    "Barde": "Charisma",
+    "Hexenmeister": "Charisma",
+    "Paktmagier": "Charisma",
+    "Paladin": "Charisma",
+}
+
+_SPELL_DAMAGE = re.compile(r"(\d+)W(\d+)(?:\s*\+\s*(\d+))?\s+(?:\w+\s+)?\w*[Ss]chaden")
+_UPCAST = re.compile(r"um (\d+)W(\d+) für jeden (?:Zauberplatzgrad|Grad)")
+_CANTRIP_STEPS = ((17, 4), (11, 3), (5, 2))
+
+
+class DamageStats:
+    """Kennzahlen einer Schadensverteilung pro Angriff bzw. Zauber."""
+
+    def __init__(self, probs, hit_chance, crit_chance):
+        self.probs = probs
+        self.probs.setflags(write=False)
+        self.hit_chance = hit_chance
+        self.crit_chance = crit_chance
+        values = np.arange(len(probs))
+        self.mean = float(np.dot(values, probs))
+        self.variance = float(np.dot((values - self.mean) ** 2, probs))
+        self.maximum = int(np.flatnonzero(probs)[-1]) if probs.any() else 0
+        cdf = np.cumsum(probs)
+        self.percentiles = {p: int(np.searchsorted(cdf, p / 100 - 1e-12)) for p in PERCENTILES}
+
+    @property
+    def std(self):
+        return self.variance ** 0.5
+
+    def probability_at_least(self, damage):
+        return float(self.probs[max(0, damage):].sum())
+
+    def summary(self):
+        return f"Ø {self.mean:.1f} Schaden (Treffer {self.hit_chance * 100:.0f}%)"
+
+
+def hit_chance(attack_bonus, armor_class):
+    """Trefferchance mit natürlicher 1 (immer daneben) und 20 (immer Treffer)."""
+    hits = sum(1 for d20 in range(2, 20) if d20 + attack_bonus >= armor_class)
+    return (hits + 1) / 20
+
+
+def _shifted(expression_text, bonus, minimum):
+    low, probs = parse(expression_text).distribution_array()
+    low += bonus
+    out = np.zeros(max(minimum, low + len(probs) - 1) + 1)
+    for i, p in enumerate(probs):
+        out[max(minimum, low + i)] += p
+    return out
+
+
+def _mix(parts):
+    width = max(len(values) for _, values in parts)
+    total = np.zeros(width)
+    for weight, values in parts:
+        total[:len(values)] += weight * values
+    return total
+
+
+@lru_cache(maxsize=4096)
+def attack_stats(damage, damage_bonus, attack_bonus, armor_class):
+    """Schaden pro Angriffswurf; Treffer machen wie auf dem Bogen mindestens 1 Schaden."""
+    crit = 1 / 20
+    normal = hit_chance(attack_bonus, armor_class) - crit
+    miss = 1 - normal - crit
+    critical_text = str(parse(damage).critical())
+    probs = _mix([
+        (miss, np.array([1.0])),
+        (normal, _shifted(damage, damage_bonus, 1)),
+        (crit, _shifted(critical_text, damage_bonus, 1)),
+    ])
+    return DamageStats(probs, normal + crit, crit)
+
+
+@lru_cache(maxsize=4096)
+def save_stats(damage, damage_bonus, save_dc, save_bonus, half_on_success):
+    """Schaden eines Rettungswurf-Zaubers (ohne kritische Treffer)."""
+    fail = min(1.0, max(0.0, (save_dc - 1 - save_bonus) / 20))
+    full = _shifted(damage, damage_bonus, 0)
+    parts = [(fail, full)]
+    if half_on_success:
+        half = np.zeros(len(full) // 2 + 1)
+        for value, p in enumerate(full):
+            half[value // 2] += p
+        parts.append((1 - fail, half))
+    else:
+        parts.append((1 - fail, np.array([1.0])))
+    return DamageStats(_mix(parts), fail, 0.0)
+
+
+@lru_cache(maxsize=4096)
+def auto_hit_stats(damage, damage_bonus):
+    return DamageStats(_shifted(damage, damage_bonus, 0), 1.0, 0.0)
+
+
+def ability_modifier(character, ability):
+    return (character.abilities.get(ability, 10) - 10) // 2
+
+
+# --- Waffen ---
+
+def weapon_stats(character, weapon_name, armor_class=DEFAULT_TARGET_AC, weapon_data=None):
+    if weapon_data is None:
+        from data_manager import WEAPON_DATA as weapon_data
+    weapon = weapon_data.get(weapon_name, weapon_data["Unbewaffneter Schlag"])
+    modifier = ability_modifier(character, weapon["ability"])
+    return attack_stats(weapon["damage"], modifier, character.get_proficiency_bonus() + modifier, armor_class)
+
+
+def weapon_table(character, armor_class=DEFAULT_TARGET_AC, weapon_data=None):
+    """Alle Waffen im Vergleich, sortiert nach Erwartungsschaden (absteigend)."""
+    if weapon_data is None:
+        from data_manager import WEAPON_DATA as weapon_data
+    rows = []
+    for name, weapon in weapon_data.items():
+        stats = weapon_stats(character, name, armor_class, weapon_data)
+        rows.append({
+            "name": name,
+            "damage": weapon["damage"],
+            "ability": weapon["ability"],
+            "hit_chance": stats.hit_chance,
+            "mean": stats.mean,
+            "std": stats.std,
+            "percentiles": stats.percentiles,
+            "max": stats.maximum,
+        })
+    rows.sort(key=lambda row: (-row["mean"], row["name"]))
+    return rows
+
+
+# --- Zauber ---
+
+class SpellDamage:
+    """Aus der Zauberbeschreibung gelesene Schadenswürfel."""
+
+    def __init__(self, dice, kind, half_on_success=False, upcast=None, cantrip_scaling=False):
+        self.dice = dice
+        self.kind = kind  # "attack", "save" oder "auto"
+        self.half_on_success = half_on_success
+        self.upcast = upcast
+        self.cantrip_scaling = cantrip_scaling
+
+    def dice_for(self, spell_level, slot_level=None, character_level=1):
+        match = re.match(r"(\d+)W(\d+)(.*)", self.dice)
+        count, sides, rest = int(match.group(1)), int(match.group(2)), match.group(3)
+        if spell_level == 0 and self.cantrip_scaling:
+            count *= next((factor for level, factor in _CANTRIP_STEPS if character_level >= level), 1)
+        text = f"{count}W{sides}{rest}"
+        if self.upcast and slot_level and slot_level > spell_level:
+            extra_count, extra_sides = self.upcast
+            text += f"+{extra_count * (slot_level - spell_level)}W{extra_sides}"
+        return text
+
+
+@lru_cache(maxsize=1024)
+def parse_spell_damage(description):
+    """Liest den ersten Schadenswurf aus einer (deutschen) Zauberbeschreibung oder None."""
+    match = _SPELL_DAMAGE.search(description)
+    if not match:
+        return None
+    count, sides, constant = match.groups()[:3]
+    dice = f"{count}W{sides}" + (f"+{constant}" if constant else "")
+    lowered = description.lower()
+    if "zauberangriff" in lowered:
+        kind = "attack"
+    elif "rettungswurf" in lowered:
+        kind = "save"
+    else:
+        kind = "auto"
+    half = kind == "save" and re.search(r"\bhalb\b|\bhälfte\b", lowered) is not None
+    upcast = _UPCAST.search(description)
+    return SpellDamage(
+        dice, kind, half,
+        (int(upcast.group(1)), int(upcast.group(2))) if upcast else None,
+        "5. stufe" in lowered and "11. stufe" in lowered,
+    )
+
+
+def spell_stats(character, spell_name, armor_class=DEFAULT_TARGET_AC, save_bonus=DEFAULT_SAVE_BONUS,
+                slot_level=None, spell_data=None):
+    """Schaden eines Zaubers für diesen Charakter oder None, wenn kein Schadenswurf erkannt wird."""
+    if spell_data is None:
+        from data_manager import SPELL_DATA as spell_data
+    spell = spell_data.get(spell_name)
+    if not spell:
+        return None
+    damage = parse_spell_damage(spell.get("desc", ""))
+    if damage is None:
+        return None
+    dice = damage.dice_for(spell.get("level", 0), slot_level, character.level)
+    ability = SPELLCASTING_ABILITY.get(character.char_class, "Intelligenz")
+    modifier = ability_modifier(character, ability)
+    proficiency = character.get_proficiency_bonus()
+    if damage.kind == "attack":
+        return attack_stats(dice, 0, proficiency + modifier, armor_class)
+    if damage.kind == "save":
+        return save_stats(dice, 0, 8 + proficiency + modifier, save_bonus, damage.half_on_success)
+    return auto_hit_stats(dice, 0)
@@ -0,0 +1,268 @@
+"""
+Kampfkarten als NumPy-Raster.
+
+Jede Kachel ist ein uint8-Code aus einer Palette (Floor, Wall, Door, ...),
+Objekte (Gegner, Truhen, ...) liegen dünn besetzt in einem Dictionary
+{(zeile, spalte): name}. Gespeichert wird im Binärformat .dmap:
+
+    b"DMAP" | version u8 | rows u32 | cols u32
+    palette: anzahl u8, je Eintrag länge u8 + utf-8
+    tiles:   encoding u8 (0 = roh, 1 = RLE), länge u32, daten
+    objects: länge u32, JSON [[zeile, spalte, name], ...]
+
+Das RLE speichert abwechselnd Läufe als (werte uint8[n], längen uint32[n]).
+Ältere Karten im JSON-Format mit Schlüsseln wie "(0, 0)" lassen sich mit
+from_legacy_json() bzw. convert_legacy_file() übernehmen.
+"""
+import json
+import os
+import struct
+import sys
+
+import numpy as np
+
+MAGIC = b"DMAP"
+FORMAT_VERSION = 1
+DEFAULT_PALETTE = ("Floor", "Wall", "Door")
+PASSABLE_TYPES = {"Floor", "Door", "OpenDoor"}
+MAP_EXTENSION = ".dmap"
+
+_HEADER = struct.Struct("<4sBII")
+_U32 = struct.Struct("<I")
+ENCODING_RAW = 0
+ENCODING_RLE = 1
+
+
+class MapFormatError(ValueError):
+    pass
+
+
+class BattleMap:
+    """Raster aus Kachelcodes plus dünn besetzte Objektebene."""
+
+    def __init__(self, rows, cols, palette=DEFAULT_PALETTE, tiles=None, objects=None):
+        self.rows = rows
+        self.cols = cols
+        self.palette = list(palette)
+        self._codes = {name: code for code, name in enumerate(self.palette)}
+        if tiles is None:
+            tiles = np.zeros((rows, cols), dtype=np.uint8)
+        self.tiles = tiles
+        self.objects = dict(objects or {})
+        self._passable_codes = None
+
+    # --- Kacheln ---
+
+    def in_bounds(self, row, col):
+        return 0 <= row < self.rows and 0 <= col < self.cols
+
+    def code_for(self, tile_type):
+        """Code einer Kachelart; neue Arten werden an die Palette angehängt."""
+        code = self._codes.get(tile_type)
+        if code is None:
+            # Anzahl und Namenslängen werden in der Datei als je ein Byte gespeichert.
+            if len(self.palette) >= 255:
+                raise MapFormatError("Zu viele verschiedene Kachelarten")
+            if len(tile_type.encode("utf-8")) > 255:
+                raise MapFormatError(f"Name der Kachelart zu lang: {tile_type[:20]}...")
+            code = len(self.palette)
+            self.palette.append(tile_type)
+            self._codes[tile_type] = code
+            self._passable_codes = None
+        return code
+
+    def tile_type(self, row, col):
+        return self.palette[self.tiles[row, col]]
+
+    def set_tile(self, row, col, tile_type):
+        self.tiles[row, col] = self.code_for(tile_type)
+
+    def fill(self, tile_type, rows=slice(None), cols=slice(None)):
+        self.tiles[rows, cols] = self.code_for(tile_type)
+
+    def passable_mask(self):
+        """Boolesches Raster: Kachelart ist begehbar (Objekte werden nicht berücksichtigt)."""
+        if self._passable_codes is None:
+            lookup = np.zeros(256, dtype=bool)
+            for name, code in self._codes.items():
+                lookup[code] = name in PASSABLE_TYPES
+            self._passable_codes = lookup
+        return self._passable_codes[self.tiles]
+
+    def is_passable(self, row, col):
+        return self.in_bounds(row, col) and self.palette[self.tiles[row, col]] in PASSABLE_TYPES
+
+    # --- Objekte ---
+
+    def object_at(self, row, col):
+        return self.objects.get((row, col))
+
+    def set_object(self, row, col, name):
+        if name:
+            self.objects[(row, col)] = name
+        else:
+            self.objects.pop((row, col), None)
+
+    def move_object(self, source, target):
+        name = self.objects.pop(source, None)
+        if name is not None:
+            self.objects[target] = name
+        return name
+
+    # --- Trefferprüfung ---
+
+    def hit_test(self, x, y, tile_size, origin=(0, 0)):
+        """Rechnet eine Bildschirmposition in (zeile, spalte) um; Zeile 0 liegt oben."""
+        col = int((x - origin[0]) // tile_size)
+        row = self.rows - 1 - int((y - origin[1]) // tile_size)
+        if not self.in_bounds(row, col):
+            return None
+        return row, col
+
+    # --- Serialisierung ---
+
+    def to_bytes(self):
+        out = bytearray(_HEADER.pack(MAGIC, FORMAT_VERSION, self.rows, self.cols))
+        out.append(len(self.palette))
+        for name in self.palette:
+            encoded = name.encode("utf-8")
+            out.append(len(encoded))
+            out += encoded
+
+        raw = self.tiles.tobytes()
+        rle = _rle_encode(self.tiles)
+        encoding, payload = (ENCODING_RLE, rle) if len(rle) < len(raw) else (ENCODING_RAW, raw)
+        out.append(encoding)
+        out += _U32.pack(len(payload))
+        out += payload
+
+        objects = json.dumps([[r, c, name] for (r, c), name in sorted(self.objects.items())],
+                             ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        out += _U32.pack(len(objects))
+        out += objects
+        return bytes(out)
+
+    @classmethod
+    def from_bytes(cls, data):
+        view = memoryview(data)
+        if len(view) < _HEADER.size:
+            raise MapFormatError("Datei zu kurz")
+        magic, version, rows, cols = _HEADER.unpack_from(view, 0)
+        if magic != MAGIC:
+            raise MapFormatError("Keine DMAP-Datei")
+        if version > FORMAT_VERSION:
+            raise MapFormatError(f"Unbekannte Kartenversion {version}")
+        offset = _HEADER.size
+
+        def need(size):
+            if offset + size > len(view):
+                raise MapFormatError("Datei zu kurz")
+
+        palette = []
+        need(1)
+        count = view[offset]
+        offset += 1
+        for _ in range(count):
+            need(1)
+            size = view[offset]
+            need(1 + size)
+            palette.append(bytes(view[offset + 1:offset + 1 + size]).decode("utf-8"))
+            offset += 1 + size
+
+        need(1 + _U32.size)
+        encoding = view[offset]
+        (size,) = _U32.unpack_from(view, offset + 1)
+        offset += 1 + _U32.size
+        need(size)
+        payload = view[offset:offset + size]
+        offset += size
+        if encoding == ENCODING_RLE:
+            flat = _rle_decode(payload, rows * cols)
+        elif encoding == ENCODING_RAW:
+            flat = np.frombuffer(payload, dtype=np.uint8).copy()
+        else:
+            raise MapFormatError(f"Unbekannte Kodierung {encoding}")
+        if flat.size != rows * cols:
+            raise MapFormatError("Kachelanzahl passt nicht zur Kartengröße")
+
+        need(_U32.size)
+        (size,) = _U32.unpack_from(view, offset)
+        offset += _U32.size
+        need(size)
+        objects = {(r, c): name for r, c, name in json.loads(bytes(view[offset:offset + size]).decode("utf-8"))}
+        return cls(rows, cols, palette, flat.reshape(rows, cols), objects)
+
+    def save(self, path):
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(self.to_bytes())
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def from_legacy_json(cls, data):
+        """Übernimmt das alte Format {"rows", "cols", "tiles": {"(r, c)": {"type", "object"}}}."""
+        battle_map = cls(int(data["rows"]), int(data["cols"]))
+        for key, tile in data.get("tiles", {}).items():
+            row, col = (int(part) for part in key.strip("()").split(","))
+            if not battle_map.in_bounds(row, col):
+                continue
+            battle_map.set_tile(row, col, tile.get("type") or "Floor")
+            battle_map.set_object(row, col, tile.get("object"))
+        return battle_map
+
+    def to_legacy_json(self):
+        """Exportiert ins alte JSON-Format (z.B. für ältere App-Versionen)."""
+        return {
+            "rows": self.rows,
+            "cols": self.cols,
+            "tiles": {
+                f"({r}, {c})": {"type": self.tile_type(r, c), "object": self.objects.get((r, c))}
+                for r in range(self.rows) for c in range(self.cols)
+            },
+        }
+
+
+def _rle_encode(tiles):
+    flat = tiles.ravel()
+    if flat.size == 0:
+        return b""
+    starts = np.concatenate(([0], np.flatnonzero(flat[1:] != flat[:-1]) + 1))
+    lengths = np.diff(np.append(starts, flat.size)).astype("<u4")
+    return flat[starts].tobytes() + lengths.tobytes()
+
+
+def _rle_decode(payload, size):
+    if len(payload) % 5:
+        raise MapFormatError("Beschädigte Kacheldaten")
+    count = len(payload) // 5
+    values = np.frombuffer(payload, dtype=np.uint8, count=count)
+    lengths = np.frombuffer(payload, dtype="<u4", count=count, offset=count)
+    if int(lengths.sum(dtype=np.int64)) != size:
+        raise MapFormatError("Kachelanzahl passt nicht zur Kartengröße")
+    return np.repeat(values, lengths)
+
+
+def load_map(path):
+    """Lädt eine .dmap-Datei oder eine Karte im alten JSON-Format."""
+    with open(path, "rb") as f:
+        data = f.read()
+    if data[:len(MAGIC)] == MAGIC:
+        return BattleMap.from_bytes(data)
+    try:
+        return BattleMap.from_legacy_json(json.loads(data.decode("utf-8")))
+    except (ValueError, KeyError, AttributeError) as e:
+        raise MapFormatError(f"Unbekanntes Kartenformat: {path}") from e
+
+
+def convert_legacy_file(source, target=None):
+    """Konvertiert eine JSON-Karte nach .dmap und gibt den Zielpfad zurück."""
+    if target is None:
+        target = os.path.splitext(source)[0] + MAP_EXTENSION
+    load_map(source).save(target)
+    return target
+
+
+if __name__ == "__main__":
+    for source in sys.argv[1:]:
+        target = convert_legacy_file(source)
+        print(f"{source} ({os.path.getsize(source)} B) -> {target} ({os.path.getsize(target)} B)")
@@ -0,0 +1,179 @@
+import json
+
+from core.enemy import Enemy
+from database import get_db_connection, get_encounter_connection
+
+
+class Bestiary:
+    """
+    Zugriff auf die Gegner in dnd.db und auf gespeicherte Gegnerlisten
+    (in encounters.db, damit ein Update von dnd.db sie nicht löscht).
+
+    Suchen laufen über die Indizes der Tabelle enemies. Statblöcke werden
+    einmal gelesen und zwischengespeichert, so dass sich alle Listen und
+    alle erzeugten Exemplare eines Gegners denselben Statblock teilen.
+    Der Inhalt einer Gegnerliste wird erst beim ersten Zugriff geladen.
+    """
+
+    def __init__(self, db_path=None, encounters_path=None):
+        self.db_path = db_path
+        self.encounters_path = encounters_path
+        self._stat_blocks = {}
+        self._encounters = {}
+
+    def _connect(self):
+        return get_db_connection(self.db_path)
+
+    def _connect_encounters(self):
+        return get_encounter_connection(self.encounters_path)
+
+    # --- Gegner ---
+
+    def find(self, name=None, min_cr=None, max_cr=None, creature_type=None, min_ac=None, max_ac=None):
+        """Gibt die Namen aller passenden Gegner zurück, sortiert nach Herausforderungsgrad und Name."""
+        clauses, params = [], []
+        if name:
+            clauses.append("name LIKE ?")
+            params.append(f"{name}%")
+        if min_cr is not None:
+            clauses.append("challenge_rating >= ?")
+            params.append(min_cr)
+        if max_cr is not None:
+            clauses.append("challenge_rating <= ?")
+            params.append(max_cr)
+        if creature_type:
+            clauses.append("creature_type = ?")
+            params.append(creature_type)
+        if min_ac is not None:
+            clauses.append("armor_class >= ?")
+            params.append(min_ac)
+        if max_ac is not None:
+            clauses.append("armor_class <= ?")
+            params.append(max_ac)
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+        conn = self._connect()
+        try:
+            rows = conn.execute(f"SELECT name FROM enemies{where} ORDER BY challenge_rating, name", params).fetchall()
+        finally:
+            conn.close()
+        return [row['name'] for row in rows]
+
+    def creature_types(self):
+        conn = self._connect()
+        try:
+            rows = conn.execute("SELECT DISTINCT creature_type FROM enemies ORDER BY creature_type").fetchall()
+        finally:
+            conn.close()
+        return [row['creature_type'] for row in rows]
+
+    def stat_blocks(self, names):
+        """Lädt fehlende Statblöcke mit einer Abfrage nach und gibt {name: statblock} zurück."""
+        missing = [name for name in set(names) if name not in self._stat_blocks]
+        if missing:
+            conn = self._connect()
+            try:
+                placeholders = ",".join("?" * len(missing))
+                rows = conn.execute(f"SELECT name, stat_block FROM enemies WHERE name IN ({placeholders})", missing).fetchall()
+            finally:
+                conn.close()
+            for row in rows:
+                self._stat_blocks[row['name']] = json.loads(row['stat_block'])
+        return {name: self._stat_blocks[name] for name in names if name in self._stat_blocks}
+
+    def stat_block(self, name):
+        return self.stat_blocks([name]).get(name)
+
+    def create_enemy(self, name, label=None):
+        block = self.stat_block(name)
+        if block is None:
+            raise KeyError(f"Unbekannter Gegner: {name}")
+        return _enemy_from_block(label or name, block)
+
+    # --- Gegnerlisten ---
+
+    def encounter_names(self):
+        conn = self._connect_encounters()
+        try:
+            rows = conn.execute("SELECT name FROM encounters ORDER BY name").fetchall()
+        finally:
+            conn.close()
+        return [row['name'] for row in rows]
+
+    def load_encounter(self, name):
+        """Gibt die Einträge [(gegner, anzahl), ...] einer gespeicherten Liste zurück."""
+        if name not in self._encounters:
+            conn = self._connect_encounters()
+            try:
+                rows = conn.execute(
+                    "SELECT e.enemy_name, e.count FROM encounter_entries e "
+                    "JOIN encounters c ON c.id = e.encounter_id WHERE c.name = ? ORDER BY e.position",
+                    (name,)).fetchall()
+                exists = rows or conn.execute("SELECT 1 FROM encounters WHERE name = ?", (name,)).fetchone()
+            finally:
+                conn.close()
+            if not exists:
+                raise KeyError(f"Unbekannte Gegnerliste: {name}")
+            self._encounters[name] = [(row['enemy_name'], row['count']) for row in rows]
+        return list(self._encounters[name])
+
+    def save_encounter(self, name, entries, notes=""):
+        """Speichert (oder ersetzt) eine Gegnerliste aus [(gegner, anzahl), ...]."""
+        entries = [(enemy_name, int(count)) for enemy_name, count in entries if int(count) > 0]
+        conn = self._connect_encounters()
+        try:
+            with conn:
+                conn.execute("INSERT INTO encounters (name, notes) VALUES (?, ?) "
+                             "ON CONFLICT(name) DO UPDATE SET notes = excluded.notes", (name, notes))
+                encounter_id = conn.execute("SELECT id FROM encounters WHERE name = ?", (name,)).fetchone()['id']
+                conn.execute("DELETE FROM encounter_entries WHERE encounter_id = ?", (encounter_id,))
+                conn.executemany(
+                    "INSERT INTO encounter_entries (encounter_id, position, enemy_name, count) VALUES (?, ?, ?, ?)",
+                    [(encounter_id, i, enemy_name, count) for i, (enemy_name, count) in enumerate(entries)])
+        finally:
+            conn.close()
+        self._encounters[name] = entries
+
+    def delete_encounter(self, name):
+        conn = self._connect_encounters()
+        try:
+            with conn:
+                conn.execute("DELETE FROM encounter_entries WHERE encounter_id IN "
+                             "(SELECT id FROM encounters WHERE name = ?)", (name,))
+                conn.execute("DELETE FROM encounters WHERE name = ?", (name,))
+        finally:
+            conn.close()
+        self._encounters.pop(name, None)
+
+    def spawn_encounter(self, name):
+        """Erzeugt kampfbereite Enemy-Objekte für eine gespeicherte Liste ("Goblin 1", "Goblin 2", ...)."""
+        entries = self.load_encounter(name)
+        blocks = self.stat_blocks([enemy_name for enemy_name, _ in entries])
+        totals = {}
+        for enemy_name, count in entries:
+            totals[enemy_name] = totals.get(enemy_name, 0) + count
+
+        enemies, numbers = [], {}
+        for enemy_name, count in entries:
+            block = blocks.get(enemy_name)
+            if block is None:
+                print(f"Gegner '{enemy_name}' nicht im Bestiarium, übersprungen.")
+                continue
+            for _ in range(count):
+                numbers[enemy_name] = numbers.get(enemy_name, 0) + 1
+                label = enemy_name if totals[enemy_name] == 1 else f"{enemy_name} {numbers[enemy_name]}"
+                enemies.append(_enemy_from_block(label, block))
+        return enemies
+
+
+def _enemy_from_block(label, block):
+    return Enemy(
+        name=label,
+        hp=block['hp'],
+        armor_class=block['armor_class'],
+        attacks=block.get('attacks', []),
+        speed=block.get('speed', 9.0),
+        notes=block.get('notes', ""),
+        challenge_rating=block.get('challenge_rating', 0.0),
+        creature_type=block.get('creature_type', ""),
+        dexterity=block.get('dexterity', 10),
+    )
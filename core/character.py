@@ -1,5 +1,27 @@
-import random
-from data_manager import RACE_DATA, CLASS_DATA, SPELL_DATA
+import numpy as np
+
+from core import dice
+from data_manager import RACE_DATA, CLASS_DATA, SPELL_DATA, SKILL_LIST, CLASS_PROGRESSIONS, CLASS_FEATURE_NAMES
+
+ABILITIES = ("Stärke", "Geschicklichkeit", "Konstitution", "Intelligenz", "Weisheit", "Charisma")
+SAVE_PREFIXES = ("Rettungswurf: ", "Saving Throw: ")
+PASSIVE_PERCEPTION = "Passive Wahrnehmung"
+
+# Reihenfolge von Character.skill_vector(): alle Fertigkeiten, sechs Rettungswürfe, passive Wahrnehmung.
+SKILLS = tuple(SKILL_LIST)
+SAVES = tuple(f"Rettungswurf: {ability}" for ability in ABILITIES)
+STAT_NAMES = SKILLS + SAVES + (PASSIVE_PERCEPTION,)
+STAT_INDEX = {name: i for i, name in enumerate(STAT_NAMES)}
+_SKILL_ABILITY = np.array([ABILITIES.index(SKILL_LIST[skill]) for skill in SKILLS], dtype=np.intp)
+_PERCEPTION = STAT_INDEX.get("Wahrnehmung")
+
+
+def party_skill_matrix(characters):
+    """Boni einer ganzen Gruppe als Matrix (Charaktere x STAT_NAMES)."""
+    if not characters:
+        return np.zeros((0, len(STAT_NAMES)), dtype=np.int16)
+    return np.vstack([character.skill_vector() for character in characters])
+
 
 class Character:
     """Finale Version der Charakter-Klasse mit allen neuen Attributen."""
@@ -37,6 +59,42 @@ class Character:
         self.max_hit_dice = 0
         self.hit_dice = 0
         self.fighting_style = None
+        self.state_version = 0
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state.pop("_skill_cache", None)
+        return state
+
+    def touch(self):
+        """Markiert abgeleitete Werte wie skill_vector() als veraltet."""
+        self.state_version = getattr(self, "state_version", 0) + 1
+
+    def skill_vector(self):
+        """
+        Boni aller Fertigkeiten, Rettungswürfe und die passive Wahrnehmung als
+        NumPy-Vektor in der Reihenfolge STAT_NAMES. Wird erst nach touch()
+        (Attribute, Kompetenzen oder Stufe geändert) neu berechnet.
+        """
+        version = getattr(self, "state_version", 0)
+        cached = getattr(self, "_skill_cache", None)
+        if cached is not None and cached[0] == version:
+            return cached[1]
+
+        modifiers = (np.array([self.abilities.get(a, 10) for a in ABILITIES], dtype=np.int16) - 10) // 2
+        proficiencies = set(self.proficiencies)
+        bonus = self.get_proficiency_bonus()
+        skills = modifiers[_SKILL_ABILITY] + bonus * np.array([s in proficiencies for s in SKILLS], dtype=np.int16)
+        saves = modifiers + bonus * np.array(
+            [any(prefix + a in proficiencies for prefix in SAVE_PREFIXES) for a in ABILITIES], dtype=np.int16)
+        passive = 10 + (skills[_PERCEPTION] if _PERCEPTION is not None else modifiers[ABILITIES.index("Weisheit")])
+        vector = np.concatenate((skills, saves, [passive])).astype(np.int16)
+        vector.setflags(write=False)
+        self._skill_cache = (version, vector)
+        return vector
+
+    def skill_bonus(self, name):
+        return int(self.skill_vector()[STAT_INDEX[name]])
 
     def initialize_character(self):
         """Sammelt alle Daten bei der Erstellung oder beim Laden."""
@@ -58,6 +116,7 @@ class Character:
             if ability in self.abilities:
                 self.abilities[ability] += bonus
         self.speed = race_info.get("speed", 9)
+        self.touch()
 
     def collect_proficiencies_and_languages(self):
         """Sammelt Kompetenzen und Sprachen von Rasse und Klasse."""
@@ -71,6 +130,7 @@ class Character:
         languages = set(race_info.get("languages", []))
         languages.update(class_info.get("languages", []))
         self.languages = sorted(list(languages))
+        self.touch()
 
     def calculate_initial_hp(self):
         hit_die = CLASS_DATA.get(self.char_class, {}).get("hit_die", 8)
@@ -85,10 +145,8 @@ class Character:
 
     def initialize_spell_slots(self):
         """Initialisiert die Zauberplätze basierend auf Klasse und Level."""
-        class_info = CLASS_DATA.get(self.char_class, {})
-        progression = class_info.get("progression", {})
-        level_progression = progression.get(self.level, {})
-        self.max_spell_slots = level_progression.get("spell_slots", {})
+        progression = CLASS_PROGRESSIONS.get(self.char_class)
+        self.max_spell_slots = progression.spell_slots(self.level) if progression else {}
         self.current_spell_slots = self.max_spell_slots.copy()
 
     def long_rest(self):
@@ -110,8 +168,7 @@ class Character:
         hit_die_type = CLASS_DATA.get(self.char_class, {}).get("hit_die", 8)
         con_modifier = (self.abilities["Konstitution"] - 10) // 2
 
-        for _ in range(dice_to_spend):
-            roll = random.randint(1, hit_die_type)
+        for roll in dice.roll_dice(dice_to_spend, hit_die_type):
             healed_amount += max(0, roll + con_modifier) # Heilung kann nicht negativ sein
 
         self.hit_points = min(self.max_hit_points, self.hit_points + healed_amount)
@@ -119,11 +176,16 @@ class Character:
         return healed_amount
 
     def update_features(self):
-        self.features = []
-        class_features = CLASS_DATA.get(self.char_class, {}).get("features", {})
-        for lvl in range(1, self.level + 1):
-            if lvl in class_features:
-                self.features.extend(class_features[lvl])
+        """Setzt die Klassenmerkmale bis zur aktuellen Stufe; eigene Merkmale wie der Kampfstil bleiben erhalten."""
+        progression = CLASS_PROGRESSIONS.get(self.char_class)
+        custom = [f for f in self.features if f.get("name") not in CLASS_FEATURE_NAMES]
+        self.features = (list(progression.features_up_to(self.level)) if progression else []) + custom
+
+    def add_level_features(self, level):
+        """Fügt nur die Merkmale einer neu erreichten Stufe hinzu."""
+        progression = CLASS_PROGRESSIONS.get(self.char_class)
+        if progression:
+            self.features.extend(progression.features_at(level))
 
     def prepare_spellbook(self):
         """Ensures the spells dictionary exists."""
@@ -134,7 +196,9 @@ class Character:
         self.level += 1
         hit_die = CLASS_DATA.get(self.char_class, {}).get("hit_die", 8)
         con_modifier = (self.abilities["Konstitution"] - 10) // 2
-        hp_increase = random.randint(1, hit_die) + con_modifier
+        # Der Stufenaufstieg-Bildschirm würfelt vorab und zeigt den Wurf an.
+        hp_roll = choices.get("hp_roll") or dice.roll_dice(1, hit_die)[0]
+        hp_increase = hp_roll + con_modifier
         self.max_hit_points += max(1, hp_increase)
         self.hit_points = self.max_hit_points
         self.max_hit_dice = self.level
@@ -180,11 +244,19 @@ class Character:
                                 self.spells[new_spell_level].append(new_spell_name)
                         break
 
-        self.update_race_bonuses_and_speed()
-        self.update_features()
+        # Nur was sich durch die neue Stufe ändert; Attribute nur bei einer Erhöhung neu berechnen.
+        if choices.get("ability_increase"):
+            self.update_race_bonuses_and_speed()
+            self.calculate_initiative()
+            self.calculate_armor_class()
+        self.add_level_features(self.level)
         self.initialize_spell_slots()
-        self.calculate_initiative()
-        self.calculate_armor_class()
+        self.touch()
+
+    def apply_level_ups(self, history):
+        """Spielt einen Verlauf von level_up-Auswahlen der Reihe nach ab."""
+        for choices in history:
+            self.level_up(choices)
 
     def normalize_spells(self):
         """Converts spell dictionary keys to integers for compatibility."""
@@ -0,0 +1,278 @@
+"""
+Würfelausdrücke: Parser, kompilierte Würfe, Wahrscheinlichkeitsverteilungen.
+
+Unterstützt werden Ausdrücke wie
+
+    1d8, 2W6+3, 2d6+1d4-1, d20, 1d%, 4d6kh3, 2d20kl1, 1d20adv, d20 nachteil
+
+"d" und "W" sind gleichwertig. kh/kl behalten die höchsten/niedrigsten
+Würfel, adv/vorteil und dis/nachteil würfeln einen Würfel doppelt und
+behalten den besseren bzw. schlechteren.
+
+parse() ist zwischengespeichert und liefert einen DiceExpression, dessen
+Terme zu kleinen Funktionen kompiliert sind. Gewürfelt wird über einen
+Roller (NumPy-Generator, optional mit Seed für reproduzierbare Würfe),
+viele Würfe auf einmal mit roll_many().
+"""
+import itertools
+import re
+from functools import lru_cache
+
+import numpy as np
+
+_TERM = re.compile(
+    r"(?P<sign>[+-])?\s*(?:"
+    r"(?P<count>\d*)\s*[dDwW]\s*(?P<sides>\d+|%)\s*"
+    r"(?:(?P<keep>k[hl])\s*(?P<keep_n>\d*)|(?P<edge>adv|dis|vorteil|nachteil))?"
+    r"|(?P<const>\d+))\s*"
+)
+MAX_DICE = 1000
+MAX_ENUMERATION = 1_000_000
+
+
+class DiceError(ValueError):
+    pass
+
+
+class DiceTerm:
+    """Ein Würfelterm wie 4d6kh3 mit Vorzeichen."""
+
+    def __init__(self, sign, count, sides, keep=None, keep_n=None):
+        self.sign = sign
+        self.count = count
+        self.sides = sides
+        self.keep = keep
+        self.keep_n = count if keep is None else keep_n
+
+    def __str__(self):
+        text = f"{self.count}d{self.sides}"
+        if self.keep:
+            text += f"k{self.keep}{self.keep_n}"
+        return text
+
+    def compile(self):
+        """Gibt eine Funktion rng -> (wert, gewürfelte augen, behaltene augen) zurück."""
+        count, sides, sign, keep, keep_n = self.count, self.sides, self.sign, self.keep, self.keep_n
+        if keep is None:
+            def roll(rng):
+                faces = rng.integers(1, sides + 1, size=count).tolist()
+                return sign * sum(faces), faces, faces
+        else:
+            def roll(rng):
+                faces = rng.integers(1, sides + 1, size=count).tolist()
+                ordered = sorted(faces, reverse=(keep == "h"))
+                kept = ordered[:keep_n]
+                return sign * sum(kept), faces, kept
+        return roll
+
+    def roll_many(self, rng, n):
+        faces = rng.integers(1, self.sides + 1, size=(n, self.count))
+        if self.keep is None:
+            return self.sign * faces.sum(axis=1)
+        faces.sort(axis=1)
+        kept = faces[:, -self.keep_n:] if self.keep == "h" else faces[:, :self.keep_n]
+        return self.sign * kept.sum(axis=1)
+
+    def distribution(self):
+        """Exakte Verteilung als (kleinster wert, wahrscheinlichkeiten) ohne Vorzeichen."""
+        single = np.full(self.sides, 1.0 / self.sides)
+        if self.keep is None or self.keep_n >= self.count:
+            probs = np.array([1.0])
+            for _ in range(self.count):
+                probs = np.convolve(probs, single)
+            return self.count, probs
+        if self.keep_n == 1:
+            # Ordnungsstatistik: P(max <= m) = (m/s)^k
+            cdf = (np.arange(1, self.sides + 1) / self.sides) ** self.count
+            if self.keep == "l":
+                cdf = 1 - ((self.sides - np.arange(1, self.sides + 1)) / self.sides) ** self.count
+            return 1, np.diff(np.concatenate(([0.0], cdf)))
+        if self.sides ** self.count > MAX_ENUMERATION:
+            raise DiceError(f"Verteilung von {self} zu groß für exakte Berechnung")
+        counts = {}
+        for faces in itertools.product(range(1, self.sides + 1), repeat=self.count):
+            ordered = sorted(faces, reverse=(self.keep == "h"))
+            total = sum(ordered[:self.keep_n])
+            counts[total] = counts.get(total, 0) + 1
+        low = min(counts)
+        probs = np.zeros(max(counts) - low + 1)
+        for total, count in counts.items():
+            probs[total - low] = count
+        return low, probs / probs.sum()
+
+
+class RollResult:
+    def __init__(self, expression, total, details):
+        self.expression = expression
+        self.total = total
+        self.details = details
+
+    @property
+    def faces(self):
+        """Alle behaltenen Augen in Reihenfolge der Terme."""
+        return [face for _, _, kept in self.details for face in kept]
+
+    def __int__(self):
+        return self.total
+
+    def __str__(self):
+        parts = []
+        for term, faces, kept in self.details:
+            shown = ", ".join(str(f) for f in faces)
+            if kept is not faces:
+                shown += f" → {', '.join(str(f) for f in kept)}"
+            parts.append(f"{'-' if term.sign < 0 else '+'} {term} [{shown}]")
+        if self.expression.constant:
+            parts.append(f"{'-' if self.expression.constant < 0 else '+'} {abs(self.expression.constant)}")
+        return f"{' '.join(parts).lstrip('+ ')} = {self.total}"
+
+
+class DiceExpression:
+    """Ein geparster Würfelausdruck: Würfelterme plus Konstante."""
+
+    def __init__(self, text, terms, constant):
+        self.text = text
+        self.terms = tuple(terms)
+        self.constant = constant
+        self._rollers = [term.compile() for term in self.terms]
+        self._distribution = None
+
+    def __str__(self):
+        return self.text
+
+    @property
+    def minimum(self):
+        return self.constant + sum(t.sign * (t.keep_n if t.sign > 0 else t.keep_n * t.sides) for t in self.terms)
+
+    @property
+    def maximum(self):
+        return self.constant + sum(t.sign * (t.keep_n * t.sides if t.sign > 0 else t.keep_n) for t in self.terms)
+
+    def critical(self):
+        """Ausdruck für einen kritischen Treffer: alle Würfel doppelt, Konstante einfach."""
+        parts = []
+        for term in self.terms:
+            keep = f"k{term.keep}{term.keep_n * 2}" if term.keep else ""
+            parts.append(f"{'-' if term.sign < 0 else '+'}{term.count * 2}d{term.sides}{keep}")
+        if self.constant:
+            parts.append(f"{self.constant:+d}")
+        return parse("".join(parts).lstrip("+") or "0")
+
+    def roll(self, rng):
+        total = self.constant
+        details = []
+        for term, roller in zip(self.terms, self._rollers):
+            value, faces, kept = roller(rng)
+            total += value
+            details.append((term, faces, kept))
+        return RollResult(self, total, details)
+
+    def roll_many(self, rng, n):
+        """n Würfe auf einmal als NumPy-Array der Summen."""
+        totals = np.full(n, self.constant, dtype=np.int64)
+        for term in self.terms:
+            totals += term.roll_many(rng, n)
+        return totals
+
+    def distribution_array(self):
+        """Exakte Verteilung als (kleinster wert, NumPy-Array), per Faltung der Terme (zwischengespeichert)."""
+        if self._distribution is None:
+            low, probs = self.constant, np.array([1.0])
+            for term in self.terms:
+                term_low, term_probs = term.distribution()
+                if term.sign < 0:
+                    term_low, term_probs = -(term_low + len(term_probs) - 1), term_probs[::-1]
+                low += term_low
+                probs = np.convolve(probs, term_probs)
+            self._distribution = (low, probs)
+        return self._distribution
+
+    def distribution(self):
+        """Exakte Verteilung als {summe: wahrscheinlichkeit}."""
+        low, probs = self.distribution_array()
+        return {low + i: float(p) for i, p in enumerate(probs) if p > 0}
+
+    @property
+    def mean(self):
+        low, probs = self.distribution_array()
+        return float(np.dot(np.arange(low, low + len(probs)), probs))
+
+
+@lru_cache(maxsize=512)
+def parse(text):
+    """Parst einen Würfelausdruck; Ergebnisse werden zwischengespeichert."""
+    source = str(text).strip()
+    if not source:
+        raise DiceError("Leerer Würfelausdruck")
+    terms, constant, position = [], 0, 0
+    while position < len(source):
+        match = _TERM.match(source, position)
+        if not match or match.end() == position:
+            raise DiceError(f"Ungültiger Würfelausdruck: {text!r}")
+        if position > 0 and not match.group("sign"):
+            raise DiceError(f"Operator fehlt in {text!r}")
+        sign = -1 if match.group("sign") == "-" else 1
+        if match.group("const") is not None:
+            constant += sign * int(match.group("const"))
+        else:
+            count = int(match.group("count") or 1)
+            sides = 100 if match.group("sides") == "%" else int(match.group("sides"))
+            keep, keep_n = None, None
+            if match.group("keep"):
+                keep = match.group("keep")[-1]
+                keep_n = int(match.group("keep_n") or 1)
+            elif match.group("edge"):
+                keep = "h" if match.group("edge") in ("adv", "vorteil") else "l"
+                count, keep_n = count + 1, count
+            if count < 1 or sides < 1 or count > MAX_DICE:
+                raise DiceError(f"Ungültige Würfelanzahl in {text!r}")
+            if keep_n is not None and not 1 <= keep_n <= count:
+                raise DiceError(f"Ungültige Anzahl behaltener Würfel in {text!r}")
+            terms.append(DiceTerm(sign, count, sides, keep, keep_n))
+        position = match.end()
+    return DiceExpression(source, terms, constant)
+
+
+class Roller:
+    """Würfelt Ausdrücke mit einem eigenen (optional geseedeten) Zufallsgenerator."""
+
+    def __init__(self, seed=None):
+        self.seed = seed
+        self.rng = np.random.default_rng(seed)
+
+    def reseed(self, seed=None):
+        self.seed = seed
+        self.rng = np.random.default_rng(seed)
+
+    def roll(self, expression):
+        if not isinstance(expression, DiceExpression):
+            expression = parse(expression)
+        return expression.roll(self.rng)
+
+    def total(self, expression):
+        return self.roll(expression).total
+
+    def roll_many(self, expression, n):
+        if not isinstance(expression, DiceExpression):
+            expression = parse(expression)
+        return expression.roll_many(self.rng, n)
+
+    def dice(self, count, sides):
+        """count Würfel mit sides Seiten als Liste einzelner Augen."""
+        return self.rng.integers(1, sides + 1, size=count).tolist()
+
+
+default_roller = Roller()
+
+
+def roll(expression):
+    return default_roller.roll(expression)
+
+
+def roll_dice(count, sides):
+    return default_roller.dice(count, sides)
+
+
+def seed(value):
+    """Setzt den Seed des gemeinsamen Rollers, z.B. um einen Spielabend nachzuspielen."""
+    default_roller.reseed(value)
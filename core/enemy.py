@@ -0,0 +1,64 @@
+class Enemy:
+    """Ein kampfbereiter Gegner, z.B. aus dem Bestiarium oder einer gespeicherten Gegnerliste."""
+
+    def __init__(self, name, hp, armor_class, attacks=None, speed=9.0, notes="",
+                 max_hp=None, challenge_rating=0.0, creature_type="", dexterity=10):
+        self.name = name
+        self.hp = hp
+        self.max_hp = hp if max_hp is None else max_hp
+        self.armor_class = armor_class
+        # Bei Gegnern aus dem Bestiarium teilen sich alle Exemplare dieselbe
+        # Angriffsliste; sie wird nur gelesen.
+        self.attacks = attacks if attacks is not None else []
+        self.speed = speed
+        self.notes = notes
+        self.challenge_rating = challenge_rating
+        self.creature_type = creature_type
+        self.dexterity = dexterity
+        self.conditions = []
+
+    @property
+    def is_defeated(self):
+        return self.hp <= 0
+
+    def take_damage(self, amount):
+        self.hp = max(0, self.hp - amount)
+
+    def heal(self, amount):
+        self.hp = min(self.max_hp, self.hp + amount)
+
+    def to_dict(self):
+        return {
+            "name": self.name,
+            "hp": self.hp,
+            "max_hp": self.max_hp,
+            "armor_class": self.armor_class,
+            "ac": self.armor_class,  # Alte Gegnerlisten kennen nur "ac"
+            "attacks": [dict(attack) for attack in self.attacks],
+            "speed": self.speed,
+            "notes": self.notes,
+            "challenge_rating": self.challenge_rating,
+            "creature_type": self.creature_type,
+            "dexterity": self.dexterity,
+            "conditions": list(self.conditions),
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        enemy = cls(
+            name=data["name"],
+            hp=data.get("hp", 1),
+            armor_class=data.get("armor_class", data.get("ac", 10)),
+            attacks=[dict(attack) for attack in data.get("attacks", [])],
+            speed=data.get("speed", 9.0),
+            notes=data.get("notes", ""),
+            max_hp=data.get("max_hp"),
+            challenge_rating=data.get("challenge_rating", 0.0),
+            creature_type=data.get("creature_type", ""),
+            dexterity=data.get("dexterity", 10),
+        )
+        enemy.conditions = list(data.get("conditions", []))
+        return enemy
+
+    def __repr__(self):
+        return f"Enemy({self.name!r}, hp={self.hp}/{self.max_hp}, ac={self.armor_class})"
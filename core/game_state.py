@@ -0,0 +1,195 @@
+import copy
+
+# Kurze Feldnamen halten die Deltas klein.
+FIELDS = ("n", "k", "hp", "mhp", "ac", "cond", "ini")
+MAX_ROLLS_PER_DELTA = 16
+ROLL_LOG_SIZE = 50
+
+
+def merge_delta(base, newer):
+    """Fasst zwei aufeinanderfolgende Deltas zu einem zusammen (neuere Werte gewinnen)."""
+    merged = {"t": newer["t"]}
+    combatants = copy.deepcopy(base.get("c", {}))
+    removed = [cid for cid in base.get("rm", []) if cid not in newer.get("c", {})]
+    for cid in newer.get("rm", []):
+        combatants.pop(cid, None)
+        if cid not in removed:
+            removed.append(cid)
+    for cid, fields in newer.get("c", {}).items():
+        combatants.setdefault(cid, {}).update(fields)
+    if combatants:
+        merged["c"] = combatants
+    if removed:
+        merged["rm"] = removed
+    if "order" in newer:
+        merged["order"] = newer["order"]
+    elif "order" in base:
+        merged["order"] = base["order"]
+    rolls = base.get("rolls", []) + newer.get("rolls", [])
+    if rolls:
+        merged["rolls"] = rolls[-MAX_ROLLS_PER_DELTA:]
+    for key in ("ts",):
+        if key in newer:
+            merged[key] = newer[key]
+    return merged
+
+
+class GameState:
+    """
+    Autoritativer Spielzustand einer DM-Sitzung.
+
+    Änderungen werden nur als "schmutzige" Felder vermerkt. collect_delta()
+    liest pro Tick die aktuellen Werte aus, dadurch werden mehrere
+    Änderungen am selben Feld innerhalb eines Ticks automatisch
+    zusammengefasst.
+    """
+
+    def __init__(self):
+        self.combatants = {}
+        self.initiative_order = []
+        self.rolls = []
+        self.tick = 0
+        self._dirty = {}
+        self._removed = set()
+        self._order_dirty = False
+        self._new_rolls = []
+
+    def _mark(self, cid, *fields):
+        self._dirty.setdefault(cid, set()).update(fields)
+
+    def add_combatant(self, cid, name, kind="player", hp=0, max_hp=None, armor_class=10,
+                      conditions=(), initiative=None):
+        self.combatants[cid] = {
+            "n": name, "k": kind, "hp": hp, "mhp": hp if max_hp is None else max_hp,
+            "ac": armor_class, "cond": sorted(set(conditions)), "ini": initiative,
+        }
+        self._removed.discard(cid)
+        self._mark(cid, *FIELDS)
+
+    def add_player_from_character(self, cid, character):
+        """Übernimmt einen Spieler aus einem serialisierten Charakter (siehe character_summary)."""
+        self.add_combatant(
+            cid, character.get("name", cid), "player",
+            hp=character.get("hit_points", 0), max_hp=character.get("max_hit_points"),
+            armor_class=character.get("armor_class", 10), initiative=character.get("initiative"),
+        )
+
+    def remove_combatant(self, cid):
+        if self.combatants.pop(cid, None) is None:
+            return
+        self._dirty.pop(cid, None)
+        self._removed.add(cid)
+        if cid in self.initiative_order:
+            self.initiative_order.remove(cid)
+            self._order_dirty = True
+
+    def set_hp(self, cid, hp):
+        combatant = self.combatants.get(cid)
+        if combatant is None:
+            return
+        hp = max(0, min(int(hp), combatant["mhp"]))
+        if combatant["hp"] != hp:
+            combatant["hp"] = hp
+            self._mark(cid, "hp")
+
+    def change_hp(self, cid, amount):
+        combatant = self.combatants.get(cid)
+        if combatant is not None:
+            self.set_hp(cid, combatant["hp"] + int(amount))
+
+    def set_conditions(self, cid, conditions):
+        combatant = self.combatants.get(cid)
+        if combatant is None:
+            return
+        conditions = sorted(set(conditions))
+        if combatant["cond"] != conditions:
+            combatant["cond"] = conditions
+            self._mark(cid, "cond")
+
+    def set_initiative(self, cid, value):
+        combatant = self.combatants.get(cid)
+        if combatant is not None and combatant["ini"] != value:
+            combatant["ini"] = value
+            self._mark(cid, "ini")
+
+    def set_initiative_order(self, order):
+        order = [cid for cid in order if cid in self.combatants]
+        if order != self.initiative_order:
+            self.initiative_order = order
+            self._order_dirty = True
+
+    def record_roll(self, cid, expression, result):
+        roll = [cid, expression, result]
+        self.rolls.append(roll)
+        del self.rolls[:-ROLL_LOG_SIZE]
+        self._new_rolls.append(roll)
+
+    def has_changes(self):
+        return bool(self._dirty or self._removed or self._order_dirty or self._new_rolls)
+
+    def collect_delta(self, timestamp=None):
+        """Gibt die Änderungen seit dem letzten Aufruf zurück (oder None) und setzt sie zurück."""
+        if not self.has_changes():
+            return None
+        self.tick += 1
+        delta = {"t": self.tick}
+        if self._dirty:
+            delta["c"] = {
+                cid: {field: self.combatants[cid][field] for field in fields}
+                for cid, fields in self._dirty.items()
+            }
+        if self._removed:
+            delta["rm"] = sorted(self._removed)
+        if self._order_dirty:
+            delta["order"] = list(self.initiative_order)
+        if self._new_rolls:
+            delta["rolls"] = self._new_rolls[-MAX_ROLLS_PER_DELTA:]
+        if timestamp is not None:
+            delta["ts"] = timestamp
+        self._dirty = {}
+        self._removed = set()
+        self._order_dirty = False
+        self._new_rolls = []
+        return delta
+
+    def snapshot(self):
+        return {
+            "t": self.tick,
+            "c": copy.deepcopy(self.combatants),
+            "order": list(self.initiative_order),
+            "rolls": list(self.rolls),
+        }
+
+    def load_snapshot(self, snapshot):
+        """Ersetzt den lokalen Zustand (Client-Spiegel) durch einen Snapshot."""
+        self.tick = snapshot.get("t", 0)
+        self.combatants = copy.deepcopy(snapshot.get("c", {}))
+        self.initiative_order = list(snapshot.get("order", []))
+        self.rolls = list(snapshot.get("rolls", []))
+
+    def apply_delta(self, delta):
+        """Wendet ein Delta auf einen Client-Spiegel an."""
+        for cid in delta.get("rm", []):
+            self.combatants.pop(cid, None)
+        for cid, fields in delta.get("c", {}).items():
+            self.combatants.setdefault(cid, {}).update(fields)
+        if "order" in delta:
+            self.initiative_order = list(delta["order"])
+        for roll in delta.get("rolls", []):
+            self.rolls.append(roll)
+        del self.rolls[:-ROLL_LOG_SIZE]
+        self.tick = delta.get("t", self.tick)
+
+
+def character_summary(character):
+    """Serialisiert die für den DM relevanten Werte eines Character-Objekts."""
+    return {
+        "name": character.name,
+        "race": character.race,
+        "char_class": character.char_class,
+        "level": character.level,
+        "hit_points": character.hit_points,
+        "max_hit_points": character.max_hit_points,
+        "armor_class": character.armor_class,
+        "initiative": character.initiative,
+    }
@@ -0,0 +1,368 @@
+"""
+Charaktere ohne Oberfläche erzeugen, aufsteigen lassen und prüfen.
+
+generate_character() trifft dieselben Entscheidungen wie CharacterCreator
+und LevelUpScreen (Kampfstil, Halbelf-Boni, Fertigkeiten, Startzauber,
+Attributswerterhöhungen, neue Zauber), nur zufällig statt per Popup, und
+steigt über Character.level_up() bis zur Zielstufe auf. validate_character()
+und validate_data() melden Unstimmigkeiten in Charakter bzw. Daten.
+
+run_batch() verteilt viele Spezifikationen auf einen Prozess-Pool und
+misst den Durchsatz, z.B. alle Rassen x Klassen x Stufen:
+
+    python -m core.generator --all
+    python -m core.generator --random 500 --seed 1 --save saves
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import pickle
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from core import dice
+from core.progression import PREPARED_CASTERS
+
+ABILITIES = ("Stärke", "Geschicklichkeit", "Konstitution", "Intelligenz", "Weisheit", "Charisma")
+HALF_ELF_ABILITIES = ABILITIES[:5]
+MAX_LEVEL = 20
+MAX_ABILITY = 20
+CHUNK_SIZE = 50
+
+
+class CharacterSpec:
+    """Was erzeugt werden soll; klein und picklebar für Worker-Prozesse."""
+
+    def __init__(self, race, char_class, level=1, seed=None, name=None):
+        self.race = race
+        self.char_class = char_class
+        self.level = int(level)
+        self.seed = seed
+        self.name = name or f"{race} {char_class} {level}"
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data["race"], data.get("char_class") or data["class"], data.get("level", 1),
+                   data.get("seed"), data.get("name"))
+
+    def __repr__(self):
+        return f"CharacterSpec({self.race!r}, {self.char_class!r}, {self.level}, seed={self.seed})"
+
+
+def all_specs(levels=range(1, MAX_LEVEL + 1), seed=0):
+    """Jede Kombination aus Rasse, Klasse und Stufe genau einmal."""
+    from data_manager import CLASS_DATA, RACE_DATA
+
+    specs = []
+    for race in RACE_DATA:
+        for char_class in CLASS_DATA:
+            for level in levels:
+                specs.append(CharacterSpec(race, char_class, level, seed=seed + len(specs)))
+    return specs
+
+
+def random_specs(count, seed=None, max_level=MAX_LEVEL):
+    from data_manager import CLASS_DATA, RACE_DATA
+
+    rng = random.Random(seed)
+    races, classes = sorted(RACE_DATA), sorted(CLASS_DATA)
+    return [CharacterSpec(rng.choice(races), rng.choice(classes), rng.randint(1, max_level),
+                          seed=rng.randrange(2 ** 32), name=f"Zufall {i + 1}")
+            for i in range(count)]
+
+
+# --- Erzeugen ---
+
+def _pick(rng, options, count, issues, what):
+    options = sorted(options)
+    if len(options) < count:
+        issues.append(f"Zu wenige {what} zur Auswahl")
+        count = len(options)
+    return rng.sample(options, count)
+
+
+def _initial_choices(character, rng, issues):
+    """Die Popups von CharacterCreator in derselben Reihenfolge."""
+    from data_manager import CLASS_DATA, CLASS_PROGRESSIONS, FIGHTING_STYLE_DATA, SKILL_LIST
+
+    class_data = CLASS_DATA.get(character.char_class, {})
+    chosen_skills = []
+
+    if "Kampfstil" in [f.get("name") for f in class_data.get("features", {}).get(1, [])]:
+        style = rng.choice(sorted(FIGHTING_STYLE_DATA))
+        character.fighting_style = style
+        character.features.append({"name": f"Kampfstil: {style}", "desc": FIGHTING_STYLE_DATA[style]})
+    elif character.race == "Halbelf":
+        for ability in rng.sample(HALF_ELF_ABILITIES, 2):
+            character.base_abilities[ability] += 1
+        chosen_skills += _pick(rng, set(SKILL_LIST) - set(character.proficiencies), 2, issues, "Fertigkeiten")
+
+    skill_choices = class_data.get("skill_choices")
+    if skill_choices:
+        options = set(skill_choices["from"]) - set(character.proficiencies) - set(chosen_skills)
+        chosen_skills += _pick(rng, options, skill_choices["choose"], issues, "Fertigkeiten")
+    character.proficiencies = sorted(set(character.proficiencies) | set(chosen_skills))
+
+    progression = CLASS_PROGRESSIONS.get(character.char_class)
+    if progression and progression.is_caster:
+        cantrips, spells = progression.initial_spells(character.base_abilities)
+        character.spells[0] = _pick(rng, progression.spell_list.get(0, ()), cantrips, issues, "Zaubertricks")
+        character.spells[1] = _pick(rng, progression.spell_list.get(1, ()), spells, issues, "Zauber des 1. Grades")
+    return chosen_skills
+
+
+def _level_up_choices(character, rng, roller, issues):
+    """Die Auswahl von LevelUpScreen für den Aufstieg auf character.level + 1."""
+    from data_manager import CLASS_PROGRESSIONS
+
+    progression = CLASS_PROGRESSIONS[character.char_class]
+    new_level = character.level + 1
+    choices = {"hp_roll": roller.dice(1, progression.hit_die)[0]}
+
+    if progression.gains_ability_increase(new_level):
+        increases = []
+        for _ in range(2):
+            options = [a for a in ABILITIES if character.abilities[a] + increases.count(a) < MAX_ABILITY]
+            if options:
+                increases.append(rng.choice(options))
+        choices["ability_increase"] = increases
+
+    if not progression.has_spell_choices(new_level):
+        return choices
+    cantrips_to_learn, spells_to_learn = progression.spells_to_learn(character.level, character.abilities)
+    max_spell_level = int(progression.max_spell_level[new_level])
+    spell_list = progression.spell_list
+    known = {spell for spells in character.spells.values() for spell in spells}
+    if cantrips_to_learn > 0:
+        choices["new_cantrips"] = _pick(rng, set(spell_list.get(0, ())) - known, cantrips_to_learn,
+                                        issues, "Zaubertricks")
+    if spells_to_learn > 0:
+        available = {spell for lvl in range(1, max_spell_level + 1) for spell in spell_list.get(lvl, ())} - known
+        choices["new_spells"] = _pick(rng, available, spells_to_learn, issues, "Zauber")
+    return choices
+
+
+def generate_character(spec, issues=None):
+    """Erzeugt einen Charakter nach spec; Auffälligkeiten landen in issues."""
+    from core.character import Character
+
+    if issues is None:
+        issues = []
+    rng = random.Random(spec.seed)
+    roller = dice.Roller(spec.seed)
+
+    character = Character(spec.name, spec.race, spec.char_class)
+    for ability in ABILITIES:
+        character.base_abilities[ability] = roller.total("4d6kh3")
+    character.update_race_bonuses_and_speed()
+    character.collect_proficiencies_and_languages()
+    character.chosen_skills = _initial_choices(character, rng, issues)
+    character.initialize_character()
+
+    while character.level < spec.level:
+        character.level_up(_level_up_choices(character, rng, roller, issues))
+    return character
+
+
+# --- Prüfen ---
+
+def validate_character(character, issues=None):
+    """Prüft einen fertigen Charakter gegen die Klassendaten."""
+    from data_manager import CLASS_DATA, SPELL_DATA
+
+    if issues is None:
+        issues = []
+    class_data = CLASS_DATA.get(character.char_class, {})
+    level = character.level
+
+    if character.max_hit_points < level:
+        issues.append("Weniger Trefferpunkte als Stufen")
+    if character.max_hit_dice != level:
+        issues.append("Trefferwürfel passen nicht zur Stufe")
+    for ability, score in character.abilities.items():
+        if not 1 <= score <= 30:
+            issues.append(f"Attributswert {ability} außerhalb von 1-30")
+
+    names = {f.get("name") for f in character.features}
+    for lvl in range(1, level + 1):
+        for feature in class_data.get("features", {}).get(lvl, []):
+            if feature["name"] not in names:
+                issues.append(f"Klassenmerkmal fehlt: {feature['name']}")
+    if character.fighting_style and f"Kampfstil: {character.fighting_style}" not in names:
+        issues.append("Gewählter Kampfstil fehlt in den Merkmalen")
+    if set(getattr(character, "chosen_skills", [])) - set(character.proficiencies):
+        issues.append("Gewählte Fertigkeiten fehlen in den Kompetenzen")
+
+    progression = class_data.get("progression", {}).get(level, {})
+    expected_slots = progression.get("spell_slots", {})
+    if character.max_spell_slots != expected_slots:
+        issues.append("Zauberplätze weichen von der Progression ab")
+    max_spell_level = max([int(lvl) for lvl, slots in expected_slots.items() if slots > 0] or [0])
+    spell_list = class_data.get("spell_list", {})
+    for spell_level, spells in character.spells.items():
+        for spell in spells:
+            if spell not in SPELL_DATA:
+                issues.append(f"Unbekannter Zauber: {spell}")
+            elif spell not in spell_list.get(spell_level, []):
+                issues.append(f"Zauber nicht in der Klassenliste: {spell}")
+            elif spell_level > max_spell_level:
+                issues.append("Zauber ohne passenden Zauberplatz")
+    if progression and character.char_class not in PREPARED_CASTERS:
+        known = sum(len(spells) for lvl, spells in character.spells.items() if lvl > 0)
+        if "spells_known" in progression and known != progression["spells_known"]:
+            issues.append(f"Anzahl bekannter Zauber weicht von spells_known ab ({character.char_class})")
+        cantrips = len(character.spells.get(0, []))
+        if cantrips != progression.get("cantrips_known", 0):
+            issues.append(f"Anzahl Zaubertricks weicht von cantrips_known ab ({character.char_class})")
+    return issues
+
+
+def validate_data():
+    """Unstimmigkeiten in den geladenen Klassen-/Rassendaten als Liste von Meldungen."""
+    import database
+    from data_manager import CLASS_DATA, CLASS_PROGRESSIONS, FIGHTING_STYLE_DATA, RACE_DATA, SKILL_LIST, SPELL_DATA
+
+    issues = []
+    with open(os.path.join(database.DATA_DIR, "classes.json"), encoding="utf-8") as f:
+        raw_classes = json.load(f)
+
+    for name, class_data in CLASS_DATA.items():
+        progression = class_data.get("progression", {})
+        spell_list = class_data.get("spell_list", {})
+        raw = raw_classes.get(name, {})
+        if raw.get("progression") and not progression:
+            issues.append(f"{name}: progression ist nach dem Laden leer")
+        if raw.get("spell_list") and not spell_list:
+            issues.append(f"{name}: spell_list ist nach dem Laden leer")
+        if raw.get("skill_choices") and not class_data.get("skill_choices"):
+            issues.append(f"{name}: skill_choices fehlen in der Datenbank")
+        issues += CLASS_PROGRESSIONS[name].validate(SPELL_DATA)
+        for skill in class_data.get("skill_choices", {}).get("from", []):
+            if skill not in SKILL_LIST:
+                issues.append(f"{name}: unbekannte Fertigkeit {skill}")
+        if any(f.get("name") == "Kampfstil" for f in class_data.get("features", {}).get(1, [])) and not FIGHTING_STYLE_DATA:
+            issues.append(f"{name}: Kampfstil ohne Kampfstil-Daten")
+
+    for name, race in RACE_DATA.items():
+        for ability in race.get("ability_score_increase", {}):
+            if ability not in ABILITIES:
+                issues.append(f"{name}: unbekanntes Attribut {ability}")
+    return issues
+
+
+# --- Stapelverarbeitung ---
+
+def _run_chunk(specs, keep):
+    started = time.perf_counter()
+    results = []
+    for spec in specs:
+        issues = []
+        character = generate_character(spec, issues)
+        validate_character(character, issues)
+        results.append((spec, issues, character if keep else None))
+    return results, time.perf_counter() - started
+
+
+def run_batch(specs, workers=None, keep=False, chunk_size=CHUNK_SIZE):
+    """
+    Erzeugt und prüft alle specs und gibt einen Bericht mit Durchsatz zurück.
+
+    keep=True liefert die Charaktere unter "characters" mit. workers=1
+    rechnet im aufrufenden Prozess.
+    """
+    import data_manager  # noqa: F401  (vor dem Fork laden, damit Worker die DB nicht neu aufbauen)
+
+    chunks = [specs[i:i + chunk_size] for i in range(0, len(specs), chunk_size)]
+    workers = workers or os.cpu_count() or 1
+    started = time.perf_counter()
+    if workers == 1 or len(chunks) <= 1 or "fork" not in multiprocessing.get_all_start_methods():
+        outputs = [_run_chunk(chunk, keep) for chunk in chunks]
+    else:
+        context = multiprocessing.get_context("fork")
+        with ProcessPoolExecutor(max_workers=min(workers, len(chunks)), mp_context=context) as pool:
+            outputs = list(pool.map(_run_chunk, chunks, [keep] * len(chunks)))
+    elapsed = time.perf_counter() - started
+
+    issue_counts, examples, characters = {}, {}, []
+    for results, _ in outputs:
+        for spec, issues, character in results:
+            for issue in issues:
+                issue_counts[issue] = issue_counts.get(issue, 0) + 1
+                examples.setdefault(issue, spec)
+            if keep:
+                characters.append(character)
+    level_ups = sum(spec.level - 1 for spec in specs)
+    return {
+        "characters": characters,
+        "count": len(specs),
+        "level_ups": level_ups,
+        "seconds": elapsed,
+        "cpu_seconds": sum(seconds for _, seconds in outputs),
+        "characters_per_second": len(specs) / elapsed if elapsed else float("inf"),
+        "level_ups_per_second": level_ups / elapsed if elapsed else float("inf"),
+        "issues": issue_counts,
+        "examples": examples,
+    }
+
+
+def format_report(report, data_issues=()):
+    lines = [
+        f"{report['count']} Charaktere, {report['level_ups']} Stufenaufstiege in {report['seconds']:.2f}s "
+        f"({report['characters_per_second']:.0f} Charaktere/s, {report['level_ups_per_second']:.0f} Aufstiege/s)",
+    ]
+    if data_issues:
+        lines.append(f"Datenprobleme ({len(data_issues)}):")
+        lines += [f"  {issue}" for issue in data_issues]
+    if report["issues"]:
+        lines.append(f"Charakterprobleme ({len(report['issues'])} Arten):")
+        for issue, count in sorted(report["issues"].items(), key=lambda item: -item[1]):
+            lines.append(f"  {count:5}x {issue}  (z.B. {report['examples'][issue]!r})")
+    if not data_issues and not report["issues"]:
+        lines.append("Keine Probleme gefunden.")
+    return "\n".join(lines)
+
+
+def save_characters(characters, directory):
+    """Speichert Charaktere wie der Charakterbogen als <name>.char."""
+    os.makedirs(directory, exist_ok=True)
+    for character in characters:
+        filename = f"{character.name.lower().replace(' ', '_')}.char"
+        with open(os.path.join(directory, filename), "wb") as f:
+            pickle.dump(character, f)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Charaktere ohne Oberfläche erzeugen und prüfen")
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument("--all", action="store_true", help="Alle Rassen x Klassen x Stufen (Standard)")
+    source.add_argument("--random", type=int, metavar="N", help="N zufällige Charaktere")
+    source.add_argument("--spec", help="JSON-Datei mit [{race, class, level, seed, name}, ...]")
+    parser.add_argument("--max-level", type=int, default=MAX_LEVEL)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--save", metavar="ORDNER", help="Erzeugte Charaktere als .char speichern")
+    parser.add_argument("--strict", action="store_true", help="Exit-Code 1 bei gefundenen Problemen")
+    args = parser.parse_args(argv)
+
+    if args.spec:
+        with open(args.spec, encoding="utf-8") as f:
+            specs = [CharacterSpec.from_dict(entry) for entry in json.load(f)]
+    elif args.random:
+        specs = random_specs(args.random, args.seed, args.max_level)
+    else:
+        specs = all_specs(range(1, args.max_level + 1), args.seed)
+
+    data_issues = validate_data()
+    report = run_batch(specs, args.workers, keep=bool(args.save))
+    print(format_report(report, data_issues))
+    if args.save:
+        save_characters(report["characters"], args.save)
+        print(f"{len(report['characters'])} Charaktere gespeichert in {args.save}")
+    return 1 if args.strict and (data_issues or report["issues"]) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
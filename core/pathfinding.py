@@ -0,0 +1,223 @@
+"""
+Bewegungsreichweite und Wege auf einer BattleMap.
+
+Bewegt wird in acht Richtungen, ein Feld kostet 1 (auch diagonal, wie in
+den Grundregeln), Türen sind begehbar, Wände nicht. Diagonal zwischen zwei
+Wänden hindurch geht es nicht. Felder mit anderen Figuren sind blockiert.
+
+Die Reichweite einer Figur ist ein begrenzter Dijkstra ab ihrem Feld und
+wird pro Zug zwischengespeichert. Ändert sich ein Feld (Figur bewegt,
+Tür geschlossen), werden nur die Einträge verworfen, deren Reichweite
+dieses Feld überhaupt erreichen konnte.
+"""
+import heapq
+
+SQUARE_SIZE_METERS = 1.5
+NEIGHBOURS = ((-1, 0), (1, 0), (0, -1), (0, 1), (-1, -1), (-1, 1), (1, -1), (1, 1))
+DEFAULT_TILE_COSTS = {"Floor": 1, "Door": 1, "OpenDoor": 1}
+
+
+def squares_for_speed(speed):
+    """Bewegungsrate in Metern -> Anzahl Felder (wie im Charakterbogen)."""
+    return int(speed / SQUARE_SIZE_METERS)
+
+
+class MovementRange:
+    """Ergebnis einer Reichweitensuche: Kosten und Vorgänger je erreichbarem Feld."""
+
+    def __init__(self, origin, budget, cols, costs, parents):
+        self.origin = origin
+        self.budget = budget
+        self._cols = cols
+        self._costs = costs
+        self._parents = parents
+
+    def __contains__(self, tile):
+        return tile[0] * self._cols + tile[1] in self._costs
+
+    def __len__(self):
+        return len(self._costs)
+
+    def tiles(self):
+        return [divmod(index, self._cols) for index in self._costs]
+
+    def cost_to(self, tile):
+        return self._costs.get(tile[0] * self._cols + tile[1])
+
+    def path_to(self, tile):
+        """Weg vom Startfeld bis tile (einschließlich beider Enden) oder None."""
+        index = tile[0] * self._cols + tile[1]
+        if index not in self._costs:
+            return None
+        path = []
+        while index is not None:
+            path.append(divmod(index, self._cols))
+            index = self._parents[index]
+        path.reverse()
+        return path
+
+
+class MovementEngine:
+    """Verwaltet Figuren auf einer Karte und berechnet ihre Bewegungsreichweiten."""
+
+    def __init__(self, battle_map, tile_costs=None):
+        self.map = battle_map
+        self.tile_costs = dict(DEFAULT_TILE_COSTS if tile_costs is None else tile_costs)
+        self.positions = {}
+        self._occupied = {}
+        self._cache = {}
+        self._rebuild_costs()
+        for (row, col), name in battle_map.objects.items():
+            if name not in self.positions:
+                self.positions[name] = (row, col)
+                self._occupied[row * battle_map.cols + col] = name
+
+    def _rebuild_costs(self):
+        # Flache Kostentabelle je Feld: 0 = nicht begehbar.
+        lookup = bytes(min(255, self.tile_costs.get(name, 0)) for name in self.map.palette).ljust(256, b"\0")
+        self._costs = bytearray(self.map.tiles.ravel().tobytes().translate(lookup))
+
+    # --- Figuren und Karte ändern ---
+
+    def place_token(self, token_id, tile):
+        if token_id in self.positions:
+            self.remove_token(token_id)
+        self.positions[token_id] = tile
+        self._occupied[tile[0] * self.map.cols + tile[1]] = token_id
+        self.map.set_object(tile[0], tile[1], token_id)
+        self._invalidate(tile)
+
+    def remove_token(self, token_id):
+        tile = self.positions.pop(token_id, None)
+        if tile is None:
+            return
+        self._occupied.pop(tile[0] * self.map.cols + tile[1], None)
+        self.map.set_object(tile[0], tile[1], None)
+        self._invalidate(tile)
+
+    def move_token(self, token_id, tile):
+        """Bewegt eine Figur und verwirft nur die betroffenen Reichweiten."""
+        source = self.positions[token_id]
+        if source == tile:
+            return
+        self._occupied.pop(source[0] * self.map.cols + source[1], None)
+        self._occupied[tile[0] * self.map.cols + tile[1]] = token_id
+        self.positions[token_id] = tile
+        self.map.move_object(source, tile)
+        self._invalidate(source)
+        self._invalidate(tile)
+
+    def set_tile(self, row, col, tile_type):
+        """Ändert eine Kachel (z.B. Tür -> Wand) und aktualisiert nur dieses Feld."""
+        self.map.set_tile(row, col, tile_type)
+        self._costs[row * self.map.cols + col] = min(255, self.tile_costs.get(tile_type, 0))
+        self._invalidate((row, col))
+
+    def new_turn(self):
+        """Neuer Zug: alle zwischengespeicherten Reichweiten verwerfen."""
+        self._cache.clear()
+
+    def _invalidate(self, tile):
+        row, col = tile
+        stale = [token_id for token_id, result in self._cache.items()
+                 if token_id not in self.positions
+                 or max(abs(result.origin[0] - row), abs(result.origin[1] - col)) <= result.budget + 1]
+        for token_id in stale:
+            del self._cache[token_id]
+
+    # --- Abfragen ---
+
+    def is_walkable(self, tile):
+        row, col = tile
+        if not self.map.in_bounds(row, col):
+            return False
+        index = row * self.map.cols + col
+        return bool(self._costs[index]) and index not in self._occupied
+
+    def movement_range(self, token_id, budget):
+        """Alle Felder, die die Figur mit budget Feldern Bewegung erreichen kann (zwischengespeichert)."""
+        cached = self._cache.get(token_id)
+        if cached is not None and cached.budget == budget and cached.origin == self.positions[token_id]:
+            return cached
+        result = self._search(self.positions[token_id], budget)
+        self._cache[token_id] = result
+        return result
+
+    def movement_ranges(self, budgets):
+        """Reichweiten für viele Figuren auf einmal, z.B. {token_id: felder} zum Hervorheben."""
+        return {token_id: self.movement_range(token_id, budget) for token_id, budget in budgets.items()}
+
+    def _search(self, origin, budget):
+        rows, cols = self.map.rows, self.map.cols
+        costs, occupied = self._costs, self._occupied
+        start = origin[0] * cols + origin[1]
+        best = {start: 0}
+        parents = {start: None}
+        heap = [(0, start)]
+        while heap:
+            spent, index = heapq.heappop(heap)
+            if spent > best[index]:
+                continue
+            row, col = divmod(index, cols)
+            for d_row, d_col in NEIGHBOURS:
+                n_row, n_col = row + d_row, col + d_col
+                if n_row < 0 or n_row >= rows or n_col < 0 or n_col >= cols:
+                    continue
+                neighbour = n_row * cols + n_col
+                step = costs[neighbour]
+                if not step or neighbour in occupied:
+                    continue
+                if d_row and d_col and not (costs[row * cols + n_col] or costs[n_row * cols + col]):
+                    continue
+                total = spent + step
+                if total > budget or total >= best.get(neighbour, budget + 1):
+                    continue
+                best[neighbour] = total
+                parents[neighbour] = index
+                heapq.heappush(heap, (total, neighbour))
+        return MovementRange(origin, budget, cols, best, parents)
+
+    def find_path(self, start, goal, max_cost=None):
+        """Kürzester Weg von start nach goal (A*, Tschebyschow-Heuristik) oder None."""
+        if start == goal:
+            return [start]
+        if not self.is_walkable(goal):
+            return None
+        rows, cols = self.map.rows, self.map.cols
+        costs, occupied = self._costs, self._occupied
+        goal_row, goal_col = goal
+        start_index = start[0] * cols + start[1]
+        goal_index = goal_row * cols + goal_col
+        best = {start_index: 0}
+        parents = {start_index: None}
+        heap = [(max(abs(start[0] - goal_row), abs(start[1] - goal_col)), 0, start_index)]
+        while heap:
+            _, spent, index = heapq.heappop(heap)
+            if index == goal_index:
+                path = []
+                while index is not None:
+                    path.append(divmod(index, cols))
+                    index = parents[index]
+                path.reverse()
+                return path
+            if spent > best[index]:
+                continue
+            row, col = divmod(index, cols)
+            for d_row, d_col in NEIGHBOURS:
+                n_row, n_col = row + d_row, col + d_col
+                if n_row < 0 or n_row >= rows or n_col < 0 or n_col >= cols:
+                    continue
+                neighbour = n_row * cols + n_col
+                step = costs[neighbour]
+                if not step or neighbour in occupied:
+                    continue
+                if d_row and d_col and not (costs[row * cols + n_col] or costs[n_row * cols + col]):
+                    continue
+                total = spent + step
+                if (max_cost is not None and total > max_cost) or total >= best.get(neighbour, float("inf")):
+                    continue
+                best[neighbour] = total
+                parents[neighbour] = index
+                estimate = total + max(abs(n_row - goal_row), abs(n_col - goal_col))
+                heapq.heappush(heap, (estimate, total, neighbour))
+        return None
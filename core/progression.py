@@ -0,0 +1,168 @@
+"""
+Kompilierte Klassenprogression.
+
+compile_progressions() wandelt CLASS_DATA einmal beim Laden in dichte,
+nach Stufe indizierte Tabellen um (Zauberplätze, bekannte Zaubertricks und
+Zauber, höchster Zaubergrad, neue Merkmale, Attributswerterhöhungen) und
+prüft sie dabei. Level-Aufstieg, Charaktererstellung und Generator fragen
+nur noch diese Tabellen ab, statt die JSON-Progression bei jedem Popup neu
+zu durchlaufen. Die Sonderregeln der vorbereitenden Zauberwirker stehen nur
+hier.
+
+Dieses Modul importiert data_manager nicht; data_manager stellt die fertigen
+Tabellen als CLASS_PROGRESSIONS bereit.
+"""
+import numpy as np
+
+MAX_LEVEL = 20
+SPELL_LEVELS = 9
+
+# Vorbereitende Zauberwirker: Attribut und ob die halbe Stufe zählt.
+PREPARED_CASTERS = {
+    "Kleriker": ("Weisheit", False),
+    "Druide": ("Weisheit", False),
+    "Paladin": ("Charisma", True),
+}
+# Klassen, die beim Aufstieg einen bekannten Zauber austauschen dürfen.
+SPELL_REPLACERS = ("Barde",)
+ABILITY_INCREASE = "Attributswerterhöhung"
+
+
+class ClassProgression:
+    """Progression einer Klasse als Arrays mit Index = Stufe (0 bleibt leer)."""
+
+    def __init__(self, name, class_data, max_level=MAX_LEVEL):
+        self.name = name
+        self.hit_die = class_data.get("hit_die", 8)
+        features = class_data.get("features", {})
+        progression = class_data.get("progression", {})
+        self.max_level = max([max_level, *features, *progression])
+        size = self.max_level + 1
+
+        self.slots = np.zeros((size, SPELL_LEVELS + 1), dtype=np.int16)  # [stufe, zaubergrad]
+        self.cantrips_known = np.zeros(size, dtype=np.int16)
+        self.spells_known = np.zeros(size, dtype=np.int16)
+        self.has_progression = np.zeros(size, dtype=bool)
+        for level, entry in progression.items():
+            self.has_progression[level] = True
+            self.cantrips_known[level] = entry.get("cantrips_known", 0)
+            self.spells_known[level] = entry.get("spells_known") or 0
+            for spell_level, count in entry.get("spell_slots", {}).items():
+                self.slots[level, int(spell_level)] = count
+        has_slots = self.slots[:, 1:] > 0
+        self.max_spell_level = np.where(has_slots.any(axis=1), SPELL_LEVELS - has_slots[:, ::-1].argmax(axis=1), 0)
+        # Die Datei kennt die Plätze als Dictionary mit Texten als Schlüssel; einmal vorbereitet.
+        self._slot_dicts = [progression.get(level, {}).get("spell_slots", {}) for level in range(size)]
+
+        self.new_features = [tuple(features.get(level, ())) for level in range(size)]
+        self.features = [()]
+        for level in range(1, size):
+            self.features.append(self.features[-1] + self.new_features[level])
+        self.ability_increase = np.array([any(ABILITY_INCREASE in f["name"] for f in level_features)
+                                          for level_features in self.new_features])
+        self.feature_names = frozenset(f["name"] for level_features in self.new_features for f in level_features)
+
+        self.spell_list = {level: tuple(spells) for level, spells in class_data.get("spell_list", {}).items()}
+        self.is_caster = bool(self.has_progression.any())
+        self.preparation = PREPARED_CASTERS.get(name)
+        self.replaces_spells = name in SPELL_REPLACERS
+
+    # --- Abfragen ---
+
+    def clamp(self, level):
+        return max(0, min(level, self.max_level))
+
+    def spell_slots(self, level):
+        """Zauberplätze einer Stufe als neues Dictionary {"1": anzahl, ...} für den Charakter."""
+        return dict(self._slot_dicts[self.clamp(level)])
+
+    def features_up_to(self, level):
+        return self.features[self.clamp(level)]
+
+    def features_at(self, level):
+        return self.new_features[level] if 0 <= level <= self.max_level else ()
+
+    def gains_ability_increase(self, level):
+        return 0 <= level <= self.max_level and bool(self.ability_increase[level])
+
+    def spells_to_prepare(self, level, ability_modifier):
+        """Anzahl vorbereiteter Zauber eines vorbereitenden Zauberwirkers (0 ohne Zauberplätze)."""
+        if self.max_spell_level[self.clamp(level)] == 0:
+            return 0
+        _, half_level = self.preparation
+        return max(1, ability_modifier + (level // 2 if half_level else level))
+
+    def preparation_modifier(self, abilities):
+        return (abilities[self.preparation[0]] - 10) // 2
+
+    def initial_spells(self, abilities):
+        """(Zaubertricks, Zauber des 1. Grades) bei der Charaktererstellung."""
+        if not self.has_progression[1]:
+            return 0, 0
+        spells = int(self.spells_known[1])
+        if self.preparation:
+            spells = self.spells_to_prepare(1, self.preparation_modifier(abilities))
+        return int(self.cantrips_known[1]), spells
+
+    def spells_to_learn(self, level, abilities):
+        """(neue Zaubertricks, neue Zauber) beim Aufstieg von level auf level + 1."""
+        new_level = level + 1
+        if new_level > self.max_level or not (self.has_progression[level] and self.has_progression[new_level]):
+            return 0, 0
+        cantrips = int(self.cantrips_known[new_level] - self.cantrips_known[level])
+        if self.preparation:
+            modifier = self.preparation_modifier(abilities)
+            spells = self.spells_to_prepare(new_level, modifier) - self.spells_to_prepare(level, modifier)
+        else:
+            spells = int(self.spells_known[new_level] - self.spells_known[level])
+        return max(0, cantrips), max(0, spells)
+
+    def has_spell_choices(self, level):
+        """Gibt es beim Aufstieg auf level überhaupt etwas zu wählen?"""
+        return 0 < level <= self.max_level and bool(self.has_progression[level]) and self.is_caster
+
+    # --- Prüfung ---
+
+    def validate(self, spell_data=None):
+        issues = []
+        if not self.is_caster:
+            if self.spell_list:
+                issues.append(f"{self.name}: Zauberliste, aber keine Progression")
+            return issues
+        missing = [level for level in range(1, MAX_LEVEL + 1) if not self.has_progression[level]]
+        if missing:
+            issues.append(f"{self.name}: Progression fehlt für Stufe {missing}")
+        if not self.spell_list:
+            issues.append(f"{self.name}: Progression, aber keine Zauberliste")
+        if np.any(np.diff(self.cantrips_known[self.has_progression]) < 0):
+            issues.append(f"{self.name}: Anzahl Zaubertricks sinkt mit der Stufe")
+        if not self.preparation and np.any(np.diff(self.spells_known[self.has_progression]) < 0):
+            issues.append(f"{self.name}: Anzahl bekannter Zauber sinkt mit der Stufe")
+        for spell_level in set(self.max_spell_level[1:]) - {0}:
+            if not self.spell_list.get(int(spell_level)):
+                issues.append(f"{self.name}: Zauberplätze Grad {spell_level}, aber keine Zauber")
+        if spell_data is not None:
+            for spell_level, spells in self.spell_list.items():
+                for spell in spells:
+                    if spell not in spell_data:
+                        issues.append(f"{self.name}: unbekannter Zauber {spell}")
+                    elif spell_data[spell].get("level") != spell_level:
+                        issues.append(f"{self.name}: {spell} steht unter Grad {spell_level}")
+        return issues
+
+
+def compile_progressions(class_data, spell_data=None):
+    """Kompiliert alle Klassen; Probleme werden einmal beim Laden ausgegeben."""
+    progressions = {name: ClassProgression(name, data) for name, data in class_data.items()}
+    for progression in progressions.values():
+        for issue in progression.validate(spell_data):
+            print(f"Progression: {issue}")
+    return progressions
+
+
+def all_feature_names(progressions):
+    """Namen aller Klassenmerkmale; alles andere in Character.features ist ein eigenes Merkmal."""
+    names = set()
+    for progression in progressions.values():
+        names |= progression.feature_names
+    return frozenset(names)
@@ -0,0 +1,259 @@
+"""
+Monte-Carlo-Kampfsimulation zum Ausbalancieren von Begegnungen.
+
+Alle Durchläufe einer Simulation laufen gleichzeitig als NumPy-Arrays
+(Durchläufe x Kämpfer); Python-Schleifen gibt es nur über Runden und
+Zugpositionen. Große Simulationen werden in Blöcke geteilt und auf einen
+Prozess-Pool verteilt, jeder Block mit eigenem Seed aus einer SeedSequence,
+so dass ein Ergebnis mit gleichem Seed reproduzierbar bleibt.
+
+Das Modell ist bewusst einfach: Jeder greift pro Zug mit seinem besten
+Angriff einen zufälligen lebenden Gegner an (natürliche 20 = kritisch,
+natürliche 1 = Fehlschlag). Spieler auf 0 TP gelten als kampfunfähig,
+Zauber und Rettungswürfe gegen den Tod werden nicht simuliert.
+
+Dieses Modul importiert data_manager nur bei Bedarf, damit Worker-Prozesse
+die Datenbank nicht neu aufbauen.
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from core.dice import parse
+
+PARTY = 0
+ENEMIES = 1
+MAX_ROUNDS = 50
+CHUNK_SIZE = 25_000
+DEFAULT_ENEMY_ATTACK_BONUS = 3
+
+
+class CombatantSpec:
+    """Kampfwerte eines Teilnehmers, klein und picklebar für Worker-Prozesse."""
+
+    def __init__(self, name, side, hp, armor_class, attack_bonus, damage, attacks=1, initiative=0):
+        self.name = name
+        self.side = side
+        self.hp = int(hp)
+        self.armor_class = int(armor_class)
+        self.attack_bonus = int(attack_bonus)
+        self.damage = damage
+        self.attacks = int(attacks)
+        self.initiative = int(initiative)
+
+    def __repr__(self):
+        return f"CombatantSpec({self.name!r}, hp={self.hp}, ac={self.armor_class}, +{self.attack_bonus}, {self.damage})"
+
+
+def spec_from_character(character):
+    from data_manager import WEAPON_DATA
+
+    weapon = WEAPON_DATA.get(character.equipped_weapon, WEAPON_DATA["Unbewaffneter Schlag"])
+    modifier = (character.abilities[weapon["ability"]] - 10) // 2
+    extra_attacks = sum(1 for f in character.features if f.get("name", "").startswith("Zusätzlicher Angriff"))
+    return CombatantSpec(
+        character.name, PARTY, character.max_hit_points, character.armor_class,
+        character.get_proficiency_bonus() + modifier, f"{weapon['damage']}{modifier:+d}",
+        attacks=1 + extra_attacks, initiative=character.initiative,
+    )
+
+
+def spec_from_enemy(enemy):
+    """Nimmt den Angriff mit dem höchsten Erwartungsschaden; bei Mehrfachangriff entsprechend oft."""
+    best, best_mean = None, -1.0
+    for attack in enemy.attacks:
+        try:
+            mean = parse(attack.get("damage", "1")).mean
+        except ValueError:
+            continue
+        if mean > best_mean:
+            best, best_mean = attack, mean
+    if best is None:
+        best = {"damage": "1", "bonus": DEFAULT_ENEMY_ATTACK_BONUS}
+    attacks = len(enemy.attacks) if "Mehrfachangriff" in enemy.notes and enemy.attacks else 1
+    return CombatantSpec(
+        enemy.name, ENEMIES, enemy.hp, enemy.armor_class, best.get("bonus", DEFAULT_ENEMY_ATTACK_BONUS),
+        best.get("damage", "1"), attacks=attacks, initiative=(getattr(enemy, "dexterity", 10) - 10) // 2,
+    )
+
+
+def _damage_table(specs, critical):
+    """Gepolsterte CDF-Matrix je Kämpfer für vektorisiertes Ziehen aus exakten Verteilungen."""
+    distributions = []
+    for spec in specs:
+        expression = parse(spec.damage)
+        distributions.append((expression.critical() if critical else expression).distribution_array())
+    width = max(len(probs) for _, probs in distributions)
+    cdf = np.ones((len(specs), width))
+    lows = np.zeros(len(specs), dtype=np.int64)
+    for i, (low, probs) in enumerate(distributions):
+        cdf[i, :len(probs)] = np.cumsum(probs)
+        lows[i] = low
+    cdf[:, -1] = 1.0
+    return lows, cdf
+
+
+def simulate_chunk(specs, trials, seed, max_rounds=MAX_ROUNDS):
+    """Simuliert trials Kämpfe auf einmal und gibt aufsummierte Kennzahlen zurück."""
+    rng = np.random.default_rng(seed)
+    n = len(specs)
+    side = np.array([s.side for s in specs])
+    armor = np.array([s.armor_class for s in specs])
+    bonus = np.array([s.attack_bonus for s in specs])
+    attacks = np.array([s.attacks for s in specs])
+    max_hp = np.array([s.hp for s in specs])
+    lows, cdf = _damage_table(specs, critical=False)
+    crit_lows, crit_cdf = _damage_table(specs, critical=True)
+
+    party = side == PARTY
+    opponents = side[None, :] != side[:, None]  # opponents[a] = Gegner von Kämpfer a
+    initiative = rng.integers(1, 21, size=(trials, n)) + np.array([s.initiative for s in specs])
+    # Gleichstand: zufällig, aber reproduzierbar
+    order = np.lexsort((rng.random((trials, n)), -initiative), axis=1)
+
+    final_hp = np.tile(max_hp, (trials, 1))
+    final_dealt = np.zeros((trials, n), dtype=np.int64)
+    rounds = np.full(trials, max_rounds)
+    winner = np.full(trials, -1)
+
+    # Laufender Zustand nur für noch nicht entschiedene Kämpfe; am Rundenende
+    # werden entschiedene Kämpfe herausgeschrieben und entfernt.
+    trial_ids = np.arange(trials)
+    hp = final_hp.copy()
+    dealt = final_dealt.copy()
+    done = np.zeros(trials, dtype=bool)
+
+    for round_number in range(1, max_rounds + 1):
+        rows = np.arange(len(trial_ids))
+        for slot in range(n):
+            actor = order[:, slot]
+            acting = ~done & (hp[rows, actor] > 0)
+            for swing in range(int(attacks.max())):
+                sel = np.flatnonzero(acting & (attacks[actor] > swing))
+                if not sel.size:
+                    break
+                a = actor[sel]
+                candidates = opponents[a] & (hp[sel] > 0)
+                has_target = candidates.any(axis=1)
+                sel, a, candidates = sel[has_target], a[has_target], candidates[has_target]
+                target = np.where(candidates, rng.random(candidates.shape), -1.0).argmax(axis=1)
+
+                d20 = rng.integers(1, 21, size=sel.size)
+                crit = d20 == 20
+                hit = crit | ((d20 != 1) & (d20 + bonus[a] >= armor[target]))
+                u = rng.random(sel.size)
+                damage = lows[a] + (cdf[a] < u[:, None]).sum(axis=1)
+                if crit.any():
+                    damage[crit] = crit_lows[a[crit]] + (crit_cdf[a[crit]] < u[crit, None]).sum(axis=1)
+                damage = np.where(hit, np.maximum(1, damage), 0)
+                damage = np.minimum(damage, hp[sel, target])
+                hp[sel, target] -= damage
+                dealt[sel, a] += damage
+
+            party_alive = (hp[:, party] > 0).any(axis=1)
+            enemies_alive = (hp[:, ~party] > 0).any(axis=1)
+            newly = ~done & ~(party_alive & enemies_alive)
+            if newly.any():
+                winner[trial_ids[newly]] = np.where(party_alive[newly], PARTY, ENEMIES)
+                rounds[trial_ids[newly]] = round_number
+                done |= newly
+
+        if done.any():
+            final_hp[trial_ids[done]] = hp[done]
+            final_dealt[trial_ids[done]] = dealt[done]
+            keep = ~done
+            trial_ids, hp, dealt, order, done = trial_ids[keep], hp[keep], dealt[keep], order[keep], done[keep]
+        if not len(trial_ids):
+            break
+    final_hp[trial_ids] = hp
+    final_dealt[trial_ids] = dealt
+
+    finished = winner >= 0
+    party_won = winner == PARTY
+    return {
+        "trials": trials,
+        "party_wins": int(party_won.sum()),
+        "enemy_wins": int((winner == ENEMIES).sum()),
+        "rounds_sum": int(rounds[finished].sum()),
+        "rounds_histogram": np.bincount(rounds, minlength=max_rounds + 1).tolist(),
+        "damage_dealt_sum": final_dealt.sum(axis=0).tolist(),
+        "party_hp_lost_sum": int((max_hp[party] - final_hp[:, party]).sum()),
+        "party_downs_sum": int((final_hp[:, party] == 0).sum()),
+        "party_hp_lost_on_win_sum": int((max_hp[party] - final_hp[party_won][:, party]).sum()),
+    }
+
+
+def _merge(results):
+    merged = dict(results[0])
+    for result in results[1:]:
+        for key, value in result.items():
+            if isinstance(value, list):
+                merged[key] = [a + b for a, b in zip(merged[key], value)]
+            else:
+                merged[key] += value
+    return merged
+
+
+def simulate_encounter(party, enemies, trials=10_000, seed=None, workers=None, max_rounds=MAX_ROUNDS):
+    """
+    Simuliert eine Begegnung trials-mal und gibt einen Bericht zurück.
+
+    party und enemies dürfen Character-/Enemy-Objekte oder CombatantSpecs
+    sein. workers=1 rechnet im aufrufenden Prozess (z.B. auf Android),
+    None nimmt so viele Prozesse wie CPU-Kerne.
+    """
+    specs = [p if isinstance(p, CombatantSpec) else spec_from_character(p) for p in party]
+    specs += [e if isinstance(e, CombatantSpec) else spec_from_enemy(e) for e in enemies]
+    if not any(s.side == PARTY for s in specs) or not any(s.side == ENEMIES for s in specs):
+        raise ValueError("Es werden Spieler und Gegner benötigt")
+
+    chunks = [CHUNK_SIZE] * (trials // CHUNK_SIZE)
+    if trials % CHUNK_SIZE:
+        chunks.append(trials % CHUNK_SIZE)
+    seeds = np.random.SeedSequence(seed).spawn(len(chunks))
+    workers = workers or os.cpu_count() or 1
+
+    if workers == 1 or len(chunks) == 1:
+        results = [simulate_chunk(specs, size, s, max_rounds) for size, s in zip(chunks, seeds)]
+    else:
+        with ProcessPoolExecutor(max_workers=min(workers, len(chunks))) as pool:
+            results = list(pool.map(simulate_chunk, [specs] * len(chunks), chunks, seeds,
+                                    [max_rounds] * len(chunks)))
+    return _build_report(specs, _merge(results))
+
+
+def _build_report(specs, totals):
+    trials = totals["trials"]
+    finished = totals["party_wins"] + totals["enemy_wins"]
+    histogram = np.array(totals["rounds_histogram"])
+    cumulative = np.cumsum(histogram) / max(1, histogram.sum())
+    party_wins = totals["party_wins"]
+    return {
+        "trials": trials,
+        "party_win_rate": party_wins / trials,
+        "enemy_win_rate": totals["enemy_wins"] / trials,
+        "undecided_rate": (trials - finished) / trials,
+        "rounds_mean": totals["rounds_sum"] / finished if finished else float("nan"),
+        "rounds_median": int(np.searchsorted(cumulative, 0.5)),
+        "rounds_p90": int(np.searchsorted(cumulative, 0.9)),
+        "damage_dealt_mean": {s.name: d / trials for s, d in zip(specs, totals["damage_dealt_sum"])},
+        "party_hp_lost_mean": totals["party_hp_lost_sum"] / trials,
+        "party_hp_lost_on_win_mean": totals["party_hp_lost_on_win_sum"] / party_wins if party_wins else float("nan"),
+        "party_hp_total": sum(s.hp for s in specs if s.side == PARTY),
+        "party_downs_mean": totals["party_downs_sum"] / trials,
+    }
+
+
+def format_report(report):
+    """Kurze Zusammenfassung für ein Popup im DM-Bereich."""
+    lines = [
+        f"Siegchance der Gruppe: {report['party_win_rate'] * 100:.1f}% ({report['trials']} Kämpfe)",
+        f"Runden: Ø {report['rounds_mean']:.1f}, Median {report['rounds_median']}, 90% bis {report['rounds_p90']}",
+        f"TP-Verlust der Gruppe: Ø {report['party_hp_lost_mean']:.1f} von {report['party_hp_total']}",
+        f"Kampfunfähige Spieler: Ø {report['party_downs_mean']:.2f}",
+        "Schaden pro Kampf:",
+    ]
+    for name, damage in report["damage_dealt_mean"].items():
+        lines.append(f"  {name}: {damage:.1f}")
+    return "\n".join(lines)
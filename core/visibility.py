@@ -0,0 +1,191 @@
+"""
+Sichtlinien und Nebel des Krieges für die BattleMap.
+
+Die Sicht jeder Figur wird mit symmetrischem Shadowcasting berechnet
+(wer A sieht, wird auch von A gesehen). Wände und geschlossene Türen
+("Door") blockieren die Sicht, offene Türen ("OpenDoor") und Figuren nicht.
+Alle Steigungen werden als ganzzahlige Brüche gerechnet, damit die
+Ergebnisse nicht von Rundungsfehlern abhängen.
+
+Jede Figur hat eine flache boolesche Sichtmaske. Ändert sich eine Kachel,
+werden nur die Figuren neu berechnet, die diese Kachel gerade sehen;
+bewegt sich eine Figur, nur diese. Für die Spieler wird daraus je Client
+eine Nebelmaske (schon einmal gesehen) geführt, die als gepacktes,
+zlib-komprimiertes Bitset verschickt wird.
+
+Das Shadowcasting selbst läuft je Figur in reinem Python; es verzweigt an
+jeder Wand und lässt sich nicht sinnvoll über viele Figuren vektorisieren.
+NumPy bündelt erst die fertigen Masken (visible_stack, visible_union und die
+Nebelmasken). Den Großteil der Zeit spart, dass nur betroffene Figuren neu
+gerechnet werden.
+"""
+import struct
+import zlib
+
+import numpy as np
+
+OPAQUE_TYPES = {"Wall", "Door"}
+DOOR_CLOSED = "Door"
+DOOR_OPEN = "OpenDoor"
+
+_FOG_HEADER = struct.Struct("<II")
+
+# (Zeile, Spalte) je Quadrant: Tiefe geht nach außen, Spalte quer dazu.
+_QUADRANTS = (
+    (-1, 0, 0, 1),  # Norden: zeile - tiefe, spalte + col
+    (1, 0, 0, 1),   # Süden
+    (0, 1, 1, 0),   # Osten: zeile + col, spalte + tiefe
+    (0, -1, 1, 0),  # Westen
+)
+
+
+def compute_fov(opaque, rows, cols, origin, radius=None):
+    """
+    Gibt die flachen Indizes aller sichtbaren Felder zurück.
+
+    opaque ist eine flache Bytefolge (ungleich 0 = blockiert die Sicht),
+    radius die maximale Sichtweite in Feldern (Tschebyschow) oder None.
+    """
+    o_row, o_col = origin
+    max_depth = radius if radius is not None else max(rows, cols)
+    visible = {o_row * cols + o_col}
+
+    for depth_row, depth_col, col_row, col_col in _QUADRANTS:
+        # Stapel aus (tiefe, start_zähler, start_nenner, ende_zähler, ende_nenner)
+        stack = [(1, -1, 1, 1, 1)]
+        while stack:
+            depth, s_num, s_den, e_num, e_den = stack.pop()
+            if depth > max_depth:
+                continue
+            min_col = (2 * depth * s_num + s_den) // (2 * s_den)
+            max_col = -((-(2 * depth * e_num - e_den)) // (2 * e_den))
+            prev_wall = None
+            for col in range(min_col, max_col + 1):
+                row = o_row + depth * depth_row + col * col_row
+                column = o_col + depth * depth_col + col * col_col
+                inside = 0 <= row < rows and 0 <= column < cols
+                wall = not inside or bool(opaque[row * cols + column])
+                if inside and (wall or (col * s_den >= depth * s_num and col * e_den <= depth * e_num)):
+                    visible.add(row * cols + column)
+                if prev_wall and not wall:
+                    s_num, s_den = 2 * col - 1, 2 * depth
+                if prev_wall is False and wall:
+                    stack.append((depth + 1, s_num, s_den, 2 * col - 1, 2 * depth))
+                prev_wall = wall
+            if prev_wall is False:
+                stack.append((depth + 1, s_num, s_den, e_num, e_den))
+    return visible
+
+
+def encode_fog(mask):
+    """Boolesche 2D-Maske -> komprimiertes Bitset (Kopf mit Zeilen/Spalten)."""
+    rows, cols = mask.shape
+    return _FOG_HEADER.pack(rows, cols) + zlib.compress(np.packbits(mask, axis=None).tobytes())
+
+
+def decode_fog(packet):
+    rows, cols = _FOG_HEADER.unpack_from(packet, 0)
+    bits = np.frombuffer(zlib.decompress(packet[_FOG_HEADER.size:]), dtype=np.uint8)
+    return np.unpackbits(bits, count=rows * cols).astype(bool).reshape(rows, cols)
+
+
+class VisibilityEngine:
+    """Sichtmasken für viele Figuren und Nebelmasken je Spieler-Client."""
+
+    def __init__(self, battle_map):
+        self.map = battle_map
+        self.viewers = {}
+        self._masks = {}
+        self.fog = {}
+        self.changed = set()
+        self._rebuild_opaque()
+
+    def _rebuild_opaque(self):
+        lookup = bytes(name in OPAQUE_TYPES for name in self.map.palette).ljust(256, b"\0")
+        self._opaque = bytearray(self.map.tiles.ravel().tobytes().translate(lookup))
+
+    def _compute(self, viewer_id):
+        origin, radius = self.viewers[viewer_id]
+        mask = np.zeros(self.map.rows * self.map.cols, dtype=bool)
+        indices = compute_fov(self._opaque, self.map.rows, self.map.cols, origin, radius)
+        mask[np.fromiter(indices, dtype=np.intp, count=len(indices))] = True
+        self._masks[viewer_id] = mask
+        self.changed.add(viewer_id)
+
+    # --- Figuren ---
+
+    def set_viewer(self, viewer_id, origin, radius=None):
+        """Fügt eine Figur hinzu oder bewegt sie; nur ihre Sicht wird neu berechnet."""
+        if self.viewers.get(viewer_id) == (origin, radius):
+            return
+        self.viewers[viewer_id] = (origin, radius)
+        self._compute(viewer_id)
+
+    def set_viewers(self, viewers):
+        """Mehrere Figuren setzen: {viewer_id: (feld, radius)}; jede Sicht wird einzeln berechnet."""
+        for viewer_id, (origin, radius) in viewers.items():
+            self.set_viewer(viewer_id, origin, radius)
+
+    def remove_viewer(self, viewer_id):
+        self.viewers.pop(viewer_id, None)
+        self._masks.pop(viewer_id, None)
+        self.changed.discard(viewer_id)
+
+    # --- Karte ---
+
+    def set_tile(self, row, col, tile_type):
+        """Ändert eine Kachel; neu berechnet werden nur Figuren, die sie sehen."""
+        self.map.set_tile(row, col, tile_type)
+        index = row * self.map.cols + col
+        opaque = tile_type in OPAQUE_TYPES
+        if bool(self._opaque[index]) == opaque:
+            return []
+        self._opaque[index] = opaque
+        affected = [viewer_id for viewer_id, mask in self._masks.items() if mask[index]]
+        for viewer_id in affected:
+            self._compute(viewer_id)
+        return affected
+
+    def toggle_door(self, row, col):
+        current = self.map.tile_type(row, col)
+        if current not in (DOOR_CLOSED, DOOR_OPEN):
+            return []
+        return self.set_tile(row, col, DOOR_OPEN if current == DOOR_CLOSED else DOOR_CLOSED)
+
+    # --- Abfragen ---
+
+    def visible(self, viewer_id):
+        return self._masks[viewer_id].reshape(self.map.rows, self.map.cols)
+
+    def is_visible(self, viewer_id, tile):
+        return bool(self._masks[viewer_id][tile[0] * self.map.cols + tile[1]])
+
+    def visible_stack(self, viewer_ids):
+        """Sichtmasken als (n, zeilen, spalten)-Array in der Reihenfolge von viewer_ids."""
+        if not viewer_ids:
+            return np.zeros((0, self.map.rows, self.map.cols), dtype=bool)
+        return np.stack([self._masks[v] for v in viewer_ids]).reshape(len(viewer_ids), self.map.rows, self.map.cols)
+
+    def visible_union(self, viewer_ids):
+        return self.visible_stack(viewer_ids).any(axis=0)
+
+    # --- Nebel ---
+
+    def update_fog(self, client_id, viewer_ids):
+        """Ergänzt die Nebelmaske eines Clients um alles, was seine Figuren sehen; True, wenn sie wuchs."""
+        seen = self.visible_union(viewer_ids)
+        explored = self.fog.get(client_id)
+        if explored is None:
+            self.fog[client_id] = seen
+            return bool(seen.any())
+        grew = bool((seen & ~explored).any())
+        explored |= seen
+        return grew
+
+    def fog_packet(self, client_id):
+        return encode_fog(self.fog[client_id])
+
+    def collect_changed(self):
+        """Figuren, deren Sicht sich seit dem letzten Aufruf geändert hat."""
+        changed, self.changed = self.changed, set()
+        return changed
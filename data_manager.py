@@ -1,3 +1,4 @@
+from core.progression import all_feature_names, compile_progressions
 from database import get_data_from_db, init_db
 
 # Initialize the database if it doesn't exist
@@ -14,3 +15,8 @@ RACE_DATA = _data["RACE_DATA"]
 SKILL_LIST = _data["SKILL_LIST"]
 SPELL_DATA = _data["SPELL_DATA"]
 WEAPON_DATA = _data["WEAPON_DATA"]
+
+# Dichte Progressionstabellen je Klasse, einmal beim Laden kompiliert und geprüft.
+CLASS_PROGRESSIONS = compile_progressions(CLASS_DATA, SPELL_DATA)
+# Unterscheidet Klassenmerkmale von eigenen Merkmalen (z.B. "Kampfstil: ...").
+CLASS_FEATURE_NAMES = all_feature_names(CLASS_PROGRESSIONS)
@@ -1,16 +1,32 @@
 import sqlite3
+import hashlib
 import json
 import os
 
 DATABASE_FILE = 'dnd.db'
+# Saved encounter lists are user data. dnd.db is tracked in git and reset by
+# every online update, so they live in their own untracked file.
+ENCOUNTER_FILE = 'encounters.db'
 DATA_DIR = 'data'
+# One translated spell per line, keyed by the English name; maintained by translate_spells.py.
+SPELL_STORE = 'spell_translations.jsonl'
 
-def get_db_connection():
+# Tables rebuilt from data/*.json whenever the data fingerprint changes.
+REFERENCE_TABLES = ('alignments', 'backgrounds', 'skills', 'fighting_styles', 'weapons',
+                    'spells', 'races', 'classes', 'enemies')
+
+def get_db_connection(path=None):
     """Establishes a connection to the SQLite database."""
-    conn = sqlite3.connect(DATABASE_FILE)
+    conn = sqlite3.connect(path or DATABASE_FILE)
     conn.row_factory = sqlite3.Row
     return conn
 
+def get_encounter_connection(path=None):
+    """Connection to the encounter store; creates its tables on first use."""
+    conn = get_db_connection(path or ENCOUNTER_FILE)
+    create_encounter_tables(conn)
+    return conn
+
 def create_tables(conn):
     """Creates the necessary tables in the database if they don't exist."""
     cursor = conn.cursor()
@@ -65,9 +81,87 @@ def create_tables(conn):
         spell_list TEXT,
         features TEXT NOT NULL
     )''')
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS enemies (
+        name TEXT PRIMARY KEY,
+        challenge_rating REAL NOT NULL,
+        creature_type TEXT NOT NULL,
+        armor_class INTEGER NOT NULL,
+        hp INTEGER NOT NULL,
+        stat_block TEXT NOT NULL
+    )''')
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_enemies_cr ON enemies (challenge_rating)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_enemies_type ON enemies (creature_type)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_enemies_ac ON enemies (armor_class)")
+
+    # Fingerprint of the data the reference tables were built from
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS meta (
+        key TEXT PRIMARY KEY,
+        value TEXT NOT NULL
+    )''')
 
     conn.commit()
 
+def create_encounter_tables(conn):
+    """Creates the tables for saved encounter lists (in ENCOUNTER_FILE, not dnd.db)."""
+    cursor = conn.cursor()
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS encounters (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        name TEXT NOT NULL UNIQUE,
+        notes TEXT NOT NULL DEFAULT ''
+    )''')
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS encounter_entries (
+        encounter_id INTEGER NOT NULL REFERENCES encounters (id) ON DELETE CASCADE,
+        position INTEGER NOT NULL,
+        enemy_name TEXT NOT NULL,
+        count INTEGER NOT NULL DEFAULT 1,
+        PRIMARY KEY (encounter_id, position)
+    )''')
+    conn.commit()
+
+def migrate_encounters(conn, path=None):
+    """Moves encounter lists saved in dnd.db by older versions into the encounter store."""
+    try:
+        if conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'encounters'").fetchone() is None:
+            return 0
+        encounters = conn.execute("SELECT id, name, notes FROM encounters").fetchall()
+        entries = conn.execute("SELECT encounter_id, position, enemy_name, count FROM encounter_entries").fetchall()
+    except sqlite3.DatabaseError:
+        return 0
+
+    target = get_encounter_connection(path)
+    moved = 0
+    try:
+        with target:
+            for encounter in encounters:
+                if target.execute("SELECT 1 FROM encounters WHERE name = ?", (encounter['name'],)).fetchone():
+                    continue
+                cursor = target.execute("INSERT INTO encounters (name, notes) VALUES (?, ?)",
+                                        (encounter['name'], encounter['notes']))
+                target.executemany(
+                    "INSERT INTO encounter_entries (encounter_id, position, enemy_name, count) VALUES (?, ?, ?, ?)",
+                    [(cursor.lastrowid, e['position'], e['enemy_name'], e['count'])
+                     for e in entries if e['encounter_id'] == encounter['id']])
+                moved += 1
+    finally:
+        target.close()
+    conn.execute("DROP TABLE IF EXISTS encounter_entries")
+    conn.execute("DROP TABLE IF EXISTS encounters")
+    conn.commit()
+    if moved:
+        print(f"{moved} saved encounters moved to {path or ENCOUNTER_FILE}.")
+    return moved
+
+def drop_reference_tables(conn):
+    """Drops the tables that are rebuilt from JSON, leaving user data untouched."""
+    cursor = conn.cursor()
+    for table in REFERENCE_TABLES:
+        cursor.execute(f"DROP TABLE IF EXISTS {table}")
+    conn.commit()
+
 def populate_db_from_json(conn):
     """Populates the database from JSON files."""
     cursor = conn.cursor()
@@ -81,9 +175,9 @@ def populate_db_from_json(conn):
     SKILL_LIST = load_json('skills.json')
     FIGHTING_STYLE_DATA = load_json('fighting_styles.json')
     WEAPON_DATA = load_json('weapons.json')
-    SPELL_DATA = load_json('spells_translated.json')
     RACE_DATA = load_json('races.json')
     CLASS_DATA = load_json('classes.json')
+    ENEMY_DATA = load_json('enemies.json')
 
     cursor.executemany("INSERT INTO alignments (name, description) VALUES (?, ?)", ALIGNMENT_DATA.items())
     cursor.executemany("INSERT INTO backgrounds (name, description) VALUES (?, ?)", BACKGROUND_DATA.items())
@@ -93,8 +187,7 @@ def populate_db_from_json(conn):
     weapon_list = [(name, data['damage'], data['ability']) for name, data in WEAPON_DATA.items()]
     cursor.executemany("INSERT INTO weapons (name, damage, ability) VALUES (?, ?, ?)", weapon_list)
 
-    spell_list = [(name, data['level'], data['school'], data['desc']) for name, data in SPELL_DATA.items()]
-    cursor.executemany("INSERT INTO spells (name, level, school, description) VALUES (?, ?, ?, ?)", spell_list)
+    cursor.executemany("INSERT INTO spells (name, level, school, description) VALUES (?, ?, ?, ?)", iter_spell_rows())
 
     race_list = [(name, data['speed'], json.dumps(data['ability_score_increase']), json.dumps(data['languages']), json.dumps(data['proficiencies'])) for name, data in RACE_DATA.items()]
     cursor.executemany("INSERT INTO races (name, speed, ability_score_increase, languages, proficiencies) VALUES (?, ?, ?, ?, ?)", race_list)
@@ -102,8 +195,33 @@ def populate_db_from_json(conn):
     class_list = [(name, data['hit_die'], json.dumps(data.get('proficiencies', [])), json.dumps(data.get('progression', {})), json.dumps(data.get('spell_list', {})), json.dumps(data.get('features', {}))) for name, data in CLASS_DATA.items()]
     cursor.executemany("INSERT INTO classes (name, hit_die, proficiencies, progression, spell_list, features) VALUES (?, ?, ?, ?, ?, ?)", class_list)
 
+    enemy_list = [(name, data['challenge_rating'], data['creature_type'], data['armor_class'], data['hp'], json.dumps(data, ensure_ascii=False)) for name, data in ENEMY_DATA.items()]
+    cursor.executemany("INSERT INTO enemies (name, challenge_rating, creature_type, armor_class, hp, stat_block) VALUES (?, ?, ?, ?, ?, ?)", enemy_list)
+
     conn.commit()
 
+def iter_spell_rows(path=None):
+    """Streams (name, level, school, description) rows from the spell store."""
+    with open(path or os.path.join(DATA_DIR, SPELL_STORE), 'r', encoding='utf-8') as f:
+        for line in f:
+            if line.strip():
+                record = json.loads(line)
+                yield (record['name'], record['level'], record['school'], record['desc'])
+
+def sync_spells(conn, rows=None):
+    """
+    Brings the spells table in line with the store, touching only rows that
+    differ. Returns (upserted, deleted).
+    """
+    rows = list(iter_spell_rows() if rows is None else rows)
+    current = {row['name']: (row['name'], row['level'], row['school'], row['description'])
+               for row in conn.execute("SELECT name, level, school, description FROM spells")}
+    changed = [row for row in rows if current.get(row[0]) != row]
+    removed = [(name,) for name in set(current) - {row[0] for row in rows}]
+    conn.executemany("INSERT OR REPLACE INTO spells (name, level, school, description) VALUES (?, ?, ?, ?)", changed)
+    conn.executemany("DELETE FROM spells WHERE name = ?", removed)
+    return len(changed), len(removed)
+
 def get_data_from_db():
     """Fetches all data from the database and reconstructs the dictionaries."""
     conn = get_db_connection()
@@ -157,19 +275,66 @@ def get_data_from_db():
         "CLASS_DATA": CLASS_DATA
     }
 
-def init_db():
-    """Initializes the database. Deletes the old one if it exists to ensure fresh data."""
+def data_fingerprint():
+    """Hash over data/*.json and this file, so schema or loader changes also trigger a rebuild."""
+    digest = hashlib.sha256()
+    paths = sorted(os.path.join(DATA_DIR, name) for name in os.listdir(DATA_DIR) if name.endswith('.json'))
+    for path in paths + [os.path.abspath(__file__)]:
+        digest.update(os.path.basename(path).encode('utf-8'))
+        with open(path, 'rb') as f:
+            digest.update(f.read())
+    return digest.hexdigest()
+
+def spells_fingerprint():
+    """Hash of the spell store alone; a change there only needs sync_spells(), not a rebuild."""
+    with open(os.path.join(DATA_DIR, SPELL_STORE), 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+def stored_fingerprint(conn, key='data_fingerprint'):
+    try:
+        row = conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+    except sqlite3.DatabaseError:
+        return None
+    return row['value'] if row else None
+
+def init_db(force=False):
+    """
+    Initializes the database. Reference tables are rebuilt from JSON when the
+    data fingerprint changed (or with force=True). If only the spell store
+    changed, just the affected spell rows are written. Saved encounters live
+    in ENCOUNTER_FILE and are never touched here.
+    """
+    fingerprint = data_fingerprint()
+    spells = spells_fingerprint()
+    conn = get_db_connection()
+    migrate_encounters(conn)
+    if not force and stored_fingerprint(conn) == fingerprint:
+        try:
+            if stored_fingerprint(conn, 'spells_fingerprint') == spells:
+                return False
+            upserted, deleted = sync_spells(conn)
+            conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('spells_fingerprint', ?)", (spells,))
+            conn.commit()
+            print(f"Spells updated: {upserted} written, {deleted} removed.")
+            return True
+        finally:
+            conn.close()
     try:
-        # Delete the old database file to ensure it's rebuilt with corrected data sources.
-        if os.path.exists(DATABASE_FILE):
-            os.remove(DATABASE_FILE)
-            print(f"Removed old database file: {DATABASE_FILE}")
-    except OSError as e:
-        print(f"Error removing database file: {e}")
-
-    if not os.path.exists(DATABASE_FILE):
+        drop_reference_tables(conn)
+    except sqlite3.DatabaseError as e:
+        # Unreadable file: start over with an empty database.
+        print(f"Error opening database file, recreating it: {e}")
+        conn.close()
+        os.remove(DATABASE_FILE)
         conn = get_db_connection()
+
+    try:
         create_tables(conn)
         populate_db_from_json(conn)
+        conn.executemany("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)",
+                         [('data_fingerprint', fingerprint), ('spells_fingerprint', spells)])
+        conn.commit()
+    finally:
         conn.close()
-        print("Database initialized and populated successfully from JSON files.")
+    print("Database initialized and populated successfully from JSON files.")
+    return True
@@ -1,61 +1,100 @@
 import sys
-from kivy.config import Config
+from utils.startup_profiler import start_from_environment
+from utils.update_bundle import recover_interrupted_update
 
-if sys.platform.startswith('win'):
-    Config.set('input', 'mouse', 'mouse,disable_multitouch')
-from utils.helpers import load_settings
+# Ein beim Einspielen abgebrochenes Offline-Update zurücknehmen, bevor Module daraus geladen werden.
+recover_interrupted_update()
 
-# Laden der Einstellungen, um die Tastaturkonfiguration zu bestimmen
-settings = load_settings()
-if settings.get('keyboard_enabled', False):
-    Config.set('kivy', 'keyboard_mode', 'dock')
-    # Setzt die Höhe der Bildschirmtastatur auf 600 Pixel
-    Config.set('kivy', 'keyboard_height', '600')
-else:
-    Config.set('kivy', 'keyboard_mode', '')
+# Opt-in Startprofil: DND_PROFILE_STARTUP=1 oder --profile-startup
+profiler = start_from_environment()
 
-Config.set('graphics', 'rotation', 0)
+with profiler.phase("kivy_config"):
+    from kivy.config import Config
+
+    if sys.platform.startswith('win'):
+        Config.set('input', 'mouse', 'mouse,disable_multitouch')
+    from utils.helpers import load_settings
+
+    # Laden der Einstellungen, um die Tastaturkonfiguration zu bestimmen
+    settings = load_settings()
+    if settings.get('keyboard_enabled', False):
+        Config.set('kivy', 'keyboard_mode', 'dock')
+        # Setzt die Höhe der Bildschirmtastatur auf 600 Pixel
+        Config.set('kivy', 'keyboard_height', '600')
+    else:
+        Config.set('kivy', 'keyboard_mode', '')
+
+    Config.set('graphics', 'rotation', 0)
 
 # Set window size from settings
-from kivy.core.window import Window
-Window.size = (settings.get('window_width', 1280), settings.get('window_height', 720))
-
-
-from kivy.app import App
-from kivy.lang import Builder
-from kivy.uix.screenmanager import ScreenManager
-from kivy.uix.floatlayout import FloatLayout
-from kivy.core.window import Window
-from utils.helpers import save_settings
-
-from ui.main_menu import MainMenu
-from ui.character_creator import CharacterCreator
-from ui.character_sheet import CharacterSheet
-from ui.options_screen import OptionsScreen
-from ui.level_up_screen import LevelUpScreen
-from ui.character_editor import CharacterEditor
-from ui.info_screen import InfoScreen
-from ui.settings_screen import SettingsScreen
-from ui.splash_screen import SplashScreen
-from ui.system_screen import SystemScreen
-from ui.changelog_screen import ChangelogScreen
-from ui.transfer_screen import TransferScreen
+with profiler.phase("window"):
+    from kivy.core.window import Window
+    Window.size = (settings.get('window_width', 1280), settings.get('window_height', 720))
+
+
+with profiler.phase("kivy_imports"):
+    from kivy.app import App
+    from kivy.clock import Clock
+    from kivy.lang import Builder
+    from kivy.uix.screenmanager import ScreenManager
+    from kivy.uix.floatlayout import FloatLayout
+    from kivy.core.window import Window
+    from utils.helpers import save_settings
+    from utils.discovery import close_discovery
+    from utils.network_status import close_network_status
+    from utils.perf_monitor import get_monitor, instrument
+    from utils import memory_monitor
+
+with profiler.phase("ui_imports"):
+    from ui.main_menu import MainMenu
+    from ui.character_creator import CharacterCreator
+    from ui.character_sheet import CharacterSheet
+    from ui.options_screen import OptionsScreen
+    from ui.level_up_screen import LevelUpScreen
+    from ui.character_editor import CharacterEditor
+    from ui.info_screen import InfoScreen
+    from ui.settings_screen import SettingsScreen
+    from ui.splash_screen import SplashScreen
+    from ui.system_screen import SystemScreen
+    from ui.changelog_screen import ChangelogScreen
+    from ui.transfer_screen import TransferScreen
+
+KV_FILES = (
+    'ui/splashscreen.kv',
+    'ui/mainmenu.kv',
+    'ui/charactercreator.kv',
+    'ui/charactereditor.kv',
+    'ui/charactersheet.kv',
+    'ui/levelupscreen.kv',
+    'ui/optionsscreen.kv',
+    'ui/settingsscreen.kv',
+    'ui/systemscreen.kv',
+    'ui/changelogscreen.kv',
+    'ui/infoscreen.kv',
+    'ui/transferscreen.kv',
+)
+
+SCREENS = (
+    (SplashScreen, 'splash'),
+    (MainMenu, 'main'),
+    (CharacterCreator, 'creator'),
+    (CharacterEditor, 'editor'),
+    (CharacterSheet, 'sheet'),
+    (OptionsScreen, 'options'),
+    (SettingsScreen, 'settings'),
+    (SystemScreen, 'system'),
+    (ChangelogScreen, 'changelog'),
+    (InfoScreen, 'info'),
+    (LevelUpScreen, 'level_up'),
+    (TransferScreen, 'transfer'),
+)
 
 class DnDApp(App):
     """Haupt-App-Klasse."""
     def build(self):
-        Builder.load_file('ui/splashscreen.kv')
-        Builder.load_file('ui/mainmenu.kv')
-        Builder.load_file('ui/charactercreator.kv')
-        Builder.load_file('ui/charactereditor.kv')
-        Builder.load_file('ui/charactersheet.kv')
-        Builder.load_file('ui/levelupscreen.kv')
-        Builder.load_file('ui/optionsscreen.kv')
-        Builder.load_file('ui/settingsscreen.kv')
-        Builder.load_file('ui/systemscreen.kv')
-        Builder.load_file('ui/changelogscreen.kv')
-        Builder.load_file('ui/infoscreen.kv')
-        Builder.load_file('ui/transferscreen.kv')
+        for kv_file in KV_FILES:
+            with profiler.phase(kv_file, "kv"):
+                Builder.load_file(kv_file)
 
         if sys.platform.startswith('linux'):
             Window.fullscreen = 'auto'
@@ -67,30 +106,54 @@ class DnDApp(App):
         
         root = FloatLayout()
 
+        # Frame-Zeiten und UI-Latenzen nur im Debug-Modus messen (DND_PERF=1 oder Einstellung)
+        monitor = get_monitor()
+        monitor.enabled = monitor.enabled or settings.get('perf_overlay_enabled', False)
+        if monitor.enabled:
+            for screen_class, _ in SCREENS:
+                instrument(screen_class, 'on_pre_enter', 'screen')
+
         sm = ScreenManager()
-        sm.add_widget(SplashScreen(name='splash'))
-        sm.add_widget(MainMenu(name='main'))
-        sm.add_widget(CharacterCreator(name='creator'))
-        sm.add_widget(CharacterEditor(name='editor'))
-        sm.add_widget(CharacterSheet(name='sheet'))
-        sm.add_widget(OptionsScreen(name='options'))
-        sm.add_widget(SettingsScreen(name='settings'))
-        sm.add_widget(SystemScreen(name='system'))
-        sm.add_widget(ChangelogScreen(name='changelog'))
-        sm.add_widget(InfoScreen(name='info'))
-        sm.add_widget(LevelUpScreen(name='level_up'))
-        sm.add_widget(TransferScreen(name='transfer'))
+        for screen_class, name in SCREENS:
+            with profiler.phase(name, "screen"):
+                sm.add_widget(screen_class(name=name))
 
         root.add_widget(sm)
 
+        # Speicherverbrauch regelmäßig messen; Budgets leeren Caches und Texturen.
+        if settings.get('memory_monitor_enabled', True):
+            memory = memory_monitor.configure(settings)
+            memory_monitor.register_app_probes(memory, sm)
+            memory.start()
+
+        if monitor.enabled:
+            from ui.perf_overlay import PerfOverlay
+            root.add_widget(PerfOverlay())
+            monitor.start_frame_tracking()
+
         return root
 
+    def on_start(self):
+        if profiler.enabled:
+            # Mit dem ersten Frame nach on_start gilt der Start als abgeschlossen.
+            Clock.schedule_once(self.finish_startup_profile, 0)
+
+    def finish_startup_profile(self, dt):
+        profiler.mark("first_frame")
+        profiler.finish()
+
     def on_stop(self):
         """Wird aufgerufen, wenn die App geschlossen wird."""
         settings = load_settings()
         settings['window_width'] = Window.width
         settings['window_height'] = Window.height
         save_settings(settings)
+        close_discovery()
+        close_network_status()
+        memory_monitor.get_memory_monitor().stop()
+        monitor = get_monitor()
+        if monitor.enabled:
+            print(f"Perf-Trace gespeichert in {monitor.export_trace()}")
 
 if __name__ == '__main__':
     DnDApp().run()
\ No newline at end of file
@@ -0,0 +1,88 @@
+import pytest
+
+from core.analytics import (attack_stats, hit_chance, parse_spell_damage, save_stats, spell_stats,
+                            weapon_stats, weapon_table)
+
+WEAPONS = {
+    "Unbewaffneter Schlag": {"damage": "1", "ability": "Stärke"},
+    "Dolch": {"damage": "1d4", "ability": "Geschicklichkeit"},
+    "Zweihandschwert": {"damage": "2d6", "ability": "Stärke"},
+}
+
+
+class FakeCharacter:
+    def __init__(self, char_class="Kämpfer", level=1, **abilities):
+        self.char_class = char_class
+        self.level = level
+        self.abilities = {"Stärke": 16, "Geschicklichkeit": 12, "Intelligenz": 16}
+        self.abilities.update(abilities)
+
+    def get_proficiency_bonus(self):
+        return 2 + (self.level - 1) // 4
+
+
+def test_hit_chance_respects_natural_one_and_twenty():
+    assert hit_chance(5, 13) == pytest.approx(0.65)
+    assert hit_chance(30, 10) == pytest.approx(0.95)
+    assert hit_chance(-5, 30) == pytest.approx(0.05)
+
+
+def test_attack_stats_matches_hand_calculation():
+    stats = attack_stats("1d8", 3, 5, 13)
+    assert stats.probs.sum() == pytest.approx(1.0)
+    # 0.60 normale Treffer (Ø 7.5) + 0.05 Kritisch (Ø 12.0)
+    assert stats.mean == pytest.approx(0.60 * 7.5 + 0.05 * 12.0)
+    assert stats.maximum == 19
+    assert stats.percentiles[10] == 0
+
+
+def test_flat_damage_with_negative_modifier_deals_at_least_one():
+    # Blasrohr (Schaden "1") mit GES 8: 1 - 1 = 0, auf dem Bogen mindestens 1.
+    stats = attack_stats("1", -1, 1, 13)
+    assert stats.probs.sum() == pytest.approx(1.0)
+    assert stats.maximum == 1
+    assert stats.mean == pytest.approx(stats.hit_chance)
+    assert save_stats("1", -3, 13, 0, True).mean == pytest.approx(0.0)
+
+
+def test_attack_stats_are_memoized():
+    assert attack_stats("2d6", 3, 5, 15) is attack_stats("2d6", 3, 5, 15)
+
+
+def test_save_stats_half_damage_on_success():
+    stats = save_stats("8W6", 0, 13, 2, True)
+    fail = (13 - 1 - 2) / 20
+    assert stats.mean == pytest.approx(fail * 28 + (1 - fail) * 13.75, rel=1e-3)
+    assert save_stats("8W6", 0, 13, 2, False).mean == pytest.approx(fail * 28)
+
+
+def test_parse_spell_damage():
+    fireball = parse_spell_damage(
+        "Jede Kreatur muss einen Geschicklichkeitsrettungswurf machen. Ein Ziel erleidet 8W6 Feuerschaden "
+        "bei einem misslungenen Rettungswurf oder halb so viel Schaden bei einem erfolgreichen. "
+        "Der Schaden erhöht sich um 1W6 für jeden Zauberplatzgrad über dem 3.")
+    assert (fireball.kind, fireball.half_on_success, fireball.upcast) == ("save", True, (1, 6))
+    assert fireball.dice_for(3, slot_level=5) == "8W6+2W6"
+
+    fire_bolt = parse_spell_damage(
+        "Mache einen Fernkampf-Zauberangriff. Bei einem Treffer erleidet das Ziel 1W10 Feuerschaden. "
+        "Der Schaden erhöht sich um 1W10, wenn du die 5. Stufe (2W10), 11. Stufe (3W10) und 17. Stufe (4W10) erreichst.")
+    assert fire_bolt.kind == "attack"
+    assert fire_bolt.dice_for(0, character_level=11) == "3W10"
+
+    assert parse_spell_damage("Eine Kreatur erhält Trefferpunkte zurück.") is None
+
+
+def test_spell_stats_uses_casting_ability():
+    spells = {"Feuerpfeil": {"level": 0, "desc": "Mache einen Zauberangriff. Das Ziel erleidet 1W10 Feuerschaden."}}
+    wizard = FakeCharacter("Magier", Intelligenz=18)
+    assert spell_stats(wizard, "Feuerpfeil", 13, spell_data=spells) is attack_stats("1W10", 0, 6, 13)
+    assert spell_stats(wizard, "Unbekannt", spell_data=spells) is None
+
+
+def test_weapon_table_sorted_by_expected_damage():
+    character = FakeCharacter()
+    rows = weapon_table(character, 13, WEAPONS)
+    assert [row["name"] for row in rows] == ["Zweihandschwert", "Unbewaffneter Schlag", "Dolch"]
+    assert rows[0]["mean"] == pytest.approx(weapon_stats(character, "Zweihandschwert", 13, WEAPONS).mean)
+    assert rows == sorted(rows, key=lambda row: -row["mean"])
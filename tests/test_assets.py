@@ -0,0 +1,86 @@
+import json
+import os
+
+import pytest
+
+from utils import assets
+
+
+@pytest.fixture
+def app_dir(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(assets, "_manifest_mtime", None)
+    return tmp_path
+
+
+def _image(path, size, color=(200, 120, 40, 255)):
+    from PIL import Image
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    Image.new("RGBA", size, color).save(path)
+
+
+def test_best_variant_prefers_smallest_covering():
+    variants = [{"size": [800, 480]}, {"size": [983, 720]}, {"size": [983, 1080]}]
+    assert assets.best_variant(variants, 983, 720)["size"] == [983, 720]
+    assert assets.best_variant(variants, 640, 400)["size"] == [800, 480]
+    assert assets.best_variant(variants, 2000, 2000)["size"] == [983, 1080]
+    assert assets.best_variant([], 10, 10) is None
+
+
+def test_pack_atlas_keeps_images_apart():
+    images = {f"i{n}": (300, 200 + n) for n in range(8)}
+    placements, pages = assets.pack_atlas(images, page_size=1024)
+    rects = [(x, y, x + w, y + h) for page, x, y, w, h in placements.values() if page == 0]
+    for i, a in enumerate(rects):
+        assert a[2] <= pages[0][0] and a[3] <= pages[0][1]
+        for b in rects[i + 1:]:
+            assert a[2] <= b[0] or b[2] <= a[0] or a[3] <= b[1] or b[3] <= a[1]
+    assert len(pages) == 1
+    assert len(assets.pack_atlas({"a": (1000, 1000), "b": (100, 100)}, page_size=1024)[1]) == 2
+
+
+def test_without_build_the_original_is_used(app_dir):
+    (app_dir / "osbackground").mkdir()
+    (app_dir / "osbackground" / "bg.png").write_bytes(b"x")
+    assert assets.background_source("osbackground/bg.png", 800, 480) == "osbackground/bg.png"
+    assert assets.asset_source("logo/logo.png") == "logo/logo.png"
+
+
+def test_build_variants_manifest_and_lookup(app_dir):
+    pytest.importorskip("PIL")
+    _image("osbackground/tall.png", (983, 1820))
+    _image("osbackground/clear.png", (400, 300), color=(0, 0, 0, 0))
+    _image("logo/logo.png", (1024, 1024))
+    built, skipped = assets.build(targets=[(800, 480), (1280, 720)], on_status=lambda m: None)
+    assert (built, skipped) == (3, 0)
+
+    # Nie größer als das Original, undurchsichtig als JPEG, transparent als PNG.
+    chosen = assets.background_source(str(app_dir / "osbackground" / "tall.png"), 1280, 720)
+    assert chosen == "asset_cache/osbackground/tall.983x720.jpg"
+    assert assets.background_source("osbackground/tall.png", 800, 480).endswith("tall.800x480.jpg")
+    assert assets.background_source("osbackground/clear.png", 1280, 720).endswith("clear.400x300.png")
+
+    assert assets.asset_source("logo/logo.png") == "atlas://asset_cache/ui/logo"
+    with open("asset_cache/ui.atlas", encoding="utf-8") as f:
+        atlas = json.load(f)
+    assert atlas == {"ui-0.png": {"logo": [0, 0, 512, 512]}}
+
+
+def test_build_is_incremental_and_detects_changes(app_dir):
+    pytest.importorskip("PIL")
+    _image("osbackground/a.png", (900, 900))
+    _image("osbackground/b.png", (900, 900))
+    assets.build(targets=[(800, 480)], atlas_sources=(), on_status=lambda m: None)
+    assert assets.build(targets=[(800, 480)], atlas_sources=(), on_status=lambda m: None) == (0, 2)
+
+    # Eine geänderte Quelle fällt bis zum nächsten Build auf das Original zurück.
+    _image("osbackground/a.png", (600, 600), color=(1, 2, 3, 255))
+    os.utime("osbackground/a.png", ns=(1, 1))
+    assert assets.background_source("osbackground/a.png", 800, 480) == "osbackground/a.png"
+    assert assets.build(targets=[(800, 480)], atlas_sources=(), on_status=lambda m: None) == (1, 1)
+    assert assets.background_source("osbackground/a.png", 800, 480).endswith("a.600x480.jpg")
+    assert not os.path.exists("asset_cache/osbackground/a.800x480.jpg")
+
+    os.remove("osbackground/b.png")
+    assets.build(targets=[(800, 480)], atlas_sources=(), on_status=lambda m: None)
+    assert not os.path.exists("asset_cache/osbackground/b.800x480.jpg")
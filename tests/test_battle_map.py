@@ -0,0 +1,100 @@
+import json
+import os
+import time
+
+import numpy as np
+import pytest
+
+from core.battle_map import BattleMap, MapFormatError, convert_legacy_file, load_map
+
+LEGACY_MAP = os.path.join(os.path.dirname(__file__), "..", "utils", "data", "maps", "test.json")
+
+
+def test_legacy_json_converts_losslessly(tmp_path):
+    with open(LEGACY_MAP, encoding="utf-8") as f:
+        legacy = json.load(f)
+    target = convert_legacy_file(LEGACY_MAP, str(tmp_path / "test.dmap"))
+
+    battle_map = load_map(target)
+    assert battle_map.to_legacy_json() == legacy
+    assert os.path.getsize(target) < os.path.getsize(LEGACY_MAP) / 20
+
+
+def test_round_trip_with_new_tile_types():
+    battle_map = BattleMap(4, 6)
+    battle_map.fill("Wall", rows=0)
+    battle_map.set_tile(2, 3, "Wasser")
+    battle_map.set_object(1, 1, "Goblin 1")
+    loaded = BattleMap.from_bytes(battle_map.to_bytes())
+    assert loaded.tile_type(2, 3) == "Wasser"
+    assert loaded.tile_type(0, 5) == "Wall"
+    assert loaded.object_at(1, 1) == "Goblin 1"
+    assert np.array_equal(loaded.tiles, battle_map.tiles)
+
+
+def test_hit_test_and_passability():
+    battle_map = BattleMap(10, 10)
+    battle_map.set_tile(0, 0, "Wall")
+    battle_map.set_tile(0, 1, "Door")
+    # Zeile 0 liegt oben, Kivy zählt y von unten.
+    assert battle_map.hit_test(5, 95, tile_size=10) == (0, 0)
+    assert battle_map.hit_test(15, 5, tile_size=10) == (9, 1)
+    assert battle_map.hit_test(150, 5, tile_size=10) is None
+    assert not battle_map.is_passable(0, 0)
+    assert battle_map.is_passable(0, 1)
+    assert battle_map.passable_mask().sum() == 99
+
+
+def test_large_map_loads_fast(tmp_path):
+    rng = np.random.default_rng(0)
+    battle_map = BattleMap(500, 500)
+    battle_map.tiles[:] = (rng.random((500, 500)) < 0.2).astype(np.uint8)
+    path = str(tmp_path / "big.dmap")
+    battle_map.save(path)
+
+    started = time.perf_counter()
+    loaded = load_map(path)
+    assert time.perf_counter() - started < 0.05
+    assert np.array_equal(loaded.tiles, battle_map.tiles)
+
+
+def test_garbage_is_rejected(tmp_path):
+    path = tmp_path / "kaputt.dmap"
+    path.write_bytes(b"nicht eine karte")
+    with pytest.raises(MapFormatError):
+        load_map(str(path))
+
+
+def test_truncated_file_is_rejected():
+    battle_map = BattleMap(4, 6)
+    battle_map.set_tile(2, 3, "Wasser")
+    battle_map.set_object(1, 1, "Goblin 1")
+    data = battle_map.to_bytes()
+    for length in range(len(data)):
+        with pytest.raises(MapFormatError, match="Datei zu kurz"):
+            BattleMap.from_bytes(data[:length])
+
+
+def test_palette_fits_the_file_format():
+    battle_map = BattleMap(2, 2, palette=[f"Art {i}" for i in range(254)])
+    battle_map.set_tile(0, 0, "Letzte")
+    with pytest.raises(MapFormatError):
+        battle_map.set_tile(0, 1, "Eine zu viel")
+    with pytest.raises(MapFormatError):
+        BattleMap(2, 2).set_tile(0, 0, "ä" * 128)
+    assert BattleMap.from_bytes(battle_map.to_bytes()).tile_type(0, 0) == "Letzte"
+
+
+def _rle_map(payload, rows=2, cols=2):
+    from core.battle_map import _HEADER, _U32, ENCODING_RLE, FORMAT_VERSION, MAGIC
+    return (_HEADER.pack(MAGIC, FORMAT_VERSION, rows, cols) + bytes([1, 5]) + b"Floor"
+            + bytes([ENCODING_RLE]) + _U32.pack(len(payload)) + payload + _U32.pack(2) + b"[]")
+
+
+def test_corrupt_rle_payload_is_rejected():
+    valid = bytes([0]) + (4).to_bytes(4, "little")
+    assert BattleMap.from_bytes(_rle_map(valid)).tile_type(1, 1) == "Floor"
+    with pytest.raises(MapFormatError, match="Beschädigt"):
+        BattleMap.from_bytes(_rle_map(valid + b"\x00"))
+    with pytest.raises(MapFormatError, match="Kachelanzahl"):
+        BattleMap.from_bytes(_rle_map(bytes([0]) + (5).to_bytes(4, "little")))
@@ -0,0 +1,28 @@
+import json
+
+from benchmarks import bench_persistence, bench_transfer
+from benchmarks.run import compare, load_baseline, save_baseline
+
+
+def test_compare_needs_relative_and_absolute_slowdown():
+    baseline = {"a": 10.0, "b": 1.0, "c": 100.0}
+    current = {"a": 20.0, "b": 2.5, "c": 120.0, "new": 50.0}
+    assert compare(baseline, current, threshold=0.5, min_ms=2.0) == [("a", 10.0, 20.0)]
+    assert [name for name, _, _ in compare(baseline, current, threshold=0.1, min_ms=1.0)] == ["b", "a", "c"]
+
+
+def test_update_baseline_keeps_other_suites(tmp_path):
+    path = str(tmp_path / "baseline.json")
+    save_baseline({"data.init_db_ms": 10.0}, 5, path)
+    save_baseline({"transfer.loopback_batch_ms": 20.0}, 3, path, load_baseline(path))
+    with open(path, encoding="utf-8") as f:
+        stored = json.load(f)
+    assert stored["results"] == {"data.init_db_ms": 10.0, "transfer.loopback_batch_ms": 20.0}
+    assert stored["repeat"] == 3 and "python" in stored["machine"]
+
+
+def test_committed_baseline_matches_suite_names():
+    results = bench_persistence.suite(repeat=1, counts=(1,))
+    results.update(bench_transfer.suite(repeat=1))
+    assert all(value >= 0 for value in results.values())
+    assert set(results) <= set(load_baseline()["results"])
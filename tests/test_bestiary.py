@@ -0,0 +1,98 @@
+import time
+
+import pytest
+
+import database
+from core.bestiary import Bestiary
+from core.enemy import Enemy
+
+
+@pytest.fixture
+def db_path(tmp_path, monkeypatch):
+    path = str(tmp_path / "test.db")
+    monkeypatch.setattr(database, "DATABASE_FILE", path)
+    monkeypatch.setattr(database, "ENCOUNTER_FILE", str(tmp_path / "encounters.db"))
+    database.init_db()
+    return path
+
+
+def test_find_uses_filters(db_path):
+    bestiary = Bestiary(db_path)
+    assert "Goblin" in bestiary.find(max_cr=0.25)
+    assert "Troll" not in bestiary.find(max_cr=1)
+    assert set(bestiary.find(creature_type="Untoter")) >= {"Skelett", "Zombie", "Ghul"}
+    assert all(bestiary.stat_block(n)["armor_class"] >= 16 for n in bestiary.find(min_ac=16))
+    assert bestiary.find(name="Ogu") == []
+
+
+def test_indexes_exist(db_path):
+    conn = database.get_db_connection(db_path)
+    indexes = {row["name"] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+    conn.close()
+    assert {"idx_enemies_cr", "idx_enemies_type", "idx_enemies_ac"} <= indexes
+
+
+def test_encounters_survive_rebuild(db_path):
+    Bestiary(db_path).save_encounter("Höhle", [("Goblin", 3), ("Bugbear", 1)])
+    database.init_db()
+    assert Bestiary(db_path).load_encounter("Höhle") == [("Goblin", 3), ("Bugbear", 1)]
+
+
+def test_encounters_survive_update_reset(db_path):
+    Bestiary(db_path).save_encounter("Höhle", [("Goblin", 3)])
+    # Ein Online-Update setzt die versionierte dnd.db per "git reset --hard" auf den alten Stand zurück.
+    conn = database.get_db_connection(db_path)
+    for (table,) in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'").fetchall():
+        if table != "sqlite_sequence":
+            conn.execute(f"DROP TABLE {table}")
+    conn.commit()
+    conn.close()
+    assert database.init_db() is True
+    assert Bestiary(db_path).load_encounter("Höhle") == [("Goblin", 3)]
+
+
+def test_encounters_from_old_dnd_db_are_moved(db_path):
+    conn = database.get_db_connection(db_path)
+    database.create_encounter_tables(conn)
+    conn.execute("INSERT INTO encounters (name) VALUES ('Alt')")
+    conn.execute("INSERT INTO encounter_entries (encounter_id, position, enemy_name, count) VALUES (1, 0, 'Ork', 2)")
+    conn.commit()
+    conn.close()
+    assert database.init_db() is False
+    assert Bestiary(db_path).load_encounter("Alt") == [("Ork", 2)]
+    conn = database.get_db_connection(db_path)
+    assert conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'encounters'").fetchone() is None
+    conn.close()
+
+
+def test_spawn_shares_stat_blocks(db_path):
+    bestiary = Bestiary(db_path)
+    bestiary.save_encounter("Überfall", [("Goblin", 2), ("Ork", 1)])
+    bestiary.save_encounter("Hinterhalt", [("Goblin", 1)])
+    first = bestiary.spawn_encounter("Überfall")
+    second = bestiary.spawn_encounter("Hinterhalt")
+    assert [e.name for e in first] == ["Goblin 1", "Goblin 2", "Ork"]
+    assert first[0].attacks is second[0].attacks
+
+    first[0].take_damage(5)
+    assert first[0].hp == 2 and first[1].hp == 7
+    assert Enemy.from_dict(first[0].to_dict()).hp == 2
+
+
+def test_unknown_encounter_and_delete(db_path):
+    bestiary = Bestiary(db_path)
+    with pytest.raises(KeyError):
+        bestiary.load_encounter("Gibt es nicht")
+    bestiary.save_encounter("Leer", [])
+    assert bestiary.load_encounter("Leer") == []
+    bestiary.delete_encounter("Leer")
+    assert "Leer" not in bestiary.encounter_names()
+
+
+def test_large_encounter_spawns_quickly(db_path):
+    Bestiary(db_path).save_encounter("Horde", [("Goblin", 120), ("Hobgoblin", 30), ("Oger", 2)])
+    bestiary = Bestiary(db_path)
+    started = time.perf_counter()
+    enemies = bestiary.spawn_encounter("Horde")
+    assert time.perf_counter() - started < 0.1
+    assert len(enemies) == 152
@@ -0,0 +1,59 @@
+import numpy as np
+import pytest
+
+from core.dice import DiceError, Roller, parse
+
+
+@pytest.mark.parametrize("text, low, high", [
+    ("1d8", 1, 8),
+    ("1", 1, 1),
+    ("2W6+3", 5, 15),
+    ("2d6+1d4-1", 2, 15),
+    ("4d6kh3", 3, 18),
+    ("1d20adv", 1, 20),
+    ("d20 nachteil", 1, 20),
+    ("1d6-1d4", -3, 5),
+])
+def test_ranges_and_distributions(text, low, high):
+    expression = parse(text)
+    assert (expression.minimum, expression.maximum) == (low, high)
+    distribution = expression.distribution()
+    assert min(distribution) == low and max(distribution) == high
+    assert sum(distribution.values()) == pytest.approx(1.0)
+
+
+def test_parse_is_cached_and_rejects_garbage():
+    assert parse("2d6+3") is parse("2d6+3")
+    for text in ("", "2d", "1d6 1d4", "3d6kh4", "abc"):
+        with pytest.raises(DiceError):
+            parse(text)
+
+
+def test_exact_probabilities():
+    assert parse("2d6").distribution()[7] == pytest.approx(6 / 36)
+    assert parse("1d20adv").distribution()[20] == pytest.approx(39 / 400)
+    assert parse("2d20kl1").distribution()[1] == pytest.approx(39 / 400)
+    assert parse("4d6kh3").mean == pytest.approx(12.2446, abs=1e-4)
+
+
+def test_seeded_rollers_replay():
+    a, b = Roller(seed=42), Roller(seed=42)
+    assert [a.total("2d6+1d4+3") for _ in range(20)] == [b.total("2d6+1d4+3") for _ in range(20)]
+    result = Roller(seed=1).roll("4d6kh3")
+    assert len(result.faces) == 3
+    assert result.total == sum(result.faces)
+
+
+def test_batch_rolls_match_distribution():
+    totals = Roller(seed=7).roll_many("2d6+3", 200_000)
+    assert totals.min() >= 5 and totals.max() <= 15
+    assert totals.mean() == pytest.approx(10.0, abs=0.05)
+    advantage = Roller(seed=7).roll_many("1d20adv", 200_000)
+    assert advantage.mean() == pytest.approx(parse("1d20adv").mean, abs=0.05)
+    assert np.bincount(advantage)[1] / len(advantage) == pytest.approx(1 / 400, abs=0.001)
+
+
+def test_critical_doubles_dice_only():
+    assert str(parse("2d6+3").critical()) == "4d6+3"
+    assert parse("1d8-1").critical().maximum == 15
+    assert str(parse("1").critical()) == "1"
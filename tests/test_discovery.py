@@ -0,0 +1,88 @@
+import socket
+import threading
+
+from utils.discovery import DiscoveryCache, SERVICE_TYPE
+
+
+class FakeInfo:
+    def __init__(self, name, ip, port, properties=None):
+        self.name = name
+        self.addresses = [socket.inet_aton(ip)]
+        self.port = port
+        self.properties = {b'user': b'tester', **(properties or {})}
+
+
+class FakeDiscovery(DiscoveryCache):
+    """DiscoveryCache without a network: resolution answers from a dict."""
+
+    def __init__(self):
+        super().__init__(zeroconf=object())
+        self.registry = {}
+        self.release = threading.Event()
+        self.release.set()
+
+    def _request_info(self, type_, name):
+        self.release.wait(5)
+        return self.registry.get(name)
+
+
+def _drain(cache):
+    cache._resolver.shutdown(wait=True)
+
+
+def test_add_update_remove_are_delivered_as_diffs():
+    cache = FakeDiscovery()
+    events = []
+    name = f"pi.{SERVICE_TYPE}"
+    assert cache.subscribe(lambda event, peer: events.append((event, peer.port))) == []
+
+    cache.registry[name] = FakeInfo(name, '192.168.0.5', 65432)
+    cache.add_service(None, SERVICE_TYPE, name)
+    cache.registry[name] = FakeInfo(name, '192.168.0.5', 65433)
+    cache.update_service(None, SERVICE_TYPE, name)
+    _drain(cache)
+    cache.remove_service(None, SERVICE_TYPE, name)
+
+    assert events == [('add', 65432), ('update', 65433), ('remove', 65433)]
+    assert cache.peers == {}
+
+
+def test_known_peers_survive_resubscription():
+    cache = FakeDiscovery()
+    name = f"pi.{SERVICE_TYPE}"
+    cache.registry[name] = FakeInfo(name, '10.0.0.2', 1234)
+    cache.add_service(None, SERVICE_TYPE, name)
+    _drain(cache)
+
+    callback = lambda event, peer: None
+    cache.unsubscribe(callback)
+    peers = cache.subscribe(callback)
+    assert [p.host for p in peers] == ['10.0.0.2']
+    assert peers[0].display_name == 'pi'
+    assert peers[0].properties == {'user': 'tester'}
+
+
+def test_remove_during_resolution_wins():
+    cache = FakeDiscovery()
+    name = f"pi.{SERVICE_TYPE}"
+    cache.registry[name] = FakeInfo(name, '10.0.0.2', 1234)
+    cache.release.clear()
+    cache.add_service(None, SERVICE_TYPE, name)
+    cache.remove_service(None, SERVICE_TYPE, name)
+    cache.release.set()
+    _drain(cache)
+    assert cache.peers == {}
+
+
+def test_dm_sessions_are_told_apart_from_transfer_peers():
+    cache = FakeDiscovery()
+    sender, session = f"pi.{SERVICE_TYPE}", f"Runde DM.{SERVICE_TYPE}"
+    cache.registry[sender] = FakeInfo(sender, '10.0.0.2', 65432)
+    cache.registry[session] = FakeInfo(session, '10.0.0.3', 65433, {b'role': b'dm'})
+    cache.add_service(None, SERVICE_TYPE, sender)
+    cache.add_service(None, SERVICE_TYPE, session)
+    _drain(cache)
+
+    assert not cache.peers[sender].is_dm_session
+    assert cache.peers[session].is_dm_session
+    assert [p.port for p in cache.session_peers()] == [65433]
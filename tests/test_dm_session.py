@@ -0,0 +1,67 @@
+import time
+
+from utils.dm_session import DMSessionClient, DMSessionServer
+
+
+def _wait_for(predicate, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+def test_clients_converge_on_server_state():
+    server = DMSessionServer(host='127.0.0.1', port=0, advertise=False)
+    port = server.start()
+    clients = []
+    try:
+        for i in range(3):
+            client = DMSessionClient('127.0.0.1', port, {"name": f"Held {i}", "hit_points": 20, "max_hit_points": 20})
+            client.connect()
+            clients.append(client)
+
+        server.state.add_combatant("e1", "Goblin", "enemy", hp=7)
+        for _ in range(10):
+            clients[0].change_hp(-1)
+        clients[1].report_roll("1d20", 12)
+        server.apply_action({"type": "order", "order": ["p2", "e1", "p1", "p3"]})
+
+        assert _wait_for(lambda: all(c.state.combatants == server.state.combatants for c in clients))
+        assert _wait_for(lambda: all(c.state.initiative_order == ["p2", "e1", "p1", "p3"] for c in clients))
+        assert server.state.combatants[clients[0].cid]["hp"] == 10
+        assert ["p2", "1d20", 12] in clients[2].state.rolls
+    finally:
+        for client in clients:
+            client.close()
+        server.stop()
+
+
+def test_players_cannot_change_others():
+    server = DMSessionServer(host='127.0.0.1', port=0, advertise=False)
+    server.state.add_combatant("e1", "Goblin", "enemy", hp=7)
+    server.apply_action({"type": "hp", "id": "e1", "amount": -5}, cid="p1")
+    assert server.state.combatants["e1"]["hp"] == 7
+    server.apply_action({"type": "hp", "id": "e1", "amount": -5})
+    assert server.state.combatants["e1"]["hp"] == 2
+
+
+def test_leaving_player_is_removed():
+    server = DMSessionServer(host='127.0.0.1', port=0, advertise=False)
+    port = server.start()
+    try:
+        client = DMSessionClient('127.0.0.1', port, {"name": "Held", "hit_points": 5})
+        cid = client.connect()
+        assert cid in server.state.combatants
+        client.close()
+        assert _wait_for(lambda: cid not in server.state.combatants)
+    finally:
+        server.stop()
+
+
+def test_saturated_clients_stay_within_bandwidth_budget():
+    from utils.dm_loadgen import run_load_test
+    report = run_load_test(clients=3, rate=200, duration=2, bandwidth_budget=1024)
+    assert report["bytes_per_client_per_s_max"] <= 1024
+    assert report["bytes_per_client_per_s_avg"] > 1024 * 0.5
@@ -0,0 +1,66 @@
+import os
+
+from utils.folder_size import ROOT_FILES, FolderSizeCache, format_size
+
+
+def _write(path, size):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "wb") as f:
+        f.write(b"x" * size)
+
+
+def _walk_total(root):
+    return sum(os.path.getsize(os.path.join(d, f)) for d, _, files in os.walk(root) for f in files)
+
+
+def test_scan_matches_walk_with_breakdown(tmp_path):
+    _write(str(tmp_path / "held.char"), 100)
+    _write(str(tmp_path / "saves" / "a.char"), 2000)
+    _write(str(tmp_path / "saves" / "old" / "b.char"), 300)
+    _write(str(tmp_path / "data" / "spells.json"), 50)
+    result = FolderSizeCache(str(tmp_path)).scan()
+    assert result.total == _walk_total(str(tmp_path)) == 2450
+    assert result.files == 4
+    assert result.breakdown == {ROOT_FILES: 100, "saves": 2300, "data": 50}
+    assert result.top(1) == [("saves", 2300)]
+
+
+def test_unchanged_directories_are_not_rescanned(tmp_path):
+    _write(str(tmp_path / "saves" / "a.char"), 10)
+    _write(str(tmp_path / "osbackground" / "bg.png"), 10)
+    cache = FolderSizeCache(str(tmp_path))
+    assert cache.scan().rescanned == 3
+    assert cache.scan().rescanned == 0
+
+    _write(str(tmp_path / "saves" / "b.char"), 40)
+    result = cache.scan()
+    assert result.rescanned == 1 and result.breakdown["saves"] == 50
+
+    os.remove(str(tmp_path / "osbackground" / "bg.png"))
+    os.rmdir(str(tmp_path / "osbackground"))
+    result = cache.scan()
+    assert "osbackground" not in result.breakdown and result.total == 50
+    assert str(tmp_path / "osbackground") not in cache.entries
+
+
+def test_in_place_rewrite_is_found_by_full_rescan(tmp_path):
+    _write(str(tmp_path / "held.char"), 10)
+    cache = FolderSizeCache(str(tmp_path), full_rescan_after=3600)
+    cache.scan()
+    with open(str(tmp_path / "held.char"), "ab") as f:
+        f.write(b"y" * 90)
+    os.utime(str(tmp_path), ns=(0, cache.entries[str(tmp_path)].mtime_ns))
+    assert cache.scan().total == 10
+    assert cache.scan(force_full=True).total == 100
+
+
+def test_symlinks_are_not_followed(tmp_path):
+    _write(str(tmp_path / "real" / "big.bin"), 1000)
+    os.symlink(str(tmp_path / "real"), str(tmp_path / "link"))
+    assert FolderSizeCache(str(tmp_path)).scan().total == 1000
+
+
+def test_format_size():
+    assert format_size(512) == "512 B"
+    assert format_size(1536) == "1.5 KB"
+    assert format_size(3 * 1024 * 1024 * 1024) == "3.00 GB"
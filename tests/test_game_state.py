@@ -0,0 +1,59 @@
+from core.game_state import GameState, merge_delta
+
+
+def _state_with_goblin():
+    state = GameState()
+    state.add_combatant("e1", "Goblin", "enemy", hp=7, armor_class=15)
+    state.collect_delta()
+    return state
+
+
+def test_multiple_changes_in_one_tick_are_coalesced():
+    state = _state_with_goblin()
+    state.change_hp("e1", -2)
+    state.change_hp("e1", -3)
+    state.set_conditions("e1", ["Liegend"])
+    delta = state.collect_delta()
+    assert delta["c"] == {"e1": {"hp": 2, "cond": ["Liegend"]}}
+    assert state.collect_delta() is None
+
+
+def test_hp_is_clamped():
+    state = _state_with_goblin()
+    state.change_hp("e1", -100)
+    assert state.combatants["e1"]["hp"] == 0
+    state.change_hp("e1", 100)
+    assert state.combatants["e1"]["hp"] == 7
+
+
+def test_mirror_follows_snapshot_and_deltas():
+    server = _state_with_goblin()
+    mirror = GameState()
+    mirror.load_snapshot(server.snapshot())
+
+    server.add_combatant("p1", "Lirael", hp=12)
+    server.set_initiative_order(["p1", "e1"])
+    server.record_roll("p1", "1d20", 17)
+    mirror.apply_delta(server.collect_delta())
+    server.remove_combatant("e1")
+    mirror.apply_delta(server.collect_delta())
+
+    assert mirror.combatants == server.combatants
+    assert mirror.initiative_order == ["p1"]
+    assert mirror.rolls == [["p1", "1d20", 17]]
+
+
+def test_merge_delta_matches_applying_both():
+    server = _state_with_goblin()
+    server.add_combatant("p1", "Lirael", hp=12)
+    first = server.collect_delta()
+    server.change_hp("p1", -5)
+    server.remove_combatant("e1")
+    second = server.collect_delta()
+
+    one_by_one = GameState()
+    one_by_one.apply_delta(first)
+    one_by_one.apply_delta(second)
+    merged = GameState()
+    merged.apply_delta(merge_delta(first, second))
+    assert merged.combatants == one_by_one.combatants == server.combatants
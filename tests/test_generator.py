@@ -0,0 +1,40 @@
+import pickle
+
+from core.generator import CharacterSpec, all_specs, generate_character, run_batch, validate_character, validate_data
+
+
+def test_same_seed_same_character():
+    spec = CharacterSpec("Mensch", "Magier", 7, seed=42)
+    a, b = generate_character(spec), generate_character(spec)
+    assert a.level == 7 and a.max_hit_dice == 7
+    assert a.base_abilities == b.base_abilities
+    assert a.spells == b.spells
+    assert a.max_hit_points == b.max_hit_points
+
+
+def test_caster_learns_spells_up_to_level():
+    character = generate_character(CharacterSpec("Elf (Hochelf)", "Barde", 10, seed=3))
+    issues = validate_character(character)
+    assert not [issue for issue in issues if "Zauber" in issue]
+    assert max(character.spells) == 5
+
+
+def test_all_specs_covers_every_combination():
+    specs = all_specs(levels=range(1, 3))
+    assert len({(s.race, s.char_class, s.level) for s in specs}) == len(specs)
+    assert {s.level for s in specs} == {1, 2}
+
+
+def test_run_batch_reports_throughput():
+    specs = [CharacterSpec("Zwerg (Hügelzwerg)", "Kleriker", level, seed=level) for level in (1, 5, 20)]
+    report = run_batch(specs, workers=1, keep=True)
+    assert report["count"] == 3
+    assert report["level_ups"] == 0 + 4 + 19
+    assert report["characters_per_second"] > 0
+    assert [c.level for c in report["characters"]] == [1, 5, 20]
+    pickle.dumps(report["characters"])
+
+
+def test_validate_data_returns_messages():
+    issues = validate_data()
+    assert all(isinstance(issue, str) for issue in issues)
@@ -0,0 +1,89 @@
+import time
+
+from core.initiative import InitiativeTracker, initiative_modifier
+
+
+class Hero:
+    def __init__(self, name, initiative):
+        self.name = name
+        self.initiative = initiative
+
+
+class Goblin:
+    def __init__(self, name, dexterity=14):
+        self.name = name
+        self.dexterity = dexterity
+
+
+def _goblins(count):
+    return [(f"g{i}", f"Goblin {i}", 2, "enemy") for i in range(count)]
+
+
+def test_same_seed_gives_same_order():
+    a = InitiativeTracker(seed=7).roll_all(_goblins(50))
+    b = InitiativeTracker(seed=7).roll_all(_goblins(50))
+    assert a == b
+
+
+def test_order_is_descending_with_deterministic_ties():
+    tracker = InitiativeTracker(seed=1)
+    tracker.roll_all([
+        ("p1", "Ayla", 3, "player", 12),
+        ("e1", "Ork", 3, "enemy", 12),
+        ("e2", "Wolf", 5, "enemy", 10),
+        ("p2", "Bren", 0, "player", 20),
+    ])
+    # 20, dann 15 (Wolf, höherer Bonus), dann 15 Spieler vor Gegner.
+    assert tracker.order == ["p2", "e2", "p1", "e1"]
+    assert [e.total for e in tracker.entries] == [20, 15, 15, 15]
+
+
+def test_modifiers_from_characters_and_enemies():
+    assert initiative_modifier(Hero("Ayla", 4)) == 4
+    assert initiative_modifier(Goblin("Goblin", 14)) == 2
+    assert initiative_modifier(Goblin("Ochse", 9)) == -1
+    tracker = InitiativeTracker(seed=3)
+    order = tracker.roll_encounter([Hero("Ayla", 4)], [Goblin("Goblin")])
+    assert sorted(order) == ["e1", "p1"]
+
+
+def test_join_and_leave_keep_current_turn():
+    tracker = InitiativeTracker(seed=2)
+    tracker.roll_all([(c, c, 0, "player", r) for c, r in (("a", 18), ("b", 12), ("c", 5))])
+    tracker.next_turn()
+    assert tracker.current.cid == "b"
+
+    tracker.add("x", "Verstärkung", 0, roll=20)
+    assert tracker.current.cid == "b"
+    tracker.remove("a")
+    assert tracker.current.cid == "b"
+    assert tracker.order == ["x", "b", "c"]
+
+    tracker.remove("b")
+    assert tracker.current.cid == "c"
+    tracker.remove("c")
+    assert tracker.current.cid == "x"
+    assert tracker.round == 2
+
+
+def test_next_turn_wraps_into_new_round():
+    tracker = InitiativeTracker(seed=4)
+    tracker.roll_all(_goblins(3))
+    for _ in range(3):
+        tracker.next_turn()
+    assert tracker.round == 2
+    assert tracker.current is tracker.entries[0]
+
+
+def test_two_hundred_goblins_are_fast():
+    tracker = InitiativeTracker(seed=5)
+    started = time.perf_counter()
+    tracker.roll_all(_goblins(200))
+    for i in range(200):
+        tracker.add(f"n{i}", "Nachzügler", 1)
+    for i in range(0, 200, 2):
+        tracker.remove(f"g{i}")
+    assert time.perf_counter() - started < 0.5
+    totals = [e.total for e in tracker.entries]
+    assert totals == sorted(totals, reverse=True)
+    assert len(tracker) == 300
@@ -0,0 +1,44 @@
+from core.character import Character
+from data_manager import CLASS_DATA, CLASS_PROGRESSIONS
+
+
+def _rescanned_features(char_class, level):
+    features = []
+    for lvl in range(1, level + 1):
+        features.extend(CLASS_DATA[char_class]["features"].get(lvl, []))
+    return features
+
+
+def test_feature_table_is_cumulative():
+    for char_class in CLASS_DATA:
+        for level in (1, 4, 20):
+            assert list(CLASS_PROGRESSIONS[char_class].features_up_to(level)) == _rescanned_features(char_class, level)
+
+
+def test_level_up_applies_only_new_features():
+    character = Character("Testan", "Mensch", "Magier")
+    character.initialize_character()
+    character.apply_level_ups([{"hp_roll": 4}] * 19)
+    assert character.level == 20
+    assert character.features == _rescanned_features("Magier", 20)
+    assert character.max_spell_slots == CLASS_DATA["Magier"]["progression"][20]["spell_slots"]
+
+
+def test_custom_features_survive_recomputation():
+    character = Character("Testan", "Mensch", "Kämpfer")
+    character.fighting_style = "Verteidigung"
+    character.features.append({"name": "Kampfstil: Verteidigung", "desc": ""})
+    character.initialize_character()
+    character.level_up({"hp_roll": 6})
+    character.update_features()
+    names = [f["name"] for f in character.features]
+    assert "Kampfstil: Verteidigung" in names
+    assert names.count("Kampfstil") == 1
+
+
+def test_ability_increase_updates_modifiers():
+    character = Character("Testan", "Mensch", "Schurke")
+    character.initialize_character()
+    initiative = character.initiative
+    character.level_up({"hp_roll": 1, "ability_increase": ["Geschicklichkeit", "Geschicklichkeit"]})
+    assert character.initiative == initiative + 1
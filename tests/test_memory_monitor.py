@@ -0,0 +1,82 @@
+import json
+import sys
+
+from utils.memory_monitor import (MB, MemoryMonitor, budgets_from_settings, clear_function_caches, deep_sizeof,
+                                  measure_function_caches, read_rss)
+
+
+class FakeCache:
+    def __init__(self, size):
+        self.size = size
+        self.cleared = 0
+
+    def measure(self):
+        return {"bytes": self.size, "count": 1 if self.size else 0}
+
+    def evict(self):
+        self.size = 0
+        self.cleared += 1
+
+
+def test_deep_sizeof_counts_shared_objects_once():
+    shared = list(range(1000))
+    assert deep_sizeof({"a": shared, "b": shared}) < deep_sizeof({"a": shared, "b": list(range(1000))})
+    assert deep_sizeof([shared]) > sys.getsizeof(shared)
+
+
+def test_probe_over_budget_is_evicted_and_logged(tmp_path):
+    log = tmp_path / "memory.jsonl"
+    textures, data = FakeCache(80 * MB), FakeCache(10 * MB)
+    monitor = MemoryMonitor({"textures": 64 * MB}, log_path=str(log))
+    monitor.register("textures", textures.measure, textures.evict, label="Texturen")
+    monitor.register("data", data.measure)
+
+    snapshot = monitor.sample()
+    assert snapshot["evicted"] == ["textures"] and textures.cleared == 1
+    assert monitor.sample()["evicted"] == []
+    lines = [json.loads(line) for line in log.read_text(encoding="utf-8").splitlines()]
+    assert len(lines) == 2 and lines[0]["subsystems"]["textures"]["bytes"] == 80 * MB
+    assert "Texturen: 80.0 MB" in monitor.format_report(snapshot)
+
+
+def test_display_measurement_has_no_side_effects(tmp_path):
+    log = tmp_path / "memory.jsonl"
+    textures = FakeCache(80 * MB)
+    monitor = MemoryMonitor({"textures": 64 * MB}, log_path=str(log))
+    monitor.register("textures", textures.measure, textures.evict)
+
+    snapshot = monitor.current()
+    assert snapshot["subsystems"]["textures"]["bytes"] == 80 * MB and snapshot["evicted"] == []
+    assert textures.cleared == 0 and not monitor.samples and not log.exists()
+
+    # Läuft der Monitor, zeigt die Anzeige nur seine letzte Messung.
+    monitor.sample()
+    monitor._event = object()
+    assert monitor.current() is monitor.latest and len(monitor.samples) == 1
+
+
+def test_rss_budget_evicts_non_empty_probes_by_priority():
+    order = []
+    probes = {name: FakeCache(size) for name, size in (("textures", MB), ("caches", MB), ("empty", 0))}
+    monitor = MemoryMonitor({"rss": 1})
+    for priority, name in enumerate(("caches", "textures", "empty")):
+        probe = probes[name]
+        monitor.register(name, probe.measure, lambda p=probe, n=name: (order.append(n), p.evict()), priority)
+    if read_rss() is None:
+        return
+    assert monitor.sample()["evicted"] == ["caches", "textures"]
+    assert order == ["caches", "textures"]
+
+
+def test_budgets_from_settings_in_bytes():
+    assert budgets_from_settings({"memory_budgets_mb": {"rss": 0, "textures": 64}}) == {"textures": 64 * MB}
+    assert budgets_from_settings({}) == {}
+
+
+def test_function_caches_can_be_cleared():
+    from core.dice import parse
+
+    parse("2d6+3")
+    assert measure_function_caches()["count"] >= 1
+    clear_function_caches()
+    assert parse.cache_info().currsize == 0
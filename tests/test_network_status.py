@@ -0,0 +1,73 @@
+import threading
+
+from utils.network_status import (NetworkStatusService, WifiStatus, dbm_to_percent, parse_proc_wireless,
+                                  read_proc_status, signal_percent)
+
+PROC_WIRELESS = """Inter-| sta-|   Quality        |   Discarded packets               | Missed | WE
+ face | tus | link level noise |  nwid  crypt   frag  retry   misc | beacon | 22
+ wlan0: 0000   54.  -56.  -256        0      0      0      0      0        0
+"""
+
+
+def test_parse_proc_wireless():
+    assert parse_proc_wireless(PROC_WIRELESS) == [("wlan0", 54.0, -56.0)]
+    assert parse_proc_wireless(PROC_WIRELESS.splitlines(True)[0]) == []
+
+
+def test_signal_from_level_or_link_quality():
+    assert dbm_to_percent(-56) == 88 and dbm_to_percent(-120) == 0 and dbm_to_percent(-30) == 100
+    assert signal_percent(54.0, -56.0) == 88
+    assert signal_percent(35.0, 0.0) == 50
+
+
+def test_read_proc_status_from_file(tmp_path):
+    path = tmp_path / "wireless"
+    path.write_text(PROC_WIRELESS)
+    status = read_proc_status(str(path))
+    assert status.interface == "wlan0" and status.signal == 88 and status.level_dbm == -56
+    assert status.source == "proc" and status.connected
+    assert read_proc_status(str(tmp_path / "missing")) is None
+
+
+def test_status_texts():
+    assert WifiStatus().ssid_text == "Not Connected" and WifiStatus().signal_text == "0%"
+    assert WifiStatus("wlan0", "Taverne", 70).ssid_text == "Taverne"
+    assert WifiStatus(error="boom").signal_text == "Error"
+
+
+def test_poll_notifies_only_on_change():
+    readings = iter([WifiStatus("wlan0", "A", 50), WifiStatus("wlan0", "A", 50), WifiStatus("wlan0", "A", 60)])
+    service = NetworkStatusService(reader=lambda: next(readings))
+    received = []
+    service._subscribers.append(received.append)
+    for _ in range(3):
+        service.poll_once()
+    assert [status.signal for status in received] == [50, 60]
+    assert service.latest.signal == 60
+
+
+def test_reader_errors_become_status():
+    service = NetworkStatusService(reader=lambda: 1 / 0)
+    assert service.poll_once().error
+
+
+def test_worker_polls_and_refresh_wakes_it():
+    polled = threading.Event()
+    count = {"n": 0}
+
+    def reader():
+        count["n"] += 1
+        if count["n"] >= 2:
+            polled.set()
+        return WifiStatus("wlan0", "A", count["n"])
+
+    service = NetworkStatusService(interval=60, reader=reader)
+    received = []
+    service.subscribe(received.append)
+    service.refresh()
+    worker = service._thread
+    assert polled.wait(5)
+    service.close()
+    assert received and received[0].signal == 1
+    worker.join(5)
+    assert not worker.is_alive()
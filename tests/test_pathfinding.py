@@ -0,0 +1,83 @@
+import time
+
+import numpy as np
+
+from core.battle_map import BattleMap
+from core.pathfinding import MovementEngine, squares_for_speed
+
+
+def _corridor_map():
+    # Wand in Spalte 3 mit einer Tür in Zeile 2.
+    battle_map = BattleMap(6, 6)
+    battle_map.fill("Wall", cols=3)
+    battle_map.set_tile(2, 3, "Door")
+    return battle_map
+
+
+def test_speed_to_squares():
+    assert squares_for_speed(9.0) == 6
+    assert squares_for_speed(7.5) == 5
+
+
+def test_range_respects_walls_and_doors():
+    engine = MovementEngine(_corridor_map())
+    engine.place_token("Ayla", (0, 0))
+    reach = engine.movement_range("Ayla", 4)
+    assert (2, 3) in reach
+    assert (0, 3) not in reach
+    assert reach.cost_to((2, 4)) == 4
+    assert (0, 4) not in reach
+    path = reach.path_to((2, 4))
+    assert path[0] == (0, 0) and path[-1] == (2, 4) and (2, 3) in path
+
+
+def test_no_diagonal_squeeze_between_walls():
+    battle_map = BattleMap(3, 3)
+    battle_map.set_tile(0, 1, "Wall")
+    battle_map.set_tile(1, 0, "Wall")
+    engine = MovementEngine(battle_map)
+    engine.place_token("A", (0, 0))
+    assert len(engine.movement_range("A", 5)) == 1
+
+
+def test_tokens_block_and_cache_is_invalidated_incrementally():
+    engine = MovementEngine(BattleMap(40, 40))
+    engine.place_token("A", (0, 0))
+    engine.place_token("B", (30, 30))
+    engine.place_token("C", (0, 2))
+    reach_a = engine.movement_range("A", 3)
+    reach_b = engine.movement_range("B", 3)
+    assert (0, 2) not in reach_a
+
+    engine.move_token("C", (10, 10))
+    assert engine.movement_range("B", 3) is reach_b
+    new_reach_a = engine.movement_range("A", 3)
+    assert new_reach_a is not reach_a
+    assert (0, 2) in new_reach_a
+    assert engine.map.object_at(10, 10) == "C"
+
+    engine.set_tile(0, 1, "Wall")
+    assert engine.movement_range("A", 3).cost_to((0, 2)) == 2
+
+
+def test_find_path_matches_dijkstra():
+    engine = MovementEngine(_corridor_map())
+    path = engine.find_path((5, 0), (0, 5))
+    assert path[0] == (5, 0) and path[-1] == (0, 5)
+    engine.place_token("X", (5, 0))
+    assert len(path) - 1 == engine.movement_range("X", 20).cost_to((0, 5))
+    assert engine.find_path((5, 0), (0, 3)) is None
+
+
+def test_thirty_tokens_fit_in_a_frame():
+    rng = np.random.default_rng(0)
+    battle_map = BattleMap(200, 200)
+    battle_map.tiles[:] = (rng.random((200, 200)) < 0.15).astype(np.uint8)
+    engine = MovementEngine(battle_map)
+    for i in range(30):
+        engine.place_token(f"t{i}", (5 + i * 6, 100))
+        engine.set_tile(5 + i * 6, 100, "Floor")
+    started = time.perf_counter()
+    ranges = engine.movement_ranges({f"t{i}": 6 for i in range(30)})
+    assert time.perf_counter() - started < 1 / 30
+    assert all(len(r) > 1 for r in ranges.values())
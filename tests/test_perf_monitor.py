@@ -0,0 +1,62 @@
+import json
+
+import pytest
+
+import utils.perf_monitor as perf
+from utils.perf_monitor import PerfMonitor, RollingStats, instrument, timed
+
+
+@pytest.fixture
+def monitor(monkeypatch):
+    monitor = PerfMonitor(enabled=True, window=100)
+    monkeypatch.setattr(perf, "_monitor", monitor)
+    return monitor
+
+
+def test_rolling_percentiles_use_last_window():
+    stats = RollingStats(window=100)
+    for ms in range(1000):
+        stats.add(float(ms))
+    summary = stats.summary()
+    assert summary["count"] == 1000 and summary["max"] == 999
+    assert summary["p50"] == pytest.approx(949.5)
+    assert 990 <= summary["p99"] <= 999
+
+
+def test_disabled_monitor_records_nothing():
+    monitor = PerfMonitor(enabled=False)
+    monitor.record("frame", "frame", 16.0)
+    with monitor.measure("popup", "x"):
+        pass
+    assert monitor.summary() == {} and not monitor.events
+
+
+def test_timed_and_instrument(monitor):
+    @timed("popup")
+    def build():
+        return 42
+
+    class Screen:
+        def on_pre_enter(self, *args):
+            return "ok"
+
+    instrument(Screen, "on_pre_enter", "screen")
+    instrument(Screen, "on_pre_enter", "screen")
+    assert build() == 42
+    assert Screen().on_pre_enter() == "ok"
+    keys = set(monitor.summary())
+    assert ("screen", "Screen.on_pre_enter") in keys
+    assert any(category == "popup" and name.endswith("build") for category, name in keys)
+    assert monitor.summary()[("screen", "Screen.on_pre_enter")]["count"] == 1
+
+
+def test_export_chrome_trace(monitor, tmp_path):
+    monitor.record("frame", "frame", 16.7)
+    monitor.record("screen", "CharacterSheet.on_pre_enter", 120.0)
+    path = monitor.export_trace(str(tmp_path / "trace.json"))
+    with open(path, encoding="utf-8") as f:
+        trace = json.load(f)
+    events = trace["traceEvents"]
+    assert [e["cat"] for e in events] == ["frame", "screen"]
+    assert events[1]["ph"] == "X" and events[1]["dur"] == pytest.approx(120000.0)
+    assert "screen:CharacterSheet.on_pre_enter" in trace["otherData"]["summary"]
@@ -0,0 +1,47 @@
+from core.progression import ClassProgression, compile_progressions
+
+WIZARD = {
+    "hit_die": 6,
+    "features": {1: [{"name": "Zauberwirken", "desc": ""}], 4: [{"name": "Attributswerterhöhung", "desc": ""}]},
+    "progression": {
+        1: {"cantrips_known": 3, "spells_known": 6, "spell_slots": {"1": 2, "2": 0}},
+        2: {"cantrips_known": 3, "spells_known": 8, "spell_slots": {"1": 3, "2": 0}},
+        3: {"cantrips_known": 3, "spells_known": 10, "spell_slots": {"1": 4, "2": 2}},
+    },
+    "spell_list": {0: ["Feuerpfeil"], 1: ["Magisches Geschoss"], 2: ["Spinnenklettern"]},
+}
+CLERIC = dict(WIZARD, progression={level: {"cantrips_known": 3, "spell_slots": entry["spell_slots"]}
+                                   for level, entry in WIZARD["progression"].items()})
+
+
+def test_dense_tables_by_level():
+    progression = ClassProgression("Magier", WIZARD)
+    assert list(progression.max_spell_level[:4]) == [0, 1, 1, 2]
+    assert progression.slots[3, 2] == 2
+    assert progression.spell_slots(3) == {"1": 4, "2": 2}
+    assert progression.spell_slots(3) is not progression.spell_slots(3)
+    assert progression.gains_ability_increase(4) and not progression.gains_ability_increase(21)
+    assert [f["name"] for f in progression.features_up_to(20)] == ["Zauberwirken", "Attributswerterhöhung"]
+
+
+def test_known_caster_deltas():
+    progression = ClassProgression("Magier", WIZARD)
+    assert progression.initial_spells({"Intelligenz": 16}) == (3, 6)
+    assert progression.spells_to_learn(1, {"Intelligenz": 16}) == (0, 2)
+    assert progression.spells_to_learn(3, {"Intelligenz": 16}) == (0, 0)
+
+
+def test_prepared_caster_formula():
+    progression = ClassProgression("Kleriker", CLERIC)
+    assert progression.initial_spells({"Weisheit": 16}) == (3, 4)
+    assert progression.initial_spells({"Weisheit": 6}) == (3, 1)
+    assert progression.spells_to_learn(2, {"Weisheit": 16}) == (0, 1)
+
+
+def test_validation_reports_missing_levels_and_spells(capsys):
+    broken = dict(WIZARD, spell_list={0: ["Feuerpfeil"], 1: ["Magisches Geschoss"]})
+    compile_progressions({"Magier": broken}, {"Feuerpfeil": {"level": 0}})
+    output = capsys.readouterr().out
+    assert "Progression fehlt für Stufe" in output
+    assert "Grad 2, aber keine Zauber" in output
+    assert "unbekannter Zauber Magisches Geschoss" in output
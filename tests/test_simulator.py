@@ -0,0 +1,53 @@
+import pytest
+
+import core.simulator as simulator
+from core.enemy import Enemy
+from core.simulator import ENEMIES, PARTY, CombatantSpec, format_report, simulate_encounter, spec_from_enemy
+
+
+def _party():
+    return [CombatantSpec(f"Held {i}", PARTY, 30, 16, 5, "1d8+3", initiative=2) for i in range(4)]
+
+
+def _goblins(count):
+    return [Enemy("Goblin", 7, 15, [{"name": "Krummsäbel", "bonus": 4, "damage": "1W6+2"}], dexterity=14)
+            for _ in range(count)]
+
+
+def test_same_seed_same_report():
+    a = simulate_encounter(_party(), _goblins(4), trials=2000, seed=5, workers=1)
+    b = simulate_encounter(_party(), _goblins(4), trials=2000, seed=5, workers=1)
+    assert a == b
+    assert a["party_win_rate"] + a["enemy_win_rate"] + a["undecided_rate"] == pytest.approx(1.0)
+
+
+def test_process_pool_matches_in_process(monkeypatch):
+    monkeypatch.setattr(simulator, "CHUNK_SIZE", 500)
+    serial = simulate_encounter(_party(), _goblins(5), trials=2000, seed=9, workers=1)
+    parallel = simulate_encounter(_party(), _goblins(5), trials=2000, seed=9, workers=2)
+    assert serial == parallel
+
+
+def test_balance_moves_with_encounter_size():
+    easy = simulate_encounter(_party(), _goblins(2), trials=3000, seed=1, workers=1)
+    hard = simulate_encounter(_party()[:1], _goblins(12), trials=3000, seed=1, workers=1)
+    assert easy["party_win_rate"] > 0.95
+    assert hard["party_win_rate"] < 0.2
+    assert hard["party_downs_mean"] > easy["party_downs_mean"]
+    assert easy["rounds_mean"] >= 1
+    assert "Siegchance" in format_report(easy)
+
+
+def test_enemy_spec_picks_best_attack_and_multiattack():
+    owlbear = Enemy("Eulenbär", 59, 13, [{"name": "Schnabel", "bonus": 7, "damage": "1W10+5"},
+                                        {"name": "Klauen", "bonus": 7, "damage": "2W8+5"}],
+                    notes="Mehrfachangriff", dexterity=12)
+    spec = spec_from_enemy(owlbear)
+    assert (spec.damage, spec.attacks, spec.initiative, spec.side) == ("2W8+5", 2, 1, ENEMIES)
+    legacy = spec_from_enemy(Enemy.from_dict({"name": "Orc", "hp": 15, "ac": 13, "attacks": []}))
+    assert legacy.damage == "1" and legacy.armor_class == 13
+
+
+def test_needs_both_sides():
+    with pytest.raises(ValueError):
+        simulate_encounter(_party(), [], trials=10)
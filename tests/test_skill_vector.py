@@ -0,0 +1,52 @@
+import pickle
+
+import numpy as np
+
+from core.character import STAT_INDEX, STAT_NAMES, Character, party_skill_matrix
+
+
+def _character(char_class="Schurke", **abilities):
+    character = Character("Testan", "Mensch", char_class)
+    character.base_abilities.update(abilities)
+    character.initialize_character()
+    character.proficiencies.append("Heimlichkeit")
+    character.touch()
+    return character
+
+
+def test_vector_matches_per_skill_calculation():
+    character = _character(Geschicklichkeit=15, Weisheit=13)
+    vector = character.skill_vector()
+    assert vector.shape == (len(STAT_NAMES),)
+    # Mensch +1: Geschicklichkeit 16 -> +3, Übungsbonus +2
+    assert vector[STAT_INDEX["Heimlichkeit"]] == 5
+    assert vector[STAT_INDEX["Akrobatik"]] == 3
+    assert vector[STAT_INDEX["Rettungswurf: Geschicklichkeit"]] == 5
+    assert vector[STAT_INDEX["Rettungswurf: Stärke"]] == 0
+    assert character.skill_bonus("Passive Wahrnehmung") == 12
+
+
+def test_vector_cached_until_state_changes():
+    character = _character()
+    first = character.skill_vector()
+    assert character.skill_vector() is first
+    character.level_up({"hp_roll": 4, "ability_increase": ["Geschicklichkeit", "Geschicklichkeit"]})
+    assert character.skill_vector() is not first
+    assert character.skill_bonus("Akrobatik") == first[STAT_INDEX["Akrobatik"]] + 1
+
+
+def test_old_pickles_without_version_still_work():
+    character = _character()
+    character.skill_vector()
+    del character.state_version
+    restored = pickle.loads(pickle.dumps(character))
+    assert "_skill_cache" not in restored.__dict__
+    assert restored.skill_bonus("Heimlichkeit") == character.skill_bonus("Heimlichkeit")
+
+
+def test_party_matrix():
+    party = [_character(), _character("Kleriker", Weisheit=17)]
+    matrix = party_skill_matrix(party)
+    assert matrix.shape == (2, len(STAT_NAMES))
+    assert np.array_equal(matrix[1], party[1].skill_vector())
+    assert party_skill_matrix([]).shape == (0, len(STAT_NAMES))
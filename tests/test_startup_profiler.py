@@ -0,0 +1,54 @@
+import json
+import sys
+
+from utils.startup_profiler import (FLAG, NullProfiler, StartupProfiler, compare_reports, format_summary,
+                                    start_from_environment)
+
+
+def test_disabled_by_default():
+    argv = ["main.py"]
+    assert isinstance(start_from_environment(argv, {}), NullProfiler)
+
+
+def test_flag_enables_and_is_removed_from_argv(tmp_path):
+    argv = ["main.py", FLAG]
+    profiler = start_from_environment(argv, {"DND_PROFILE_STARTUP": str(tmp_path / "p.json")})
+    try:
+        assert profiler.enabled and argv == ["main.py"]
+        assert profiler.report_path == str(tmp_path / "p.json")
+    finally:
+        profiler.remove_import_hook()
+
+
+def test_records_phases_and_nested_imports(tmp_path, monkeypatch, capsys):
+    (tmp_path / "slow_outer.py").write_text("import time\nimport slow_inner\ntime.sleep(0.01)\n")
+    (tmp_path / "slow_inner.py").write_text("import time\ntime.sleep(0.02)\n")
+    monkeypatch.syspath_prepend(str(tmp_path))
+    profiler = StartupProfiler(str(tmp_path / "startup.json"))
+    profiler.install_import_hook()
+    try:
+        with profiler.phase("imports"):
+            import slow_outer  # noqa: F401
+        with profiler.phase("sheet", "screen"):
+            pass
+    finally:
+        sys.modules.pop("slow_outer", None)
+        sys.modules.pop("slow_inner", None)
+    report = profiler.finish()
+
+    imports = {entry["module"]: entry for entry in report["imports"]}
+    assert imports["slow_outer"]["depth"] == 0 and imports["slow_inner"]["depth"] == 1
+    assert imports["slow_outer"]["ms"] >= imports["slow_inner"]["ms"] >= 20
+    assert imports["slow_outer"]["self_ms"] < imports["slow_outer"]["ms"]
+    assert [p["category"] for p in report["phases"]] == ["phase", "screen"]
+    assert json.loads((tmp_path / "startup.json").read_text())["total_ms"] == report["total_ms"]
+    assert "Screens:" in capsys.readouterr().out
+    assert "slow_outer" in format_summary(report)
+
+
+def test_compare_reports_flags_slow_phases():
+    def report(ms):
+        return {"total_ms": 100 + ms, "imports": [],
+                "phases": [{"name": "sheet", "category": "screen", "ms": ms, "start_ms": 0}]}
+    assert compare_reports(report(10), report(11)) == []
+    assert compare_reports(report(10), report(40))[0][0] == "screen:sheet"
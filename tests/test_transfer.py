@@ -0,0 +1,139 @@
+import os
+import random
+import socket
+import threading
+
+import pytest
+
+from utils.transfer import FileReceiver, FileSender, PART_SUFFIX
+
+
+class FlakyProxy:
+    """Loopback proxy that kills connections after a given number of bytes."""
+
+    def __init__(self, target_port, kill_offsets):
+        self.target_port = target_port
+        self.kill_offsets = list(kill_offsets)
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.sock.bind(('127.0.0.1', 0))
+        self.sock.listen()
+        self.port = self.sock.getsockname()[1]
+        self.connections = 0
+        threading.Thread(target=self._accept_loop, daemon=True).start()
+
+    def _accept_loop(self):
+        while True:
+            try:
+                client, _ = self.sock.accept()
+            except OSError:
+                return
+            self.connections += 1
+            limit = self.kill_offsets.pop(0) if self.kill_offsets else None
+            upstream = socket.create_connection(('127.0.0.1', self.target_port))
+            threading.Thread(target=self._pipe, args=(upstream, client, limit, upstream), daemon=True).start()
+            threading.Thread(target=self._pipe, args=(client, upstream, None, client), daemon=True).start()
+
+    def _pipe(self, src, dst, limit, owner):
+        forwarded = 0
+        try:
+            while True:
+                data = src.recv(4096)
+                if not data:
+                    break
+                if limit is not None and forwarded + len(data) >= limit:
+                    dst.sendall(data[:limit - forwarded])
+                    break
+                dst.sendall(data)
+                forwarded += len(data)
+        except OSError:
+            pass
+        finally:
+            for s in (src, dst):
+                try:
+                    s.shutdown(socket.SHUT_RDWR)
+                except OSError:
+                    pass
+                s.close()
+
+    def close(self):
+        self.sock.close()
+
+
+def _make_files(directory, rng, sizes):
+    paths = []
+    for i, size in enumerate(sizes):
+        path = os.path.join(directory, f"held_{i}.char")
+        with open(path, 'wb') as f:
+            f.write(rng.randbytes(size))
+        paths.append(path)
+    return paths
+
+
+@pytest.mark.parametrize("seed", [1, 2, 3, 4, 5])
+def test_transfer_survives_random_disconnects(tmp_path, seed):
+    rng = random.Random(seed)
+    src_dir = tmp_path / "src"
+    dst_dir = tmp_path / "dst"
+    src_dir.mkdir()
+    dst_dir.mkdir()
+    paths = _make_files(str(src_dir), rng, [rng.randint(1, 200_000) for _ in range(3)] + [0])
+
+    sender = FileSender(paths, host='127.0.0.1', port=0, chunk_size=4096, idle_timeout=10)
+    total = sum(os.path.getsize(p) for p in paths)
+    proxy = FlakyProxy(sender.port, [rng.randint(1, total) for _ in range(rng.randint(1, 4))])
+    server_thread = threading.Thread(target=sender.serve, daemon=True)
+    server_thread.start()
+
+    receiver = FileReceiver('127.0.0.1', proxy.port, dest_dir=str(dst_dir), retries=8, backoff=0.01)
+    received = receiver.run()
+    server_thread.join(timeout=10)
+    proxy.close()
+
+    assert sender.completed
+    assert sorted(received) == sorted(os.path.basename(p) for p in paths)
+    for path in paths:
+        with open(path, 'rb') as a, open(dst_dir / os.path.basename(path), 'rb') as b:
+            assert a.read() == b.read()
+    assert not any(name.endswith(PART_SUFFIX) for name in os.listdir(dst_dir))
+    assert proxy.connections > 1
+
+
+def test_resume_discards_mismatching_partial_file(tmp_path):
+    rng = random.Random(42)
+    src_dir = tmp_path / "src"
+    dst_dir = tmp_path / "dst"
+    src_dir.mkdir()
+    dst_dir.mkdir()
+    (path,) = _make_files(str(src_dir), rng, [50_000])
+    # A stale partial download from a different version of the file.
+    with open(dst_dir / (os.path.basename(path) + PART_SUFFIX), 'wb') as f:
+        f.write(rng.randbytes(20_000))
+
+    sender = FileSender([path], host='127.0.0.1', port=0, chunk_size=4096, idle_timeout=10)
+    threading.Thread(target=sender.serve, daemon=True).start()
+    FileReceiver('127.0.0.1', sender.port, dest_dir=str(dst_dir), retries=2, backoff=0.01).run()
+
+    with open(path, 'rb') as a, open(dst_dir / os.path.basename(path), 'rb') as b:
+        assert a.read() == b.read()
+
+
+@pytest.mark.parametrize("part_size, file_size", [(200_000, 150_000), (16_384, 16_384)])
+def test_stale_part_at_or_beyond_full_size_is_not_taken_as_complete(tmp_path, part_size, file_size):
+    rng = random.Random(7)
+    src_dir = tmp_path / "src"
+    dst_dir = tmp_path / "dst"
+    src_dir.mkdir()
+    dst_dir.mkdir()
+    (path,) = _make_files(str(src_dir), rng, [file_size])
+    name = os.path.basename(path)
+    (dst_dir / name).write_bytes(b"alte Fassung")
+    (dst_dir / (name + PART_SUFFIX)).write_bytes(rng.randbytes(part_size))
+
+    sender = FileSender([path], host='127.0.0.1', port=0, chunk_size=4096, idle_timeout=10)
+    threading.Thread(target=sender.serve, daemon=True).start()
+    received = FileReceiver('127.0.0.1', sender.port, dest_dir=str(dst_dir), retries=2, backoff=0.01).run()
+
+    assert received == [name]
+    with open(path, 'rb') as a:
+        assert (dst_dir / name).read_bytes() == a.read()
+    assert not (dst_dir / (name + PART_SUFFIX)).exists()
@@ -0,0 +1,98 @@
+import json
+import shutil
+
+import pytest
+
+import database
+import translate_spells
+from translate_spells import build_report, load_store, update_store, write_store
+
+FIREBALL = {"level": 3, "school": "Evocation", "desc": "A bright streak..."}
+SHIELD = {"level": 1, "school": "Abjuration", "desc": "An invisible barrier..."}
+
+
+@pytest.fixture
+def store_path(tmp_path):
+    path = tmp_path / "spell_translations.jsonl"
+    records = [
+        {"key": "Fireball", "name": "Feuerball", "level": 3, "school": "Hervorrufung", "desc": "Ein heller Strahl...",
+         "translated": True, "source_sha256": None},
+        {"key": "Shield", "name": "Schild", "level": 1, "school": "Bannmagie", "desc": "Eine Barriere...",
+         "translated": True, "source_sha256": translate_spells.entry_hash(SHIELD)},
+    ]
+    path.write_text("".join(json.dumps(r, ensure_ascii=False) + "\n" for r in records), encoding="utf-8")
+    return str(path)
+
+
+def test_only_new_spells_are_appended(store_path):
+    store = load_store(store_path)
+    update_store(store, {"Fireball": FIREBALL, "Shield": SHIELD})
+    write_store(store, {"Fireball": "bestätigt"}, store_path)
+    before = open(store_path, encoding="utf-8").read()
+
+    source = {"Fireball": FIREBALL, "Shield": SHIELD, "Wish": {"level": 9, "school": "Conjuration", "desc": "..."}}
+    store = load_store(store_path)
+    changes = update_store(store, source)
+    assert changes == {"Wish": "neu"}
+    assert write_store(store, changes, store_path) == "angehängt"
+    after = open(store_path, encoding="utf-8").read()
+    assert after.startswith(before)
+    assert json.loads(after.splitlines()[-1])["translated"] is False
+
+    # Unveränderte Quelle: nichts zu tun.
+    store = load_store(store_path)
+    assert update_store(store, source) == {}
+    assert write_store(store, {}, store_path) == "unverändert"
+
+
+def test_changed_source_marks_translation_outdated(store_path):
+    store = load_store(store_path)
+    update_store(store, {"Fireball": FIREBALL, "Shield": SHIELD})
+    changed = dict(SHIELD, desc="An invisible barrier of magical force...")
+    assert update_store(store, {"Fireball": FIREBALL, "Shield": changed}) == {}
+    assert store["Shield"]["desc"] == "Eine Barriere..."
+
+    report = build_report(store, {"Fireball": FIREBALL, "Shield": changed}, referenced={"Feuerball", "Blitz"})
+    assert "Veraltet (englischer Text geändert) (1):\n  Shield -> Schild" in report
+    assert "In Klassenlisten, aber nicht im Speicher (1):\n  Blitz" in report
+    assert "Nicht übersetzt" not in report
+
+
+def test_placeholder_follows_source_until_translated(store_path):
+    store = load_store(store_path)
+    update_store(store, {"Wish": {"level": 9, "school": "Conjuration", "desc": "v1"}})
+    assert update_store(store, {"Wish": {"level": 9, "school": "Conjuration", "desc": "v2"}}) == {"Wish": "aktualisiert"}
+    assert store["Wish"]["desc"] == "v2"
+    assert build_report(store).startswith("Nicht übersetzt (1):\n  Wish")
+
+
+def test_init_db_only_syncs_changed_spells(tmp_path, monkeypatch):
+    data_dir = tmp_path / "data"
+    shutil.copytree(database.DATA_DIR, data_dir)
+    monkeypatch.setattr(database, "DATA_DIR", str(data_dir))
+    monkeypatch.setattr(database, "DATABASE_FILE", str(tmp_path / "test.db"))
+    assert database.init_db() is True
+
+    conn = database.get_db_connection()
+    conn.execute("INSERT INTO weapons (name, damage, ability) VALUES ('Marker', '1W4', 'Stärke')")
+    conn.execute("UPDATE spells SET description = 'Abweichend' WHERE name = 'Feuerpfeil'")
+    conn.commit()
+    conn.close()
+
+    store_file = data_dir / database.SPELL_STORE
+    lines = store_file.read_text(encoding="utf-8").splitlines()
+    records = [json.loads(line) for line in lines]
+    records = [dict(r, desc="Neu") if r["name"] == "Feuerball" else r for r in records if r["name"] != "Schild"]
+    store_file.write_text("".join(json.dumps(r, ensure_ascii=False) + "\n" for r in records), encoding="utf-8")
+
+    assert database.init_db() is True
+    conn = database.get_db_connection()
+    spells = {row["name"]: row["description"] for row in conn.execute("SELECT name, description FROM spells")}
+    weapons = {row["name"] for row in conn.execute("SELECT name FROM weapons")}
+    conn.close()
+    assert spells["Feuerball"] == "Neu"
+    assert "Schild" not in spells
+    assert spells["Feuerpfeil"] != "Abweichend"
+    # Kein Neuaufbau der übrigen Tabellen.
+    assert "Marker" in weapons
+    assert database.init_db() is False
@@ -0,0 +1,186 @@
+import json
+import os
+import random
+import subprocess
+import zipfile
+
+import pytest
+
+from utils import update_bundle
+from utils.update_bundle import (
+    BundleError, SignatureError, apply_bundle, apply_delta, create_bundle, dir_tree, make_delta,
+    recover_interrupted_update, rollback,
+)
+
+KEY = b"test-key"
+
+
+def _write_tree(root, files):
+    for path, content in files.items():
+        full = root / path
+        full.parent.mkdir(parents=True, exist_ok=True)
+        full.write_bytes(content if isinstance(content, bytes) else content.encode("utf-8"))
+
+
+def _version(build):
+    return f"App Name:                      DnD\nBuild Version:                {build}\n"
+
+
+@pytest.fixture
+def trees(tmp_path):
+    rng = random.Random(1)
+    big = bytes(rng.randrange(256) for _ in range(20000))
+    old = {"version.txt": _version("01.09.2025 Main"), "main.py": "print('alt')\n" * 50,
+           "data/spells.json": big, "ui/old.kv": "<Old>:\n", "settings.json": "{}"}
+    new = {"version.txt": _version("11.09.2025 Main"), "main.py": "print('alt')\n" * 49 + "print('neu')\n",
+           "data/spells.json": big[:5000] + b"neuer Zauber" + big[5000:], "ui/new.kv": "<New>:\n",
+           "settings.json": '{"theme": "dark"}'}
+    old_dir, new_dir, app = tmp_path / "old", tmp_path / "new", tmp_path / "app"
+    _write_tree(old_dir, old)
+    _write_tree(new_dir, new)
+    _write_tree(app, old)
+    (app / "held.char").write_bytes(b"charakter")
+    bundle = str(tmp_path / "update.dndupdate")
+    create_bundle(dir_tree(str(old_dir)), dir_tree(str(new_dir)), KEY, bundle)
+    return app, new_dir, bundle
+
+
+def _snapshot(root):
+    return {path: content for path, (_, content) in dir_tree(str(root)).items()}
+
+
+def test_delta_roundtrip_is_small_for_small_changes():
+    rng = random.Random(2)
+    source = bytes(rng.randrange(256) for _ in range(50000))
+    target = source[:1000] + b"eingefuegt" + source[1000:30000] + source[30500:] + b"ende"
+    delta = make_delta(source, target)
+    assert apply_delta(source, delta) == target
+    assert len(delta) < 200
+    assert apply_delta(b"", make_delta(b"", b"nur neu")) == b"nur neu"
+
+
+def test_bundle_contains_only_changes_and_no_user_data(trees):
+    _, _, bundle = trees
+    with zipfile.ZipFile(bundle) as z:
+        manifest = json.loads(z.read("manifest.json"))
+    actions = {e["path"]: e["action"] for e in manifest["entries"]}
+    assert actions == {"version.txt": "delta", "main.py": "delta", "data/spells.json": "delta",
+                       "ui/old.kv": "delete", "ui/new.kv": "add"}
+    assert manifest["from_version"] == "01.09.2025 Main"
+    assert manifest["to_version"] == "11.09.2025 Main"
+    # Manifest und Zip-Verwaltung überwiegen; der 20 KB große Datensatz kostet nur seine Änderung.
+    assert os.path.getsize(bundle) < 4000
+
+
+def test_apply_and_rollback(trees):
+    app, new_dir, bundle = trees
+    before = _snapshot(app)
+    apply_bundle(bundle, root=str(app), key=KEY)
+    assert _snapshot(app) == _snapshot(new_dir)
+    assert (app / "settings.json").read_bytes() == b"{}"
+    assert (app / "held.char").read_bytes() == b"charakter"
+    assert not (app / update_bundle.STAGING_DIR).exists()
+
+    assert rollback(str(app)) == "01.09.2025 Main"
+    assert _snapshot(app) == before
+    with pytest.raises(BundleError):
+        rollback(str(app))
+
+
+def test_wrong_key_is_rejected(trees):
+    app, _, bundle = trees
+    before = _snapshot(app)
+    with pytest.raises(SignatureError):
+        apply_bundle(bundle, root=str(app), key=b"anderer-key")
+    assert _snapshot(app) == before
+
+
+def test_modified_installation_is_left_untouched(trees):
+    app, _, bundle = trees
+    (app / "data" / "spells.json").write_bytes(b"lokal geaendert")
+    before = _snapshot(app)
+    with pytest.raises(BundleError, match="spells.json"):
+        apply_bundle(bundle, root=str(app), key=KEY)
+    assert _snapshot(app) == before
+    assert not (app / update_bundle.JOURNAL_FILE).exists()
+    assert not (app / update_bundle.STAGING_DIR).exists()
+
+
+def test_wrong_version_is_rejected(trees):
+    app, _, bundle = trees
+    (app / "version.txt").write_text(_version("24.12.2025 Beta"))
+    with pytest.raises(BundleError, match="Version"):
+        apply_bundle(bundle, root=str(app), key=KEY)
+
+
+def test_interrupted_apply_is_rolled_back(trees, monkeypatch):
+    app, _, bundle = trees
+    before = _snapshot(app)
+    real_replace, calls = os.replace, []
+
+    def crash_after_three(src, dst):
+        if update_bundle.BACKUP_DIR in dst or update_bundle.STAGING_DIR in src:
+            calls.append(dst)
+            if len(calls) > 3:
+                raise OSError("Strom weg")
+        real_replace(src, dst)
+
+    monkeypatch.setattr(update_bundle.os, "replace", crash_after_three)
+    with pytest.raises(OSError):
+        apply_bundle(bundle, root=str(app), key=KEY)
+    monkeypatch.setattr(update_bundle.os, "replace", real_replace)
+
+    assert _snapshot(app) != before
+    assert recover_interrupted_update(str(app)) is True
+    assert _snapshot(app) == before
+    assert recover_interrupted_update(str(app)) is False
+
+
+def test_unsafe_paths_are_rejected(tmp_path):
+    bundle = str(tmp_path / "evil.dndupdate")
+    create_bundle({}, {"../outside.py": (0o644, b"x")}, KEY, bundle)
+    with pytest.raises(BundleError, match="Pfad"):
+        apply_bundle(bundle, root=str(tmp_path), key=KEY)
+    assert not (tmp_path.parent / "outside.py").exists()
+
+
+def test_git_tree_skips_protected_files(tmp_path):
+    repo = tmp_path / "repo"
+    _write_tree(repo, {"main.py": "x = 1\n", "dnd.db": b"\0db", "data/a.json": "[]"})
+    env = dict(os.environ, GIT_AUTHOR_NAME="t", GIT_AUTHOR_EMAIL="t@t", GIT_COMMITTER_NAME="t",
+               GIT_COMMITTER_EMAIL="t@t")
+    for args in (["init", "-q"], ["add", "."], ["commit", "-q", "-m", "init"]):
+        subprocess.run(["git", *args], cwd=repo, env=env, check=True, capture_output=True)
+    tree = update_bundle.git_tree("HEAD", str(repo))
+    assert {path: content for path, (_, content) in tree.items()} == {"main.py": b"x = 1\n", "data/a.json": b"[]"}
+
+
+def test_rejected_bundle_keeps_previous_update_rollbackable(trees, tmp_path):
+    app, new_dir, bundle = trees
+    before = _snapshot(app)
+    apply_bundle(bundle, root=str(app), key=KEY)
+
+    # Paket B hat die richtige Version, erwartet aber eine andere main.py: Fehler erst beim Entpacken.
+    stale = str(tmp_path / "stale.dndupdate")
+    base = dict(dir_tree(str(new_dir)), **{"main.py": (0o644, b"print('anders')\n")})
+    newer = dict(base, **{"main.py": (0o644, b"print('neuer')\n")})
+    create_bundle(base, newer, KEY, stale)
+    with pytest.raises(BundleError, match="main.py"):
+        apply_bundle(stale, root=str(app), key=KEY)
+
+    # Absturz beim Entpacken: nur ein Staging-Ordner bleibt zurück.
+    (app / update_bundle.STAGING_DIR / "main.py").parent.mkdir(parents=True, exist_ok=True)
+    (app / update_bundle.STAGING_DIR / "main.py").write_text("halb")
+    assert recover_interrupted_update(str(app)) is False
+    assert not (app / update_bundle.STAGING_DIR).exists()
+
+    assert rollback(str(app)) == "01.09.2025 Main"
+    assert _snapshot(app) == before
+
+
+def test_protected_paths_are_rejected_on_apply(tmp_path):
+    bundle = str(tmp_path / "evil.dndupdate")
+    create_bundle({}, {"settings.json": (0o644, b"{}"), "saves/held.char": (0o644, b"x")}, KEY, bundle)
+    with pytest.raises(BundleError, match="Benutzerdaten"):
+        apply_bundle(bundle, root=str(tmp_path), key=KEY)
+    assert not (tmp_path / "settings.json").exists()
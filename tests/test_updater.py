@@ -0,0 +1,141 @@
+import subprocess
+import sys
+
+import pytest
+
+import updater
+
+
+def _git(cwd, *args):
+    return subprocess.run(["git", *args], cwd=cwd, check=True, capture_output=True, text=True).stdout.strip()
+
+
+@pytest.fixture
+def clone(tmp_path, monkeypatch):
+    for key, value in (("GIT_AUTHOR_NAME", "t"), ("GIT_AUTHOR_EMAIL", "t@t"),
+                       ("GIT_COMMITTER_NAME", "t"), ("GIT_COMMITTER_EMAIL", "t@t")):
+        monkeypatch.setenv(key, value)
+    origin = tmp_path / "origin"
+    origin.mkdir()
+    _git(origin, "init", "-q", "-b", "main")
+    (origin / "requirements.txt").write_text("kivy\n")
+    (origin / "database.py").write_text("def init_db():\n    pass\n")
+    _git(origin, "add", ".")
+    _git(origin, "commit", "-q", "-m", "init")
+    _git(tmp_path, "clone", "-q", str(origin), "app")
+    app = tmp_path / "app"
+    monkeypatch.chdir(app)
+
+    calls = {"pip": 0, "relaunch": 0}
+    monkeypatch.setattr(updater, "install_requirements", lambda: calls.__setitem__("pip", calls["pip"] + 1))
+    monkeypatch.setattr(updater, "relaunch", lambda: calls.__setitem__("relaunch", calls["relaunch"] + 1))
+    monkeypatch.setattr(updater, "build_assets", lambda: subprocess.CompletedProcess([], 0, "", ""))
+    return origin, app, calls
+
+
+def _statuses(timer):
+    return {step["name"]: step["status"] for step in timer.steps}
+
+
+def test_pip_runs_only_when_requirements_change(clone):
+    origin, app, calls = clone
+    updater.run_update("main")
+    assert calls == {"pip": 1, "relaunch": 1}
+
+    (origin / "main.kv").write_text("# only a kv change\n")
+    _git(origin, "add", ".")
+    _git(origin, "commit", "-q", "-m", "kv")
+    timer = updater.run_update("main")
+    assert calls["pip"] == 1
+    assert (app / "main.kv").exists()
+    assert _statuses(timer)["Python-Abhängigkeiten installieren"].startswith("übersprungen")
+
+    (origin / "requirements.txt").write_text("kivy\nnumpy\n")
+    _git(origin, "commit", "-q", "-am", "numpy")
+    updater.run_update("main")
+    assert calls["pip"] == 2
+
+
+def test_up_to_date_branch_skips_reset_and_records_timings(clone):
+    _, app, calls = clone
+    updater.run_update("main")
+    timer = updater.run_update("main")
+    assert _statuses(timer)["Auf Stand bringen"] == "übersprungen: bereits aktuell"
+    state = updater.load_state()
+    assert state["last_update"]["ok"] and state["last_update"]["steps"]
+    assert calls["relaunch"] == 2
+
+
+def test_rewritten_database_does_not_force_a_reset(clone):
+    origin, app, _ = clone
+    (origin / "dnd.db").write_bytes(b"v1")
+    _git(origin, "add", ".")
+    _git(origin, "commit", "-q", "-m", "db")
+    updater.run_update("main")
+
+    # Jeder App-Start schreibt dnd.db neu; das allein ist kein Grund zum Zurücksetzen.
+    (app / "dnd.db").write_bytes(b"v2")
+    timer = updater.run_update("main")
+    assert _statuses(timer)["Auf Stand bringen"] == "übersprungen: bereits aktuell"
+
+    (app / "requirements.txt").write_text("kivy\nlokal\n")
+    timer = updater.run_update("main")
+    assert "Auf origin/main zurücksetzen" in _statuses(timer)
+    assert (app / "requirements.txt").read_text() == "kivy\n"
+
+
+def test_reset_keeps_untracked_user_data(clone):
+    origin, app, _ = clone
+    (origin / "dnd.db").write_bytes(b"v1")
+    _git(origin, "add", ".")
+    _git(origin, "commit", "-q", "-m", "db")
+    updater.run_update("main")
+
+    (app / "dnd.db").write_bytes(b"lokal neu aufgebaut")
+    (app / "encounters.db").write_bytes(b"gespeicherte Gegnerlisten")
+    (origin / "main.kv").write_text("# neu\n")
+    _git(origin, "add", ".")
+    _git(origin, "commit", "-q", "-m", "kv")
+    timer = updater.run_update("main")
+    assert "Auf origin/main zurücksetzen" in _statuses(timer)
+    assert (app / "encounters.db").read_bytes() == b"gespeicherte Gegnerlisten"
+
+
+def test_failed_fetch_still_relaunches(clone):
+    _, _, calls = clone
+    timer = updater.run_update("does-not-exist")
+    assert calls["relaunch"] == 1
+    assert not updater.load_state()["last_update"]["ok"]
+    assert timer.steps[-1]["status"] == "fehler"
+
+
+def test_wait_for_exit():
+    child = subprocess.Popen([sys.executable, "-c", "import time; time.sleep(0.2)"])
+    assert updater.process_exists(child.pid)
+    assert updater.wait_for_exit(child.pid, timeout=0.01) is False
+    child.wait()
+    assert updater.wait_for_exit(child.pid, timeout=5)
+
+
+def test_bundle_update_replaces_git_steps(clone, tmp_path, monkeypatch):
+    from utils.update_bundle import create_bundle, dir_tree
+    _, app, calls = clone
+    monkeypatch.setenv("DND_UPDATE_KEY", "geheim")
+    new = tmp_path / "new"
+    new.mkdir()
+    (new / "requirements.txt").write_text("kivy\n")
+    (new / "database.py").write_text("def init_db():\n    pass\n")
+    (new / "main.kv").write_text("# offline\n")
+    bundle = str(tmp_path / "offline.dndupdate")
+    create_bundle(dir_tree(str(app)), dir_tree(str(new)), None, bundle)
+
+    timer = updater.run_update("main", bundle=bundle)
+    assert (app / "main.kv").read_text() == "# offline\n"
+    assert "Branch main holen" not in _statuses(timer)
+    assert updater.load_state()["last_update"]["ok"] is True
+    assert calls["relaunch"] == 1
+
+    monkeypatch.setenv("DND_UPDATE_KEY", "falsch")
+    updater.run_update("main", bundle=bundle)
+    state = updater.load_state()["last_update"]
+    assert state["ok"] is False and "Signatur" in state["error"]
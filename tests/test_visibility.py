@@ -0,0 +1,69 @@
+import numpy as np
+
+from core.battle_map import BattleMap
+from core.visibility import VisibilityEngine, compute_fov, decode_fog
+
+
+def _room_with_door():
+    # Zwei Räume, getrennt durch eine Wand in Spalte 5 mit einer Tür in Zeile 4.
+    battle_map = BattleMap(9, 11)
+    battle_map.fill("Wall", cols=5)
+    battle_map.set_tile(4, 5, "Door")
+    return battle_map
+
+
+def test_open_room_is_fully_visible():
+    battle_map = BattleMap(7, 7)
+    engine = VisibilityEngine(battle_map)
+    engine.set_viewer("A", (3, 3))
+    assert engine.visible("A").all()
+    engine.set_viewer("B", (3, 3), radius=1)
+    assert engine.visible("B").sum() == 9
+
+
+def test_walls_block_and_are_seen():
+    engine = VisibilityEngine(_room_with_door())
+    engine.set_viewer("A", (4, 2))
+    assert engine.is_visible("A", (4, 5))
+    assert engine.is_visible("A", (0, 5))
+    assert not engine.is_visible("A", (4, 8))
+
+
+def test_symmetry():
+    rng = np.random.default_rng(3)
+    battle_map = BattleMap(20, 20)
+    battle_map.tiles[:] = (rng.random((20, 20)) < 0.25).astype(np.uint8)
+    opaque = bytes(battle_map.tiles.ravel())
+    floor = [tuple(t) for t in np.argwhere(battle_map.tiles == 0)][:40]
+    views = {t: compute_fov(opaque, 20, 20, t) for t in floor}
+    for a in floor:
+        for b in floor:
+            assert (b[0] * 20 + b[1] in views[a]) == (a[0] * 20 + a[1] in views[b])
+
+
+def test_door_toggle_recomputes_only_affected_viewers():
+    engine = VisibilityEngine(_room_with_door())
+    engine.set_viewer("west", (4, 2))
+    engine.set_viewer("corner", (0, 9), radius=2)
+    engine.collect_changed()
+
+    assert engine.toggle_door(4, 5) == ["west"]
+    assert engine.is_visible("west", (4, 8))
+    assert engine.collect_changed() == {"west"}
+    assert engine.toggle_door(4, 5) == ["west"]
+    assert not engine.is_visible("west", (4, 8))
+
+
+def test_fog_accumulates_and_round_trips():
+    engine = VisibilityEngine(_room_with_door())
+    engine.set_viewer("A", (4, 2), radius=3)
+    assert engine.update_fog("client", ["A"])
+    engine.set_viewer("A", (4, 4), radius=3)
+    engine.toggle_door(4, 5)
+    assert engine.update_fog("client", ["A"])
+    assert not engine.update_fog("client", ["A"])
+
+    fog = decode_fog(engine.fog_packet("client"))
+    assert fog.shape == (9, 11)
+    assert np.array_equal(fog, engine.fog["client"])
+    assert fog[4, 0] and fog[4, 7]
@@ -1,4 +1,3 @@
-import random
 from functools import partial
 
 from kivy.uix.boxlayout import BoxLayout
@@ -13,8 +12,9 @@ from kivy.uix.checkbox import CheckBox
 from kivy.uix.screenmanager import Screen
 from data_manager import (
     RACE_DATA, CLASS_DATA, ALIGNMENT_DATA, BACKGROUND_DATA,
-    SKILL_LIST, FIGHTING_STYLE_DATA, SPELL_DATA
+    SKILL_LIST, FIGHTING_STYLE_DATA, SPELL_DATA, CLASS_PROGRESSIONS
 )
+from core import dice
 from core.character import Character
 from utils.helpers import apply_background, apply_styles_to_widget, create_styled_popup
 
@@ -104,8 +104,7 @@ class CharacterCreator(Screen):
 
     def roll_abilities(self, instance):
         for ability in self.ability_scores_labels:
-            rolls = sorted([random.randint(1, 6) for _ in range(4)])
-            score = sum(rolls[1:])
+            score = dice.roll("4d6kh3").total
             self.ability_scores_labels[ability].text = str(score)
 
     def create_character(self, instance):
@@ -126,9 +125,9 @@ class CharacterCreator(Screen):
         character.bonds = self.inputs["Bindungen"].text
         character.flaws = self.inputs["Makel"].text
 
-        class_data = CLASS_DATA.get(character.char_class, {})
+        progression = CLASS_PROGRESSIONS.get(character.char_class)
 
-        if "Kampfstil" in [f.get('name') for f in class_data.get("features", {}).get(1, [])]:
+        if progression and "Kampfstil" in [f.get('name') for f in progression.features_at(1)]:
              self.show_fighting_style_popup(character)
         elif character.race == "Halbelf":
             self.show_half_elf_choices_popup(character)
@@ -261,27 +260,20 @@ class CharacterCreator(Screen):
         popup.open()
 
     def show_initial_spell_selection_popup(self, character):
-        class_data = CLASS_DATA.get(character.char_class, {})
-        progression = class_data.get("progression", {})
-        level_1_prog = progression.get(1, {})
-        if not level_1_prog:
+        progression = CLASS_PROGRESSIONS.get(character.char_class)
+        cantrips_to_learn, spells_to_learn = progression.initial_spells(character.base_abilities) if progression else (0, 0)
+        if not cantrips_to_learn and not spells_to_learn:
             self.finish_character_creation(character)
             return
 
-        cantrips_to_learn = level_1_prog.get("cantrips_known", 0)
-        spells_to_learn = level_1_prog.get("spells_known", 0)
-
-        # Handle prepared casters like Cleric and Druid
-        if character.char_class in ["Kleriker", "Druide"]:
-            ability_modifier = (character.base_abilities["Weisheit"] - 10) // 2
-            spells_to_learn = max(1, ability_modifier + character.level)
+        if progression.preparation:
             popup_title_text = f"Bereite deine Startzauber für {character.char_class} vor"
             spell_label_text = f"Bereite {spells_to_learn} Zauber des 1. Grades vor"
         else:
             popup_title_text = f"Wähle deine Startzauber für {character.char_class}"
             spell_label_text = f"Wähle {spells_to_learn} Zauber des 1. Grades"
 
-        all_available_spells = class_data.get("spell_list", {})
+        all_available_spells = progression.spell_list
 
         popup_content = BoxLayout(orientation='vertical', padding=10, spacing=10)
         title = Label(text=popup_title_text, font_size='20sp', size_hint_y=None, height=44)
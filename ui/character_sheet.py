@@ -1,4 +1,3 @@
-import random
 from functools import partial
 import pickle
 import os
@@ -15,8 +14,12 @@ from kivy.uix.textinput import TextInput
 from kivy.uix.checkbox import CheckBox
 from kivy.properties import ObjectProperty
 
-from data_manager import WEAPON_DATA, SKILL_LIST, SPELL_DATA
+from core import dice
+from core.analytics import DEFAULT_TARGET_AC, spell_stats, weapon_stats
+from core.character import ABILITIES, PASSIVE_PERCEPTION, SAVES, SKILLS, STAT_INDEX
+from data_manager import WEAPON_DATA, SPELL_DATA
 from utils.helpers import apply_background, apply_styles_to_widget, create_styled_popup
+from utils.perf_monitor import timed
 
 class CharacterSheet(Screen):
     """Finaler Charakterbogen mit allen neuen Features."""
@@ -66,6 +69,7 @@ class CharacterSheet(Screen):
 
         self.ids.weapon_spinner.text = self.character.equipped_weapon
         self.ids.weapon_spinner.values = sorted(WEAPON_DATA.keys())
+        self.update_weapon_stats()
 
         self.ids.currency_box.clear_widgets()
         self.ids.currency_box.add_widget(Label(text="Währung", size_hint_x=None, width=100))
@@ -110,6 +114,15 @@ class CharacterSheet(Screen):
 
     def update_weapon(self, text):
         self.character.equipped_weapon = text
+        self.update_weapon_stats()
+
+    def update_weapon_stats(self):
+        """Zeigt den erwarteten Schaden der ausgerüsteten Waffe gegen eine typische RK."""
+        if not self.character or self.character.equipped_weapon not in WEAPON_DATA:
+            self.ids.weapon_stats_label.text = ""
+            return
+        stats = weapon_stats(self.character, self.character.equipped_weapon)
+        self.ids.weapon_stats_label.text = f"{stats.summary()} gg. RK {DEFAULT_TARGET_AC}"
 
     def change_hp(self, amount):
         self.character.hit_points += amount
@@ -154,12 +167,7 @@ class CharacterSheet(Screen):
             item = self.character.inventory[item_index]
             healing_info = item.get('healing')
             if healing_info:
-                num_dice = healing_info['count']
-                dice_type = healing_info['dice']
-
-                total_healed = 0
-                for _ in range(num_dice):
-                    total_healed += random.randint(1, dice_type)
+                total_healed = dice.roll(f"{healing_info['count']}d{healing_info['dice']}").total
 
                 self.character.hit_points = min(self.character.max_hit_points, self.character.hit_points + total_healed)
                 self.show_popup("Gegenstand benutzt", f"{total_healed} HP wiederhergestellt mit {item['name']}.")
@@ -297,11 +305,7 @@ class CharacterSheet(Screen):
         ability_name = weapon_info["ability"]
         modifier = (self.character.abilities[ability_name] - 10) // 2
 
-        parts = weapon_info["damage"].split('d')
-        num_dice = int(parts[0])
-        dice_type = int(parts[1])
-
-        roll_total = sum(random.randint(1, dice_type) for _ in range(num_dice))
+        roll_total = dice.roll(weapon_info["damage"]).total
         total_damage = roll_total + modifier
 
         self.show_popup(
@@ -322,13 +326,14 @@ class CharacterSheet(Screen):
             for feature in self.character.features:
                 features_text += f"- {feature['name']}\n"
 
+        bonuses = self.character.skill_vector()
         skills_text = "\n\n[b]Fähigkeiten:[/b]\n"
-        for skill, ability in SKILL_LIST.items():
-            modifier = (self.character.abilities[ability] - 10) // 2
-            if skill in self.character.proficiencies:
-                modifier += self.character.get_proficiency_bonus()
-            sign = "+" if modifier >= 0 else ""
-            skills_text += f"- {skill}: {sign}{modifier}\n"
+        for skill in SKILLS:
+            skills_text += f"- {skill}: {bonuses[STAT_INDEX[skill]]:+d}\n"
+        skills_text += "\n[b]Rettungswürfe:[/b]\n"
+        for save, ability in zip(SAVES, ABILITIES):
+            skills_text += f"- {ability}: {bonuses[STAT_INDEX[save]]:+d}\n"
+        skills_text += f"\n[b]{PASSIVE_PERCEPTION}:[/b] {bonuses[STAT_INDEX[PASSIVE_PERCEPTION]]}\n\n"
 
         text = (
             f"[b]Gesinnung:[/b] {self.character.alignment}\n\n"
@@ -344,6 +349,7 @@ class CharacterSheet(Screen):
         )
         self.show_popup("Charakter-Informationen", text)
 
+    @timed("popup")
     def show_spells_popup(self):
         content = ScrollView()
         grid = GridLayout(cols=1, size_hint_y=None, spacing=5, padding=10)
@@ -381,6 +387,9 @@ class CharacterSheet(Screen):
             f"[b]Schule:[/b] {spell_info.get('school', 'N/A')}\n\n"
             f"{spell_info.get('desc', 'Keine Beschreibung verfügbar.')}"
         )
+        stats = spell_stats(self.character, spell_name)
+        if stats:
+            text += f"\n\n[b]Erwarteter Schaden:[/b] {stats.summary()} gg. RK {DEFAULT_TARGET_AC}"
 
         content = BoxLayout(orientation='vertical', padding=10, spacing=10)
 
@@ -430,11 +439,11 @@ class CharacterSheet(Screen):
             self.show_popup("Fehler", f"Fehler beim Speichern: {e}")
 
     def roll_d20(self):
-        roll = random.randint(1, 20)
+        roll = dice.roll("1d20").total
         self.show_popup("d20 Wurf", f"Du hast eine {roll} gewürfelt.")
 
     def roll_initiative(self):
-        roll = random.randint(1, 20)
+        roll = dice.roll("1d20").total
         total = roll + self.character.initiative
         self.show_popup("Initiativewurf", f"Wurf: {roll} + {self.character.initiative} = {total}")
 
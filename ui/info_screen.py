@@ -1,9 +1,18 @@
-import os
 import sys
 import platform
+import threading
+from kivy.clock import Clock
 from kivy.uix.screenmanager import Screen
 from kivy.core.window import Window
 from utils.helpers import apply_background, apply_styles_to_widget
+from utils.folder_size import FolderSizeCache, format_size
+from utils.memory_monitor import get_memory_monitor
+
+MEMORY_REFRESH_INTERVAL = 2.0
+BREAKDOWN_ENTRIES = 5
+
+# Bleibt über alle Besuche erhalten, damit nur geänderte Ordner neu gelesen werden.
+_folder_cache = FolderSizeCache('.')
 
 class InfoScreen(Screen):
     """Bildschirm zur Anzeige von Systeminformationen."""
@@ -13,14 +22,66 @@ class InfoScreen(Screen):
         self.load_info()
         apply_background(self)
         apply_styles_to_widget(self)
+        self.update_memory_info()
+        self._memory_event = Clock.schedule_interval(self.update_memory_info, MEMORY_REFRESH_INTERVAL)
+
+    def on_leave(self, *args):
+        event = getattr(self, '_memory_event', None)
+        if event is not None:
+            event.cancel()
+            self._memory_event = None
+
+    def update_memory_info(self, *args):
+        """Zeigt die letzte Messung des Monitors an; Verlauf, Log und Budgets bleiben bei dessen Takt."""
+        monitor = get_memory_monitor()
+        self.ids.memory_info.text = monitor.format_report(monitor.current())
 
     def load_info(self):
-        """Sammelt die Systeminformationen und aktualisiert die Labels."""
-        self.ids.raspberry_model.text = f"Raspberry Pi Modell: {self.get_raspberry_pi_model()}"
-        self.ids.os_version.text = f"Betriebssystem: {self.get_os_version()}"
+        """
+        Zeigt sofort die Auflösung und die zuletzt bekannten Werte an; alles,
+        was Dateien liest, sammelt ein Hintergrund-Thread und trägt es nach.
+        """
         self.ids.resolution.text = f"Auflösung: {self.get_screen_resolution()}"
-        self.ids.folder_size.text = f"Größe des App-Ordners: {self.get_folder_size()} MB"
-        self.ids.version_info.text = self.get_version_info()
+        if not self.ids.version_info.text:
+            self.ids.raspberry_model.text = "Raspberry Pi Modell: wird geladen..."
+            self.ids.os_version.text = "Betriebssystem: wird geladen..."
+        previous = _folder_cache.last_result
+        if previous is not None:
+            self.show_folder_size(previous, updating=True)
+        else:
+            self.ids.folder_size.text = "Größe des App-Ordners: wird berechnet..."
+
+        worker = getattr(self, '_info_worker', None)
+        if worker is None or not worker.is_alive():
+            self._info_worker = threading.Thread(target=self._collect_info, daemon=True)
+            self._info_worker.start()
+
+    def _collect_info(self):
+        """Läuft im Hintergrund; jede Angabe wird einzeln an den UI-Thread übergeben."""
+        values = {
+            'raspberry_model': f"Raspberry Pi Modell: {self.get_raspberry_pi_model()}",
+            'os_version': f"Betriebssystem: {self.get_os_version()}",
+            'version_info': self.get_version_info(),
+        }
+        Clock.schedule_once(lambda dt: self._set_labels(values))
+        try:
+            result = _folder_cache.scan()
+        except Exception as e:
+            message = f"Größe des App-Ordners: Fehler ({e})"
+            Clock.schedule_once(lambda dt: setattr(self.ids.folder_size, 'text', message))
+            return
+        Clock.schedule_once(lambda dt: self.show_folder_size(result))
+
+    def _set_labels(self, values):
+        for label_id, text in values.items():
+            self.ids[label_id].text = text
+
+    def show_folder_size(self, result, updating=False):
+        """Gesamtgröße und die größten Unterordner."""
+        lines = [f"Größe des App-Ordners: {format_size(result.total)} ({result.files} Dateien)"
+                 + (" - wird aktualisiert..." if updating else "")]
+        lines += [f"    {name}: {format_size(size)}" for name, size in result.top(BREAKDOWN_ENTRIES)]
+        self.ids.folder_size.text = "\n".join(lines)
 
     def get_version_info(self):
         """Liest die Versionsinformationen aus der version.txt-Datei."""
@@ -51,13 +112,3 @@ class InfoScreen(Screen):
     def get_screen_resolution(self):
         """Gibt die Bildschirmauflösung zurück."""
         return f"{Window.width}x{Window.height}"
-
-    def get_folder_size(self):
-        """Berechnet die Größe des aktuellen Ordners."""
-        total_size = 0
-        for dirpath, dirnames, filenames in os.walk('.'):
-            for f in filenames:
-                fp = os.path.join(dirpath, f)
-                if not os.path.islink(fp):
-                    total_size += os.path.getsize(fp)
-        return round(total_size / (1024 * 1024), 2)  # Umrechnung in MB
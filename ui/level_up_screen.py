@@ -1,4 +1,3 @@
-import random
 from functools import partial
 import os
 
@@ -11,7 +10,8 @@ from kivy.uix.spinner import Spinner
 from kivy.uix.scrollview import ScrollView
 from kivy.uix.popup import Popup
 from kivy.uix.screenmanager import Screen
-from data_manager import CLASS_DATA, SPELL_DATA
+from core import dice
+from data_manager import CLASS_PROGRESSIONS, SPELL_DATA
 from utils.helpers import apply_styles_to_widget, create_styled_popup
 
 class LevelUpScreen(Screen):
@@ -38,12 +38,14 @@ class LevelUpScreen(Screen):
         new_level = self.character.level + 1
         self.ids.title_label.text = f"Stufenaufstieg zu Level {new_level}"
 
-        hit_die = CLASS_DATA.get(self.character.char_class, {}).get("hit_die", 8)
+        progression = CLASS_PROGRESSIONS.get(self.character.char_class)
+        hit_die = progression.hit_die if progression else 8
         con_modifier = (self.character.abilities["Konstitution"] - 10) // 2
-        hp_increase = random.randint(1, hit_die) + con_modifier
+        self.hp_roll = dice.roll_dice(1, hit_die)[0]
+        hp_increase = self.hp_roll + con_modifier
         level_up_layout.add_widget(Label(text=f"HP-Erhöhung: +{max(1, hp_increase)}", size_hint_y=None, height=40))
 
-        features = CLASS_DATA.get(self.character.char_class, {}).get("features", {}).get(new_level, [])
+        features = progression.features_at(new_level) if progression else ()
         if features:
             level_up_layout.add_widget(Label(text="Neue Fähigkeiten:", font_size='20sp', size_hint_y=None, height=40))
             for feature in features:
@@ -59,7 +61,7 @@ class LevelUpScreen(Screen):
         self.ability_increase_labels = {}
         self.ability_buttons = {}
 
-        if any("Attributswerterhöhung" in f['name'] for f in features):
+        if progression and progression.gains_ability_increase(new_level):
             level_up_layout.add_widget(Label(text="Attributsverbesserung (verteile 2 Punkte):", font_size='20sp', size_hint_y=None, height=40))
 
             self.points_label = Label(text="Verbleibende Punkte: 2", size_hint_y=None, height=40)
@@ -86,52 +88,25 @@ class LevelUpScreen(Screen):
                 box.add_widget(minus_btn)
                 level_up_layout.add_widget(box)
 
-        class_data = CLASS_DATA.get(self.character.char_class, {})
-        if "progression" in class_data:
-            progression = class_data.get("progression", {})
-            if self.character.level + 1 in progression:
-                manage_spells_btn = Button(text="Zauber auswählen", on_press=self.show_spell_selection_popup, size_hint_y=None, height=40)
-                level_up_layout.add_widget(manage_spells_btn)
+        if progression and progression.has_spell_choices(new_level):
+            manage_spells_btn = Button(text="Zauber auswählen", on_press=self.show_spell_selection_popup, size_hint_y=None, height=40)
+            level_up_layout.add_widget(manage_spells_btn)
 
     def show_spell_selection_popup(self, instance):
-        class_data = CLASS_DATA.get(self.character.char_class, {})
-        if not class_data or "progression" not in class_data:
-            return
-
-        progression = class_data["progression"]
+        progression = CLASS_PROGRESSIONS.get(self.character.char_class)
         current_level = self.character.level
         new_level = current_level + 1
-
-        old_prog = progression.get(current_level, {})
-        new_prog = progression.get(new_level, {})
-        if not old_prog or not new_prog:
+        if not progression or not progression.has_spell_choices(new_level):
             return
 
-        cantrips_to_learn = new_prog.get("cantrips_known", 0) - old_prog.get("cantrips_known", 0)
-        spells_to_learn = new_prog.get("spells_known", 0) - old_prog.get("spells_known", 0)
-        can_replace_spell = self.character.char_class == "Barde"
-
-        # Handle prepared casters
-        if self.character.char_class in ["Kleriker", "Druide"]:
-            # For simplicity, we'll let them "learn" one new spell, as their preparable count increases by 1 each level.
-            spells_to_learn = 1
-        elif self.character.char_class == "Paladin":
-            # Paladins gain spells at level 2, and their preparable count changes based on half their level.
-            old_preparable = (self.character.abilities["Charisma"] - 10) // 2 + current_level // 2
-            new_preparable = (self.character.abilities["Charisma"] - 10) // 2 + new_level // 2
-            spells_to_learn = max(0, new_preparable - old_preparable)
-            if new_level == 2:
-                spells_to_learn = (self.character.abilities["Charisma"] - 10) // 2 + 1 # Initial spells at level 2
-
-        max_spell_level = 0
-        for level, slots in new_prog["spell_slots"].items():
-            if slots > 0:
-                max_spell_level = max(max_spell_level, int(level))
+        cantrips_to_learn, spells_to_learn = progression.spells_to_learn(current_level, self.character.abilities)
+        can_replace_spell = progression.replaces_spells
+        max_spell_level = int(progression.max_spell_level[new_level])
 
         known_cantrips = self.character.spells.get(0, [])
         known_spells_flat = [spell for lvl, spells in self.character.spells.items() if lvl > 0 for spell in spells]
 
-        all_available_spells = class_data.get("spell_list", {})
+        all_available_spells = progression.spell_list
 
         popup_content = BoxLayout(orientation='vertical', padding=10, spacing=10)
         scroll_content = GridLayout(cols=1, size_hint_y=None, spacing=15)
@@ -312,7 +287,7 @@ class LevelUpScreen(Screen):
         self.show_popup(f"Info: {ability_name}", descriptions.get(ability_name, "Keine Beschreibung verfügbar."))
 
     def confirm_level_up(self):
-        choices = {}
+        choices = {"hp_roll": getattr(self, 'hp_roll', None)}
 
         if hasattr(self, 'total_points_allocated') and self.total_points_allocated > 0:
             if self.total_points_allocated != 2:
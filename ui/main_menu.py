@@ -11,6 +11,7 @@ from kivy.uix.scrollview import ScrollView
 from kivy.uix.screenmanager import Screen
 
 from utils.helpers import apply_background, apply_styles_to_widget, create_styled_popup
+from utils.perf_monitor import timed
 
 class MainMenu(Screen):
     """Hauptmenü-Bildschirm zum Erstellen oder Laden eines Charakters."""
@@ -31,6 +32,7 @@ class MainMenu(Screen):
     def switch_to_creator(self):
         self.manager.current = 'creator'
 
+    @timed("popup")
     def show_load_popup(self):
         content = BoxLayout(orientation='vertical', spacing=10)
         popup_layout = GridLayout(cols=1, spacing=10, size_hint_y=None)
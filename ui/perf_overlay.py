@@ -0,0 +1,61 @@
+from kivy.clock import Clock
+from kivy.graphics import Color, Rectangle
+from kivy.uix.boxlayout import BoxLayout
+from kivy.uix.button import Button
+from kivy.uix.label import Label
+
+from utils.perf_monitor import get_monitor
+
+REFRESH_INTERVAL = 0.5
+SLOWEST_ENTRIES = 4
+
+
+class PerfOverlay(BoxLayout):
+    """Kleine Debug-Anzeige oben links: Frame-Zeiten und die langsamsten Screens/Popups."""
+
+    def __init__(self, **kwargs):
+        kwargs.setdefault('orientation', 'vertical')
+        kwargs.setdefault('size_hint', (None, None))
+        kwargs.setdefault('size', (360, 170))
+        kwargs.setdefault('pos_hint', {'x': 0, 'top': 1})
+        super(PerfOverlay, self).__init__(**kwargs)
+        self.monitor = get_monitor()
+
+        with self.canvas.before:
+            Color(0, 0, 0, 0.6)
+            self._background = Rectangle(pos=self.pos, size=self.size)
+        self.bind(pos=self._update_background, size=self._update_background)
+
+        self.label = Label(font_size='12sp', halign='left', valign='top', markup=True)
+        self.label.bind(size=self.label.setter('text_size'))
+        self.add_widget(self.label)
+        export_btn = Button(text="Trace speichern", size_hint_y=None, height=30, font_size='12sp')
+        export_btn.bind(on_press=self.export_trace)
+        self.add_widget(export_btn)
+
+        self._event = Clock.schedule_interval(self.refresh, REFRESH_INTERVAL)
+
+    def _update_background(self, *args):
+        self._background.pos = self.pos
+        self._background.size = self.size
+
+    def refresh(self, dt):
+        summary = self.monitor.summary()
+        frame = summary.get(("frame", "frame"))
+        lines = []
+        if frame:
+            fps = 1000 / frame["p50"] if frame["p50"] else 0
+            lines.append(f"[b]Frame[/b] {fps:.0f} FPS  p50 {frame['p50']:.1f}  p95 {frame['p95']:.1f}  "
+                         f"p99 {frame['p99']:.1f} ms")
+        others = [(key, stats) for key, stats in summary.items() if key[0] != "frame"]
+        others.sort(key=lambda item: -item[1]["p95"])
+        for (category, name), stats in others[:SLOWEST_ENTRIES]:
+            lines.append(f"{category} {name}: p95 {stats['p95']:.0f} / max {stats['max']:.0f} ms ({stats['count']}x)")
+        self.label.text = "\n".join(lines) or "Noch keine Messwerte"
+
+    def export_trace(self, instance):
+        path = self.monitor.export_trace()
+        self.label.text = f"Trace gespeichert: {path}"
+
+    def stop(self):
+        self._event.cancel()
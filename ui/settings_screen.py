@@ -21,6 +21,7 @@ from utils.helpers import (
     load_settings, save_settings, apply_styles_to_widget, apply_background,
     create_styled_popup
 )
+from utils.network_status import get_network_status
 
 class SettingsScreen(Screen):
     """Screen for detailed application settings."""
@@ -138,49 +139,17 @@ class SettingsScreen(Screen):
         save_btn.bind(on_press=save_color)
         popup.open()
 
-    def _get_wifi_status(self):
-        if not sys.platform.startswith('linux'):
-            return "N/A", "N/A"
-
-        try:
-            # Try with nmcli first
-            result = subprocess.check_output(['nmcli', '-t', '-f', 'ACTIVE,SSID,SIGNAL', 'dev', 'wifi'], encoding='utf-8')
-            for line in result.strip().split('\n'):
-                if line.startswith('yes:'):
-                    parts = line.split(':')
-                    ssid = parts[1]
-                    signal = parts[2]
-                    return ssid, f"{signal}%"
-        except (subprocess.CalledProcessError, FileNotFoundError):
-            # Fallback to iwconfig
-            try:
-                result = subprocess.check_output(['iwconfig'], encoding='utf-8')
-                ssid, signal = "Not Connected", "0"
-                for line in result.split('\n'):
-                    if "ESSID:" in line:
-                        ssid = line.split('ESSID:"')[1].split('"')[0]
-                    if "Signal level=" in line:
-                        # This can be in dBm, need to convert to percentage.
-                        # This is a rough approximation.
-                        signal_dbm = int(line.split('Signal level=')[1].split(' dBm')[0])
-                        if signal_dbm <= -100:
-                            signal = "0"
-                        elif signal_dbm >= -50:
-                            signal = "100"
-                        else:
-                            signal = str(2 * (signal_dbm + 100))
-                return ssid, f"{signal}%"
-            except (subprocess.CalledProcessError, FileNotFoundError):
-                return "Error", "Error"
-        return "Not Connected", "0%"
-
     def show_wifi_popup(self):
         content = BoxLayout(orientation='vertical', padding=10, spacing=10)
         content.add_widget(Label(text='Wifi Status'))
 
-        ssid, signal = self._get_wifi_status()
-        self.wifi_status_label = Label(text=f'SSID: {ssid}\nSignal: {signal}')
+        # Der Status kommt vom Hintergrunddienst; bis zur ersten Messung steht hier ein Platzhalter.
+        self.wifi_status_label = Label(text='SSID: ...\nSignal: ...')
         content.add_widget(self.wifi_status_label)
+        network_status = get_network_status()
+        latest = network_status.subscribe(self._on_wifi_status)
+        if latest is not None:
+            self._show_wifi_status(latest)
 
         refresh_button = Button(text="Refresh Status", size_hint_y=None, height=50)
         refresh_button.bind(on_press=self.refresh_wifi_status)
@@ -193,14 +162,21 @@ class SettingsScreen(Screen):
         close_button = Button(text="Close", size_hint_y=None, height=50)
 
         self.wifi_popup = create_styled_popup(title="Wifi Settings", content=content, size_hint=(0.8, 0.8))
+        self.wifi_popup.bind(on_dismiss=lambda *args: network_status.unsubscribe(self._on_wifi_status))
         close_button.bind(on_press=self.wifi_popup.dismiss)
         content.add_widget(close_button)
 
         self.wifi_popup.open()
 
+    def _on_wifi_status(self, status):
+        # Wird vom Netzwerk-Thread aufgerufen.
+        Clock.schedule_once(lambda dt: self._show_wifi_status(status))
+
+    def _show_wifi_status(self, status):
+        self.wifi_status_label.text = f'SSID: {status.ssid_text}\nSignal: {status.signal_text}'
+
     def refresh_wifi_status(self, instance):
-        ssid, signal = self._get_wifi_status()
-        self.wifi_status_label.text = f'SSID: {ssid}\nSignal: {signal}'
+        get_network_status().refresh()
 
     def scan_for_wifi(self, instance):
         if not sys.platform.startswith('linux'):
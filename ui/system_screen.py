@@ -6,6 +6,7 @@ from kivy.app import App
 from kivy.uix.boxlayout import BoxLayout
 from kivy.uix.label import Label
 from kivy.uix.button import Button
+from kivy.uix.filechooser import FileChooserListView
 from kivy.uix.popup import Popup
 from kivy.uix.screenmanager import Screen
 from kivy.clock import Clock
@@ -13,6 +14,10 @@ from kivy.clock import Clock
 from utils.helpers import (
     apply_styles_to_widget, apply_background, create_styled_popup
 )
+from utils.update_bundle import BUNDLE_SUFFIX, BundleError, describe
+
+# USB-Sticks werden unter Raspberry Pi OS hier eingehängt; per LAN empfangene Pakete liegen im App-Ordner.
+USB_MOUNT_ROOT = "/media"
 
 
 class SystemScreen(Screen):
@@ -94,6 +99,10 @@ class SystemScreen(Screen):
         btn_layout.add_widget(beta_btn)
         content.add_widget(btn_layout)
 
+        offline_btn = Button(text="Offline-Paket (USB-Stick/LAN)", on_press=lambda x: self.choose_update_bundle(),
+                             font_size='20sp', size_hint_y=None, height=80)
+        content.add_widget(offline_btn)
+
         cancel_layout = BoxLayout(spacing=10, size_hint_y=None, height=80)
         cancel_btn = Button(text="Abbrechen", on_press=lambda x: self.branch_popup.dismiss(), font_size='20sp')
         cancel_layout.add_widget(cancel_btn)
@@ -101,9 +110,50 @@ class SystemScreen(Screen):
 
         apply_styles_to_widget(content)
 
-        self.branch_popup = create_styled_popup(title="Update Branch auswählen", content=content, size_hint=(0.6, 0.6))
+        self.branch_popup = create_styled_popup(title="Update Branch auswählen", content=content, size_hint=(0.6, 0.7))
         self.branch_popup.open()
 
+    def choose_update_bundle(self):
+        """Dateiauswahl für ein signiertes Update-Paket."""
+        self.branch_popup.dismiss()
+        content = BoxLayout(orientation='vertical', spacing=10)
+        initial_path = USB_MOUNT_ROOT if os.path.isdir(USB_MOUNT_ROOT) else os.path.abspath(".")
+        filechooser = FileChooserListView(path=initial_path, filters=[f'*{BUNDLE_SUFFIX}'])
+        content.add_widget(filechooser)
+
+        button_layout = BoxLayout(size_hint_y=None, height=50, spacing=10)
+        select_btn = Button(text="Einspielen")
+        cancel_btn = Button(text="Abbrechen")
+        button_layout.add_widget(select_btn)
+        button_layout.add_widget(cancel_btn)
+        content.add_widget(button_layout)
+
+        popup = create_styled_popup(title="Update-Paket auswählen", content=content, size_hint=(0.9, 0.9))
+
+        def select_file(instance):
+            if not filechooser.selection or not os.path.isfile(filechooser.selection[0]):
+                self.show_popup("Fehler", "Keine Datei ausgewählt.")
+                return
+            bundle_path = filechooser.selection[0]
+            try:
+                # Signatur schon hier prüfen, damit die App für ein falsches Paket nicht beendet wird.
+                summary = describe(bundle_path)
+            except (BundleError, OSError, ValueError) as e:
+                self.show_popup("Ungültiges Paket", str(e))
+                return
+            popup.dismiss()
+            self.start_bundle_update(bundle_path, summary)
+
+        select_btn.bind(on_press=select_file)
+        cancel_btn.bind(on_press=popup.dismiss)
+        popup.open()
+
+    def start_bundle_update(self, bundle_path, summary):
+        self.popup = create_styled_popup(title='Update', content=Label(text=f'Offline-Update {summary}\nwird vorbereitet...'), size_hint=(0.6, 0.4))
+        self.popup.auto_dismiss = False
+        self.popup.open()
+        Clock.schedule_once(lambda dt: self._update_task("main", bundle_path), 0.1)
+
     def start_update(self, branch):
         self.branch_popup.dismiss()
         self.popup = create_styled_popup(title='Update', content=Label(text=f'Update für Branch "{branch}" wird vorbereitet...'), size_hint=(0.6, 0.4))
@@ -111,10 +161,15 @@ class SystemScreen(Screen):
         self.popup.open()
         Clock.schedule_once(lambda dt: self._update_task(branch), 0.1)
 
-    def _update_task(self, branch):
+    def _update_task(self, branch, bundle_path=None):
         try:
-            self.popup.content.text = f"Updater für Branch '{branch}' wird gestartet...\nDie Anwendung wird sich nun schließen."
-            subprocess.Popen([sys.executable, "updater.py", branch])
+            command = [sys.executable, "updater.py", branch, "--wait-pid", str(os.getpid())]
+            if bundle_path:
+                command += ["--bundle", os.path.abspath(bundle_path)]
+                self.popup.content.text = "Updater für das Offline-Paket wird gestartet...\nDie Anwendung wird sich nun schließen."
+            else:
+                self.popup.content.text = f"Updater für Branch '{branch}' wird gestartet...\nDie Anwendung wird sich nun schließen."
+            subprocess.Popen(command)
             Clock.schedule_once(lambda x: App.get_running_app().stop(), 0.5)
         except Exception as e:
             self.popup.content.text = f"Fehler beim Starten des Updaters:\n{e}"
@@ -1,14 +1,17 @@
 from kivy.uix.screenmanager import Screen
-from kivy.properties import StringProperty, ListProperty, BooleanProperty
+from kivy.properties import StringProperty, ListProperty, BooleanProperty, ObjectProperty
 from kivy.uix.boxlayout import BoxLayout
 from kivy.uix.button import Button
 from kivy.clock import Clock
 from utils.helpers import apply_background, apply_styles_to_widget, get_local_ip
+from utils.transfer import FileSender, TransferError, receive_files
+from utils.discovery import SERVICE_TYPE, get_discovery
+from utils.network_status import get_network_status
+from utils.update_bundle import BUNDLE_SUFFIX
 import os
 import socket
 import threading
-import time
-from zeroconf import ServiceBrowser, Zeroconf, ServiceInfo
+from zeroconf import ServiceInfo
 import platform
 
 class FileCheckBox(BoxLayout):
@@ -23,46 +26,82 @@ class FileCheckBox(BoxLayout):
         if self.on_active:
             self.on_active(self.text, value)
 
+class ServiceButton(Button):
+    """Recycled list entry for a discovered sender."""
+    peer_name = StringProperty('')
+    screen = ObjectProperty(None, allownone=True)
+
+    def on_press(self):
+        if self.screen:
+            self.screen.connect_to_peer(self.peer_name)
+
 class TransferScreen(Screen):
     """Screen for sending and receiving character files."""
     status_message = StringProperty("Wähle eine Aktion")
+    link_quality = StringProperty("")
     char_files = ListProperty([])
-    discovered_services = ListProperty([])
 
     def __init__(self, **kwargs):
         super(TransferScreen, self).__init__(**kwargs)
         self.selected_files = []
-        self.zeroconf = Zeroconf()
-        self.browser = None
+        self.discovery = get_discovery()
+        self.browsing = False
         self.service_info = None
 
     def on_pre_enter(self, *args):
         apply_background(self)
         apply_styles_to_widget(self)
+        latest = get_network_status().subscribe(self._on_network_status)
+        if latest is not None:
+            self._show_link_quality(latest)
+
+    def on_leave(self, *args):
+        get_network_status().unsubscribe(self._on_network_status)
+
+    def _on_network_status(self, status):
+        # Called from the network status thread.
+        Clock.schedule_once(lambda dt: self._show_link_quality(status))
+
+    def _show_link_quality(self, status):
+        if status.error or status.source == "unsupported":
+            self.link_quality = ""
+        elif status.connected:
+            self.link_quality = f"WLAN {status.ssid_text}: Signal {status.signal_text}"
+        else:
+            self.link_quality = "Kein WLAN verbunden"
+
+    def _service_entry(self, peer):
+        return {'text': peer.display_name, 'peer_name': peer.name, 'screen': self}
 
-    def _update_service_list_ui(self):
-        service_list_widget = self.ids.service_list
-        service_list_widget.clear_widgets()
-        for info in self.discovered_services:
-            btn = Button(text=info.name, size_hint_y=None, height=80, font_size='20sp')
-            btn.bind(on_press=lambda x, info=info: self.connect_to_sender(info))
-            service_list_widget.add_widget(btn)
-        self.status_message = f"{len(self.discovered_services)} Sender gefunden."
-
-    def _add_service(self, info):
-        if info not in self.discovered_services:
-            self.discovered_services.append(info)
-        self._update_service_list_ui()
-
-    def _remove_service(self, name):
-        # Find service by name and remove
-        service_to_remove = next((s for s in self.discovered_services if s.name == name), None)
-        if service_to_remove:
-            self.discovered_services.remove(service_to_remove)
-        self._update_service_list_ui()
+    def _show_services(self, peers):
+        # DM-Sitzungen werben unter demselben Diensttyp, sprechen aber kein Transferprotokoll.
+        self.ids.service_list.data = [self._service_entry(peer) for peer in peers if not peer.is_dm_session]
+        self._update_service_count()
+
+    def _update_service_count(self):
+        self.status_message = f"{len(self.ids.service_list.data)} Sender gefunden."
+
+    def _on_discovery_event(self, event, peer):
+        # Called from the resolver thread; apply the diff on the Kivy thread.
+        Clock.schedule_once(lambda dt: self._apply_service_diff(event, peer))
+
+    def _apply_service_diff(self, event, peer):
+        if not self.browsing:
+            return
+        data = self.ids.service_list.data
+        index = next((i for i, entry in enumerate(data) if entry['peer_name'] == peer.name), None)
+        if event == 'remove' or peer.is_dm_session:
+            if index is not None:
+                data.pop(index)
+        elif index is None:
+            data.append(self._service_entry(peer))
+        else:
+            data[index] = self._service_entry(peer)
+        self._update_service_count()
 
     def list_char_files(self):
-        self.char_files = [f for f in os.listdir('.') if f.endswith('.char')]
+        # Update-Pakete lassen sich so an Tische ohne Internet weitergeben.
+        self.char_files = [f for f in os.listdir('.') if f.endswith(('.char', BUNDLE_SUFFIX))]
         if not self.char_files:
             self.status_message = "Keine .char-Dateien gefunden."
 
@@ -80,91 +119,59 @@ class TransferScreen(Screen):
             return
 
         self.status_message = "Starte Server... Warte auf Verbindung."
-        threading.Thread(target=self._start_server).start()
+        threading.Thread(target=self._start_server, daemon=True).start()
+
+    def _set_status(self, message):
+        """Thread-safe status update for the network worker threads."""
+        Clock.schedule_once(lambda dt: setattr(self, 'status_message', message))
 
     def _start_server(self):
-        host = '0.0.0.0'
         port = 65432
 
+        try:
+            sender = FileSender(self.selected_files, port=port, on_status=self._set_status)
+        except OSError as e:
+            self._set_status(f"Server konnte nicht gestartet werden: {e}")
+            return
+
         # Register Zeroconf service
-        service_name = f"{platform.node()}._dndchar._tcp.local."
+        service_name = f"{platform.node()}.{SERVICE_TYPE}"
         local_ip = get_local_ip()
         self.service_info = ServiceInfo(
-            "_dndchar._tcp.local.",
+            SERVICE_TYPE,
             service_name,
             addresses=[socket.inet_aton(local_ip)],
-            port=port,
+            port=sender.port,
             properties={'user': platform.node()}
         )
-        self.zeroconf.register_service(self.service_info, allow_name_change=True)
-        self.status_message = f"Server gestartet, sichtbar als '{platform.node()}'"
+        self.discovery.zeroconf.register_service(self.service_info, allow_name_change=True)
+        self._set_status(f"Server gestartet, sichtbar als '{platform.node()}'")
 
         try:
-            with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
-                s.bind((host, port))
-                s.listen()
-                conn, addr = s.accept()
-                with conn:
-                    self.status_message = f"Verbunden mit {addr}"
-                    # Send number of files
-                    num_files = len(self.selected_files)
-                    conn.sendall(str(num_files).encode('utf-8'))
-                    time.sleep(0.1)
-
-                    for file_path in self.selected_files:
-                        conn.sendall(file_path.encode('utf-8'))
-                        time.sleep(0.1)
-                        with open(file_path, 'rb') as f:
-                            data = f.read()
-                            conn.sendall(str(len(data)).encode('utf-8'))
-                            time.sleep(0.1)
-                            conn.sendall(data)
-                    self.status_message = f"{num_files} Dateien erfolgreich gesendet."
+            if sender.serve():
+                self._set_status(f"{len(self.selected_files)} Dateien erfolgreich gesendet.")
+            else:
+                self._set_status("Übertragung nicht abgeschlossen.")
         finally:
-            self.zeroconf.unregister_service(self.service_info)
+            self.discovery.zeroconf.unregister_service(self.service_info)
             self.service_info = None
-            self.status_message = "Übertragung beendet."
 
 
-    def connect_to_sender(self, service_info):
-        host = socket.inet_ntoa(service_info.addresses[0])
-        port = service_info.port
-        self.status_message = f"Verbinde mit {service_info.name}..."
-        threading.Thread(target=self._start_client, args=(host, port)).start()
+    def connect_to_peer(self, peer_name):
+        peer = self.discovery.peers.get(peer_name)
+        if peer is None or peer.host is None or peer.is_dm_session:
+            self.status_message = "Sender nicht mehr verfügbar."
+            return
+        self.status_message = f"Verbinde mit {peer.display_name}..."
+        threading.Thread(target=self._start_client, args=(peer.host, peer.port), daemon=True).start()
         self.stop_service_browser()
 
     def _start_client(self, host, port):
-        with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
-            try:
-                s.connect((host, port))
-                self.status_message = f"Verbunden mit Server {host}"
-
-                # Receive number of files
-                num_files_str = s.recv(1024).decode('utf-8')
-                num_files = int(num_files_str)
-
-                for _ in range(num_files):
-                    # Receive filename
-                    filename = s.recv(1024).decode('utf-8')
-
-                    # Receive file size
-                    filesize_str = s.recv(1024).decode('utf-8')
-                    filesize = int(filesize_str)
-
-                    # Receive file content
-                    data = b''
-                    while len(data) < filesize:
-                        packet = s.recv(4096)
-                        if not packet:
-                            break
-                        data += packet
-
-                    with open(filename, 'wb') as f:
-                        f.write(data)
-                    self.status_message = f"Datei {filename} empfangen."
-
-            except Exception as e:
-                self.status_message = f"Fehler beim Empfangen: {e}"
+        try:
+            received = receive_files(host, port, dest_dir='.', on_status=self._set_status)
+            self._set_status(f"{len(received)} Dateien empfangen.")
+        except TransferError as e:
+            self._set_status(f"Fehler beim Empfangen: {e}")
 
     def go_to_send_view(self):
         self.list_char_files()
@@ -177,7 +184,6 @@ class TransferScreen(Screen):
         self.ids.transfer_sm.current = 'send'
 
     def go_to_receive_view(self):
-        self.status_message = "Suche nach Sendern..."
         self.ids.transfer_sm.current = 'receive'
         self.start_service_browser()
 
@@ -187,29 +193,15 @@ class TransferScreen(Screen):
         self.status_message = "Wähle eine Aktion"
 
     def start_service_browser(self):
-        if self.browser is None:
-            self.discovered_services.clear()
-            listener = ServiceListener(self)
-            self.browser = ServiceBrowser(self.zeroconf, "_dndchar._tcp.local.", listener)
+        """Zeigt die bereits bekannten Sender sofort an und abonniert Änderungen."""
+        self.discovery.start()
+        self.browsing = True
+        known_peers = self.discovery.subscribe(self._on_discovery_event)
+        self._show_services(known_peers)
+        if not known_peers:
+            self.status_message = "Suche nach Sendern..."
 
     def stop_service_browser(self):
-        if self.browser:
-            self.browser.cancel()
-            self.browser = None
-
-class ServiceListener:
-    def __init__(self, screen):
-        self.screen = screen
-
-    def add_service(self, zeroconf, type, name):
-        info = zeroconf.get_service_info(type, name)
-        if info:
-            Clock.schedule_once(lambda dt: self.screen._add_service(info))
-
-    def remove_service(self, zeroconf, type, name):
-        # Service has been removed, so info may not be available. Act on name.
-        Clock.schedule_once(lambda dt: self.screen._remove_service(name))
-
-    def update_service(self, zeroconf, type, name):
-        # For now, we don't need to handle updates
-        pass
+        # The browser itself keeps running so the cache stays warm.
+        self.browsing = False
+        self.discovery.unsubscribe(self._on_discovery_event)
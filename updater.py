@@ -1,59 +1,254 @@
-import subprocess
+import argparse
+import hashlib
+import json
 import os
+import subprocess
 import sys
 import time
+from contextlib import contextmanager
+
+from utils.update_bundle import BundleError, apply_bundle, recover_interrupted_update
+
+STATE_FILE = ".update_state.json"
+REQUIREMENTS_FILE = "requirements.txt"
+# Tracked, but init_db() rebuilds it locally from data/*.json, so it differs from
+# the committed file after the first start. It only holds reference data (saved
+# encounters live in the untracked encounters.db), so a difference there is no
+# reason to reset, and the reset overwriting it is harmless: the prebuild below
+# rebuilds it for the new code.
+DATABASE_FILE = "dnd.db"
+WAIT_TIMEOUT = 30.0
+
+
+class StepTimer:
+    """Misst die Dauer jedes Update-Schritts und gibt am Ende eine Übersicht aus."""
+
+    def __init__(self):
+        self.steps = []
+
+    @contextmanager
+    def step(self, name):
+        print(f"{name}...")
+        started = time.perf_counter()
+        status = "ok"
+        try:
+            yield
+        except Exception:
+            status = "fehler"
+            raise
+        finally:
+            self.steps.append({"name": name, "seconds": round(time.perf_counter() - started, 3), "status": status})
+
+    def skip(self, name, reason):
+        print(f"{name}: übersprungen ({reason})")
+        self.steps.append({"name": name, "seconds": 0.0, "status": f"übersprungen: {reason}"})
+
+    def summary(self):
+        lines = ["--- Update-Zeiten ---"]
+        lines += [f"  {s['seconds']:7.2f} s  {s['name']} ({s['status']})" for s in self.steps]
+        lines.append(f"  {sum(s['seconds'] for s in self.steps):7.2f} s  gesamt")
+        return "\n".join(lines)
+
+
+def process_exists(pid):
+    if sys.platform.startswith('win'):
+        import ctypes
+        SYNCHRONIZE = 0x00100000
+        handle = ctypes.windll.kernel32.OpenProcess(SYNCHRONIZE, False, pid)
+        if not handle:
+            return False
+        # WAIT_TIMEOUT (0x102): der Prozess läuft noch.
+        running = ctypes.windll.kernel32.WaitForSingleObject(handle, 0) == 0x102
+        ctypes.windll.kernel32.CloseHandle(handle)
+        return running
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def wait_for_exit(pid, timeout=WAIT_TIMEOUT, poll=0.05):
+    """Wartet, bis die App beendet ist (statt einer festen Pause); False nach Zeitüberschreitung."""
+    deadline = time.monotonic() + timeout
+    while process_exists(pid):
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(poll)
+    return True
+
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(65536), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def load_state(path=STATE_FILE):
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_state(state, path=STATE_FILE):
+    tmp_path = path + ".tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(state, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+def git(*args):
+    return subprocess.run(["git", *args], check=True, capture_output=True, text=True).stdout.strip()
+
 
-def run_update(branch='main'):
+def local_changes():
+    """Lokale Änderungen an versionierten Dateien, ohne die lokal neu aufgebaute Referenzdatenbank."""
+    return git("status", "--porcelain", "--untracked-files=no", "--", ".", f":!{DATABASE_FILE}")
+
+
+def requirements_key():
+    """Hash der requirements.txt zusammen mit dem Interpreter, für den installiert wurde."""
+    if not os.path.exists(REQUIREMENTS_FILE):
+        return None
+    return f"{sys.executable}:{file_sha256(REQUIREMENTS_FILE)}"
+
+
+def start_database_prebuild():
+    """Baut die Datenbank mit dem neuen Code in einem eigenen Prozess auf (überspringt unveränderte Daten)."""
+    return subprocess.Popen([sys.executable, "-c", "import database; database.init_db()"],
+                            stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+
+
+def build_assets():
+    """Erzeugt geänderte Bildvarianten neu (inkrementell); ohne Pillow nutzt die App die Originale."""
+    return subprocess.run([sys.executable, "-m", "utils.assets", "build", "--quiet"],
+                          capture_output=True, text=True)
+
+
+def install_requirements():
+    # Use sys.executable to ensure we're using the right pip in the right environment
+    subprocess.run([sys.executable, "-m", "pip", "install", "-r", REQUIREMENTS_FILE],
+                   check=True, capture_output=True, text=True)
+
+
+def relaunch():
+    # Launch the main script in a new, detached process
+    subprocess.Popen([sys.executable, "main.py"])
+
+
+def run_update(branch='main', wait_pid=None, bundle=None):
     """
-    This script is called by main.py to perform an update.
-    It waits for the main app to close, then pulls the latest code,
-    installs dependencies, and restarts the main app.
+    This script is called by the SystemScreen to perform an update.
+    It waits for the main app to close, fetches only the selected branch
+    (or applies a signed offline bundle instead), installs dependencies only
+    when requirements.txt changed, rebuilds the database while pip runs,
+    and restarts the main app.
     """
-    # Give the main app a moment to close to release file locks
-    time.sleep(2)
-
+    timer = StepTimer()
+    state = load_state()
+    prebuild = None
     try:
-        # Step 1: Force Git update
-        print("Fetching updates from remote...")
-        # Use --all to fetch all remote branches
-        subprocess.run(["git", "fetch", "--all"], check=True, capture_output=True, text=True)
-        
-        print(f"Forcing update by resetting local branch to origin/{branch}...")
-        # Reset the local branch to match the remote, discarding local changes
-        subprocess.run(["git", "reset", "--hard", f"origin/{branch}"], check=True, capture_output=True, text=True)
-
-        # Step 2: Install Dependencies
-        print("Installing/updating Python dependencies...")
-        # Use sys.executable to ensure we're using the right pip in the right environment
-        pip_command = [sys.executable, "-m", "pip", "install", "-r", "requirements.txt"]
-        subprocess.run(pip_command, check=True, capture_output=True, text=True)
-        
+        if wait_pid:
+            with timer.step("Warten auf das Beenden der App"):
+                if not wait_for_exit(wait_pid):
+                    print(f"App (PID {wait_pid}) läuft nach {WAIT_TIMEOUT:.0f} s noch, fahre trotzdem fort.")
+
+        if recover_interrupted_update():
+            print("Der Stand vor dem abgebrochenen Update wurde wiederhergestellt.")
+
+        if bundle:
+            with timer.step(f"Offline-Paket {os.path.basename(bundle)} einspielen"):
+                manifest = apply_bundle(bundle, on_status=print)
+                print(f"{len(manifest['entries'])} Dateien geändert.")
+        else:
+            with timer.step(f"Branch {branch} holen"):
+                old_head = git("rev-parse", "HEAD")
+                git("fetch", "origin", f"+refs/heads/{branch}:refs/remotes/origin/{branch}")
+                new_head = git("rev-parse", f"origin/{branch}")
+
+            if old_head == new_head and local_changes() == "":
+                timer.skip("Auf Stand bringen", "bereits aktuell")
+            else:
+                with timer.step(f"Auf origin/{branch} zurücksetzen"):
+                    # Discard local changes, exactly like before.
+                    git("reset", "--hard", f"origin/{branch}")
+                    if old_head != new_head:
+                        changed = git("diff", "--name-only", old_head, new_head).splitlines()
+                        print(f"{len(changed)} Dateien geändert.")
+
+        # The database only depends on data/*.json and database.py; build it alongside pip.
+        prebuild = start_database_prebuild()
+
+        key = requirements_key()
+        if key is None or key == state.get("requirements"):
+            timer.skip("Python-Abhängigkeiten installieren", "requirements.txt unverändert")
+        else:
+            with timer.step("Python-Abhängigkeiten installieren"):
+                install_requirements()
+                state["requirements"] = key
+
+        with timer.step("Auf die Datenbank warten"):
+            _, stderr = prebuild.communicate()
+            if prebuild.returncode != 0:
+                print(f"Datenbank konnte nicht vorbereitet werden, die App baut sie beim Start:\n{stderr}")
+
+        # After pip, so a freshly installed Pillow is already available.
+        with timer.step("Bilder vorbereiten"):
+            result = build_assets()
+            print(result.stdout.strip() or result.stderr.strip())
+
         # Ensure the start script is executable, in case it was overwritten by the update
         start_script_path = "start_dnd.sh"
         if os.path.exists(start_script_path):
-            print("Setting execute permissions for start_dnd.sh...")
             os.chmod(start_script_path, os.stat(start_script_path).st_mode | 0o111)
 
         print("Update complete.")
+        state["last_update"] = {"branch": branch, "bundle": bundle, "ok": True, "finished_at": time.time(),
+                                "steps": timer.steps}
 
-    except subprocess.CalledProcessError as e:
-        # If something goes wrong, print the error.
-        # A more advanced version could write this to a log file or show a GUI error.
+    except (subprocess.CalledProcessError, BundleError, OSError) as e:
+        # If something goes wrong, print the error and keep it for the next start.
+        if isinstance(e, subprocess.CalledProcessError):
+            error = f"{' '.join(e.cmd)}: {e.stderr}"
+        else:
+            error = str(e)
         print("--- UPDATE FAILED ---")
-        print(f"Error during command: {' '.join(e.cmd)}")
-        print(f"Stderr: {e.stderr}")
+        print(f"Error: {error}")
         print("---------------------")
-        # Pause for a few seconds so the user can see the error in the console
-        time.sleep(10)
-        
+        state["last_update"] = {"branch": branch, "bundle": bundle, "ok": False, "finished_at": time.time(),
+                                "steps": timer.steps, "error": error}
+        if sys.stdout.isatty():
+            # Only worth waiting when someone is watching the console.
+            time.sleep(10)
+
     finally:
-        # Step 3: Restart the main application
+        if prebuild is not None and prebuild.poll() is None:
+            # Never start the app while the database is still being written.
+            prebuild.communicate()
+        print(timer.summary())
+        try:
+            save_state(state)
+        except OSError as e:
+            print(f"Update-Status konnte nicht gespeichert werden: {e}")
         print("Restarting the main application...")
-        # Use Popen to launch the main script in a new, detached process
-        subprocess.Popen([sys.executable, "main.py"])
+        relaunch()
+    return timer
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Aktualisiert die App und startet sie neu")
+    parser.add_argument("branch", nargs="?", default="main")
+    parser.add_argument("--wait-pid", type=int, help="Erst starten, wenn dieser Prozess beendet ist")
+    parser.add_argument("--bundle", help="Signiertes Offline-Paket (.dndupdate) statt git einspielen")
+    args = parser.parse_args(argv)
+    run_update(args.branch, args.wait_pid, args.bundle)
+
 
 if __name__ == "__main__":
-    branch_to_update = 'main'
-    if len(sys.argv) > 1:
-        branch_to_update = sys.argv[1]
-    run_update(branch_to_update)
+    main()
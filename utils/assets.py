@@ -0,0 +1,336 @@
+"""
+Pre-scaled image variants and a UI atlas for the kiosks.
+
+Backgrounds in osbackground/ are up to 983x1820 pixels and several MB as
+PNG. Every apply_background() used to decode them at full size, which
+meant about 7 MB of texture memory per screen even though the image is
+stretched to the window anyway. The build step writes variants into
+asset_cache/ for a few window sizes:
+- each variant is already scaled to that size, never upscaled;
+- opaque images become JPEG, images with transparency an optimized PNG.
+Small UI images (the logo) are scaled down and packed into a Kivy atlas.
+Everything is described in asset_cache/manifest.json.
+
+At runtime background_source() and asset_source() look paths up in the
+manifest. Each entry records the size and mtime of the source it was
+built from. When the source has changed, or nothing was built, the
+original path is returned.
+
+Building needs Pillow, which comes with kivy[base]. It is incremental:
+sources whose hash and build settings are unchanged are skipped. The
+updater runs it after every update.
+
+    python -m utils.assets build [--force]
+"""
+import argparse
+import hashlib
+import json
+import os
+import sys
+
+CACHE_DIR = "asset_cache"
+MANIFEST_FILE = os.path.join(CACHE_DIR, "manifest.json")
+BACKGROUND_DIRS = ("osbackground",)
+ATLAS_SOURCES = ("logo/logo.png",)
+ATLAS_NAME = "ui"
+ATLAS_MAX_SIDE = 512
+ATLAS_PAGE_SIZE = 1024
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".webp", ".bmp")
+# Offizielles 7"-Display, HD-Monitor, Full-HD-Monitor; dazu die Fenstergröße aus settings.json.
+DEFAULT_TARGETS = ((800, 480), (1280, 720), (1920, 1080))
+JPEG_QUALITY = 85
+MANIFEST_VERSION = 1
+
+
+# --- Laufzeit: Varianten nachschlagen ---
+
+_manifest = None
+_manifest_mtime = None
+
+
+def normalize(path):
+    """Pfad relativ zum App-Ordner mit '/', wie im Manifest; None für Pfade außerhalb."""
+    relative = os.path.relpath(os.path.abspath(path))
+    if relative.startswith(".."):
+        return None
+    return relative.replace(os.sep, "/")
+
+
+def load_manifest():
+    """Das Manifest, neu gelesen nur wenn sich die Datei geändert hat; {} ohne Build."""
+    global _manifest, _manifest_mtime
+    try:
+        mtime = os.stat(MANIFEST_FILE).st_mtime_ns
+    except OSError:
+        _manifest, _manifest_mtime = {}, None
+        return _manifest
+    if mtime != _manifest_mtime:
+        try:
+            with open(MANIFEST_FILE, encoding="utf-8") as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            manifest = {}
+        _manifest = manifest if manifest.get("version") == MANIFEST_VERSION else {}
+        _manifest_mtime = mtime
+    return _manifest
+
+
+def _source_stamp(path):
+    st = os.stat(path)
+    return [st.st_size, st.st_mtime_ns]
+
+
+def _entry(path):
+    """Manifest-Eintrag einer Quelle, falls er zur Datei auf der Platte passt."""
+    key = normalize(path)
+    entry = load_manifest().get("sources", {}).get(key) if key else None
+    if entry is None:
+        return None
+    try:
+        if _source_stamp(key) != entry["stamp"]:
+            return None
+    except OSError:
+        return None
+    return entry
+
+
+def best_variant(variants, width, height):
+    """Die kleinste Variante, die das Fenster ausfüllt, sonst die größte."""
+    covering = [v for v in variants if v["size"][0] >= width and v["size"][1] >= height]
+    if covering:
+        return min(covering, key=lambda v: v["size"][0] * v["size"][1])
+    return max(variants, key=lambda v: v["size"][0] * v["size"][1], default=None)
+
+
+def background_source(path, width, height):
+    """Pfad der passenden vorskalierten Variante eines Hintergrunds oder `path` selbst."""
+    entry = _entry(path)
+    if entry is None or not entry.get("variants"):
+        return path
+    source_w, source_h = entry["size"]
+    # Größer als das Original wird keine Variante; so viel reicht dann auch.
+    variant = best_variant(entry["variants"], min(width, source_w), min(height, source_h))
+    if variant is None or not os.path.exists(variant["path"]):
+        return path
+    return variant["path"]
+
+
+def asset_source(path):
+    """atlas://-Adresse eines UI-Bildes, wenn es im Atlas liegt, sonst `path` (für .kv-Dateien)."""
+    entry = _entry(path)
+    if entry is None or not entry.get("atlas"):
+        return path
+    return entry["atlas"]
+
+
+# --- Build ---
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(65536), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def configured_targets(settings_file="settings.json"):
+    """DEFAULT_TARGETS plus die in settings.json eingestellte Fenstergröße."""
+    targets = set(DEFAULT_TARGETS)
+    try:
+        with open(settings_file, encoding="utf-8") as f:
+            settings = json.load(f)
+        targets.add((int(settings.get("window_width", 1280)), int(settings.get("window_height", 720))))
+    except (OSError, ValueError, TypeError):
+        pass
+    return sorted(targets)
+
+
+def background_sources(dirs=BACKGROUND_DIRS):
+    sources = []
+    for directory in dirs:
+        if os.path.isdir(directory):
+            sources += sorted(f"{directory}/{name}" for name in os.listdir(directory)
+                              if name.lower().endswith(IMAGE_EXTENSIONS))
+    return sources
+
+
+def _has_alpha(image):
+    if image.mode in ("RGBA", "LA") or (image.mode == "P" and "transparency" in image.info):
+        return image.convert("RGBA").getchannel("A").getextrema()[0] < 255
+    return False
+
+
+def _save_variant(image, output_base):
+    """Speichert als JPEG oder, bei Transparenz, als PNG; gibt den Pfad zurück."""
+    os.makedirs(os.path.dirname(output_base), exist_ok=True)
+    if _has_alpha(image):
+        path = output_base + ".png"
+        image.convert("RGBA").save(path, optimize=True)
+    else:
+        path = output_base + ".jpg"
+        image.convert("RGB").save(path, quality=JPEG_QUALITY, optimize=True, progressive=False)
+    return path
+
+
+def build_variants(source, targets):
+    """Variantenliste für einen Hintergrund; gleiche Zielgrößen werden nur einmal geschrieben."""
+    from PIL import Image
+
+    with Image.open(source) as image:
+        image.load()
+        source_size = image.size
+        variants, written = [], {}
+        for width, height in targets:
+            size = (min(width, source_size[0]), min(height, source_size[1]))
+            if size not in written:
+                base = os.path.join(CACHE_DIR, os.path.splitext(source)[0] + f".{size[0]}x{size[1]}")
+                resized = image if size == source_size else image.resize(size, Image.LANCZOS)
+                written[size] = _save_variant(resized, base).replace(os.sep, "/")
+            variants.append({"target": [width, height], "size": list(size), "path": written[size]})
+    return source_size, variants
+
+
+def pack_atlas(images, page_size=ATLAS_PAGE_SIZE, padding=2):
+    """
+    Regalpacken: {id: (seite, x, y, b, h)} mit y von oben, dazu die Seitengrößen.
+    Bilder werden nach Höhe sortiert in Reihen gelegt; passt eine Reihe nicht mehr, beginnt eine neue Seite.
+    """
+    placements, pages = {}, []
+    x = y = row_height = 0
+    for uid, (w, h) in sorted(images.items(), key=lambda item: (-item[1][1], item[0])):
+        if w > page_size or h > page_size:
+            raise ValueError(f"{uid} ist größer als eine Atlasseite")
+        if not pages or x + w > page_size:
+            x, y, row_height = 0, y + row_height + padding, 0
+        if not pages or y + h > page_size:
+            pages.append([0, 0])
+            x = y = row_height = 0
+        placements[uid] = (len(pages) - 1, x, y, w, h)
+        pages[-1] = [max(pages[-1][0], x + w), max(pages[-1][1], y + h)]
+        x += w + padding
+        row_height = max(row_height, h)
+    return placements, pages
+
+
+def build_atlas(sources, name=ATLAS_NAME, max_side=ATLAS_MAX_SIDE):
+    """Schreibt asset_cache/<name>.atlas samt Seiten; gibt {quelle: atlas://-Adresse} zurück."""
+    from PIL import Image
+
+    images = {}
+    for source in sources:
+        image = Image.open(source)
+        image.thumbnail((max_side, max_side), Image.LANCZOS)
+        images[os.path.splitext(os.path.basename(source))[0]] = (source, image.convert("RGBA"))
+    placements, pages = pack_atlas({uid: image.size for uid, (_, image) in images.items()})
+
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    canvases = [Image.new("RGBA", tuple(size), (0, 0, 0, 0)) for size in pages]
+    meta = {f"{name}-{index}.png": {} for index in range(len(pages))}
+    for uid, (page, x, y, w, h) in placements.items():
+        canvases[page].paste(images[uid][1], (x, y))
+        # Kivy-Texturen zählen y von unten.
+        meta[f"{name}-{page}.png"][uid] = [x, pages[page][1] - y - h, w, h]
+    for index, canvas in enumerate(canvases):
+        canvas.save(os.path.join(CACHE_DIR, f"{name}-{index}.png"), optimize=True)
+    with open(os.path.join(CACHE_DIR, f"{name}.atlas"), "w", encoding="utf-8") as f:
+        json.dump(meta, f, indent=1)
+    return {source: f"atlas://{CACHE_DIR}/{name}/{uid}" for uid, (source, _) in images.items()}
+
+
+def _write_manifest(manifest):
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    tmp_path = MANIFEST_FILE + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=1)
+    os.replace(tmp_path, MANIFEST_FILE)
+
+
+def build(force=False, targets=None, backgrounds=None, atlas_sources=ATLAS_SOURCES, on_status=print):
+    """Erzeugt fehlende oder veraltete Varianten und den Atlas; gibt (neu gebaut, übersprungen) zurück."""
+    targets = [list(t) for t in (targets or configured_targets())]
+    backgrounds = background_sources() if backgrounds is None else backgrounds
+    atlas_sources = [s for s in atlas_sources if os.path.exists(s)]
+    settings_key = {"targets": targets, "jpeg_quality": JPEG_QUALITY, "atlas_max_side": ATLAS_MAX_SIDE}
+
+    try:
+        with open(MANIFEST_FILE, encoding="utf-8") as f:
+            old = json.load(f)
+    except (OSError, ValueError):
+        old = {}
+    if force or old.get("version") != MANIFEST_VERSION or old.get("settings") != settings_key:
+        old = {}
+    old_sources = old.get("sources", {})
+
+    sources, built, skipped = {}, 0, 0
+    for source in backgrounds:
+        digest = file_sha256(source)
+        previous = old_sources.get(source)
+        if previous and previous["sha256"] == digest and previous.get("variants") \
+                and all(os.path.exists(v["path"]) for v in previous["variants"]):
+            sources[source] = dict(previous, stamp=_source_stamp(source))
+            skipped += 1
+            continue
+        try:
+            size, variants = build_variants(source, targets)
+        except (OSError, ValueError) as e:
+            on_status(f"{source}: übersprungen ({e})")
+            continue
+        sources[source] = {"sha256": digest, "stamp": _source_stamp(source), "size": list(size),
+                           "variants": variants}
+        built += 1
+        on_status(f"{source}: {len(set(v['path'] for v in variants))} Varianten")
+
+    atlas_digests = {source: file_sha256(source) for source in atlas_sources}
+    atlas_current = atlas_sources and old.get("atlas") == atlas_digests and all(
+        old_sources.get(source, {}).get("atlas") for source in atlas_sources) \
+        and os.path.exists(os.path.join(CACHE_DIR, f"{ATLAS_NAME}.atlas"))
+    if atlas_current:
+        addresses = {source: old_sources[source]["atlas"] for source in atlas_sources}
+        skipped += len(atlas_sources)
+    elif atlas_sources:
+        addresses = build_atlas(atlas_sources)
+        built += len(atlas_sources)
+        on_status(f"Atlas {ATLAS_NAME}: {len(addresses)} Bilder")
+    else:
+        addresses = {}
+    for source, address in addresses.items():
+        entry = sources.setdefault(source, {"sha256": atlas_digests[source], "stamp": _source_stamp(source)})
+        entry["atlas"] = address
+
+    _remove_stale_files(sources)
+    _write_manifest({"version": MANIFEST_VERSION, "settings": settings_key, "atlas": atlas_digests,
+                     "sources": sources})
+    return built, skipped
+
+
+def _remove_stale_files(sources):
+    """Löscht Varianten von entfernten oder geänderten Quellen."""
+    keep = {os.path.normpath(v["path"]) for entry in sources.values() for v in entry.get("variants", ())}
+    for dirpath, _, filenames in os.walk(CACHE_DIR):
+        for filename in filenames:
+            path = os.path.normpath(os.path.join(dirpath, filename))
+            if os.path.dirname(path) == os.path.normpath(CACHE_DIR):
+                continue  # Manifest und Atlas
+            if path not in keep:
+                os.remove(path)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Vorskalierte Hintergründe und UI-Atlas erzeugen")
+    sub = parser.add_subparsers(dest="command", required=True)
+    build_parser = sub.add_parser("build")
+    build_parser.add_argument("--force", action="store_true", help="Alles neu erzeugen")
+    build_parser.add_argument("--quiet", action="store_true")
+    args = parser.parse_args(argv)
+    try:
+        import PIL  # noqa: F401
+    except ImportError:
+        print("Pillow ist nicht installiert (pip install pillow); die Originalbilder werden verwendet.")
+        return 1
+    built, skipped = build(force=args.force, on_status=(lambda message: None) if args.quiet else print)
+    print(f"Assets: {built} erzeugt, {skipped} unverändert.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
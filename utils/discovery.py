@@ -0,0 +1,169 @@
+"""
+Zeroconf discovery of other DnD devices on the local network.
+
+A single DiscoveryCache lives for the whole app session. Its
+ServiceBrowser keeps running between screen visits, so a screen that
+subscribes gets the peers known so far immediately and afterwards only
+receives diffs ('add', 'update', 'remove'). ServiceInfo resolution runs
+on a small worker pool instead of blocking the Zeroconf thread.
+"""
+import socket
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from zeroconf import ServiceBrowser, ServiceInfo, Zeroconf
+
+SERVICE_TYPE = "_dndchar._tcp.local."
+# DM sessions share the service type with file transfer and are told apart by this property.
+DM_ROLE = "dm"
+RESOLVE_TIMEOUT_MS = 3000
+
+
+class Peer:
+    """Aufgelöster Dienst eines anderen Geräts."""
+
+    def __init__(self, name, host, port, properties=None):
+        self.name = name
+        self.host = host
+        self.port = port
+        self.properties = properties or {}
+
+    @classmethod
+    def from_service_info(cls, info):
+        addresses = info.addresses
+        host = socket.inet_ntoa(addresses[0]) if addresses else None
+        properties = {}
+        for key, value in (info.properties or {}).items():
+            key = key.decode('utf-8', 'replace') if isinstance(key, bytes) else key
+            if isinstance(value, bytes):
+                value = value.decode('utf-8', 'replace')
+            properties[key] = value
+        return cls(info.name, host, info.port, properties)
+
+    @property
+    def is_dm_session(self):
+        return self.properties.get('role') == DM_ROLE
+
+    @property
+    def display_name(self):
+        return self.name.replace("." + SERVICE_TYPE, "")
+
+    def __eq__(self, other):
+        return isinstance(other, Peer) and (self.name, self.host, self.port, self.properties) == \
+            (other.name, other.host, other.port, other.properties)
+
+    def __repr__(self):
+        return f"Peer({self.name!r}, {self.host!r}, {self.port!r})"
+
+
+class DiscoveryCache:
+    """Hält die bekannten Peers und verteilt Änderungen an Abonnenten."""
+
+    def __init__(self, zeroconf=None, service_type=SERVICE_TYPE, resolve_timeout=RESOLVE_TIMEOUT_MS):
+        self._zeroconf = zeroconf
+        self.service_type = service_type
+        self.resolve_timeout = resolve_timeout
+        self.peers = {}
+        self._subscribers = []
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._browser = None
+        self._resolver = ThreadPoolExecutor(max_workers=2, thread_name_prefix='zeroconf-resolve')
+
+    @property
+    def zeroconf(self):
+        if self._zeroconf is None:
+            self._zeroconf = Zeroconf()
+        return self._zeroconf
+
+    def start(self):
+        """Startet den Browser einmalig; weitere Aufrufe sind wirkungslos."""
+        if self._browser is None:
+            self._browser = ServiceBrowser(self.zeroconf, self.service_type, self)
+
+    def subscribe(self, callback):
+        """Registriert `callback(event, peer)` und gibt die aktuell bekannten Peers zurück."""
+        with self._lock:
+            if callback not in self._subscribers:
+                self._subscribers.append(callback)
+            return sorted(self.peers.values(), key=lambda p: p.name)
+
+    def session_peers(self):
+        """Bekannte DM-Sitzungen, denen ein Spieler beitreten kann."""
+        with self._lock:
+            return sorted((p for p in self.peers.values() if p.is_dm_session), key=lambda p: p.name)
+
+    def unsubscribe(self, callback):
+        with self._lock:
+            if callback in self._subscribers:
+                self._subscribers.remove(callback)
+
+    def _notify(self, event, peer):
+        for callback in list(self._subscribers):
+            callback(event, peer)
+
+    # ServiceListener interface, called from the Zeroconf thread.
+    def add_service(self, zeroconf, type_, name):
+        token = object()
+        with self._lock:
+            self._pending[name] = token
+        self._resolver.submit(self._resolve, type_, name, token)
+
+    def update_service(self, zeroconf, type_, name):
+        self.add_service(zeroconf, type_, name)
+
+    def remove_service(self, zeroconf, type_, name):
+        with self._lock:
+            self._pending.pop(name, None)
+            peer = self.peers.pop(name, None)
+        if peer:
+            self._notify('remove', peer)
+
+    def _request_info(self, type_, name):
+        info = ServiceInfo(type_, name)
+        if info.request(self.zeroconf, self.resolve_timeout):
+            return info
+        return None
+
+    def _resolve(self, type_, name, token):
+        info = self._request_info(type_, name)
+        if info is None:
+            return
+        peer = Peer.from_service_info(info)
+        with self._lock:
+            # A remove (or a newer add) arrived while we were resolving.
+            if self._pending.get(name) is not token:
+                return
+            del self._pending[name]
+            old = self.peers.get(name)
+            if old == peer:
+                return
+            self.peers[name] = peer
+        self._notify('update' if old else 'add', peer)
+
+    def close(self):
+        if self._browser is not None:
+            self._browser.cancel()
+            self._browser = None
+        self._resolver.shutdown(wait=False)
+        if self._zeroconf is not None:
+            self._zeroconf.close()
+            self._zeroconf = None
+
+
+_discovery = None
+
+
+def get_discovery():
+    """Gibt den app-weiten DiscoveryCache zurück."""
+    global _discovery
+    if _discovery is None:
+        _discovery = DiscoveryCache()
+    return _discovery
+
+
+def close_discovery():
+    global _discovery
+    if _discovery is not None:
+        _discovery.close()
+        _discovery = None
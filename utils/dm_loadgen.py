@@ -0,0 +1,142 @@
+"""
+Lokaler Lastgenerator für die DM-Sitzung.
+
+Startet einen DMSessionServer auf Loopback und simuliert N Spieler, die
+in schneller Folge HP ändern, Zustände setzen und Würfe melden. Gemessen
+werden Bytes pro Sekunde je Client und die Latenz von der Aktion bis
+zum Eintreffen des Deltas bei allen Clients.
+
+    python -m utils.dm_loadgen --clients 8 --rate 20 --duration 10
+"""
+import argparse
+import random
+import sys
+import threading
+import time
+
+from utils.dm_session import BANDWIDTH_BUDGET, TICK_RATE, DMSessionClient, DMSessionServer
+
+CONDITIONS = ["Vergiftet", "Liegend", "Verängstigt", "Betäubt", "Gepackt"]
+
+
+def percentile(values, p):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(p / 100.0 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+class SimulatedPlayer:
+    """Ein simulierter Spieler, der seine eigenen HP-Änderungen verfolgt."""
+
+    def __init__(self, index, port, rng):
+        self.index = index
+        self.rng = rng
+        self.sent = {}
+        self.latencies = []
+        self.actions = 0
+        self._value = 0
+        self._lock = threading.Lock()
+        character = {"name": f"Spieler {index}", "hit_points": 10_000, "max_hit_points": 10_000,
+                     "armor_class": 12, "initiative": rng.randint(-1, 4)}
+        self.client = DMSessionClient('127.0.0.1', port, character, on_update=self._on_update)
+
+    def _on_update(self, client, delta):
+        own = delta.get("c", {}).get(client.cid)
+        if not own or "hp" not in own:
+            return
+        now = time.monotonic()
+        with self._lock:
+            # Everything sent up to this value was coalesced into this delta.
+            for value in [v for v in self.sent if v <= own["hp"]]:
+                self.latencies.append(now - self.sent.pop(value))
+
+    def act(self):
+        roll = self.rng.random()
+        if roll < 0.7:
+            with self._lock:
+                self._value += 1
+                self.sent[self._value] = time.monotonic()
+            self.client.set_hp(self._value)
+        elif roll < 0.85:
+            self.client.set_conditions(self.rng.sample(CONDITIONS, self.rng.randint(0, 2)))
+        else:
+            self.client.report_roll("1d20", self.rng.randint(1, 20))
+        self.actions += 1
+
+
+def run_load_test(clients=8, rate=20.0, duration=10.0, tick_rate=TICK_RATE,
+                  bandwidth_budget=BANDWIDTH_BUDGET, seed=1):
+    """Führt den Lasttest aus und gibt einen Bericht als Dictionary zurück."""
+    server = DMSessionServer(host='127.0.0.1', port=0, tick_rate=tick_rate,
+                             bandwidth_budget=bandwidth_budget, advertise=False)
+    port = server.start()
+    rng = random.Random(seed)
+    players = [SimulatedPlayer(i + 1, port, random.Random(rng.random())) for i in range(clients)]
+    for player in players:
+        player.client.connect()
+
+    stop = threading.Event()
+
+    def drive(player):
+        interval = 1.0 / rate
+        next_action = time.monotonic()
+        while not stop.is_set():
+            player.act()
+            next_action += interval * player.rng.uniform(0.5, 1.5)
+            time.sleep(max(0.0, next_action - time.monotonic()))
+
+    start_bytes = [p.client.bytes_received for p in players]
+    started = time.monotonic()
+    threads = [threading.Thread(target=drive, args=(p,), daemon=True) for p in players]
+    for t in threads:
+        t.start()
+    time.sleep(duration)
+    stop.set()
+    for t in threads:
+        t.join()
+    time.sleep(3.0 / tick_rate)
+    elapsed = time.monotonic() - started
+
+    latencies = [l for p in players for l in p.latencies]
+    rates = [(p.client.bytes_received - b) / elapsed for p, b in zip(players, start_bytes)]
+    for player in players:
+        player.client.close()
+    server.stop()
+
+    return {
+        "clients": clients,
+        "actions": sum(p.actions for p in players),
+        "ticks": server.state.tick,
+        "bytes_per_client_per_s_avg": sum(rates) / len(rates) if rates else 0.0,
+        "bytes_per_client_per_s_max": max(rates) if rates else 0.0,
+        "latency_ms_p50": percentile(latencies, 50) * 1000,
+        "latency_ms_p95": percentile(latencies, 95) * 1000,
+        "latency_ms_p99": percentile(latencies, 99) * 1000,
+        "bandwidth_budget": bandwidth_budget,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Lastgenerator für die DM-Sitzung")
+    parser.add_argument("--clients", type=int, default=8)
+    parser.add_argument("--rate", type=float, default=20.0, help="Aktionen pro Sekunde und Spieler")
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--tick-rate", type=int, default=TICK_RATE)
+    parser.add_argument("--budget", type=int, default=BANDWIDTH_BUDGET, help="Bytes pro Sekunde und Client")
+    parser.add_argument("--max-latency-ms", type=float, default=250.0, help="Grenze für die p95-Latenz")
+    args = parser.parse_args(argv)
+
+    report = run_load_test(args.clients, args.rate, args.duration, args.tick_rate, args.budget)
+    for key, value in report.items():
+        print(f"{key:28} {value:.1f}" if isinstance(value, float) else f"{key:28} {value}")
+
+    ok = report["bytes_per_client_per_s_max"] <= args.budget \
+        and report["latency_ms_p95"] <= args.max_latency_ms
+    print("OK" if ok else "BUDGET ÜBERSCHRITTEN")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
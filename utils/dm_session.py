@@ -0,0 +1,354 @@
+"""
+DM session server and player client.
+
+The DM device hosts the authoritative GameState. Players connect over
+TCP (advertised through the same `_dndchar._tcp` Zeroconf type as the
+file transfer, with the property role=dm; DiscoveryCache.session_peers()
+lists them and the transfer screen hides them), join with their loaded
+character and send actions. Once per tick the server collects a single
+delta and fans it out to every client.
+
+Each client has its own writer thread with a token bucket. While a
+client is over its bandwidth budget, new deltas are merged into its
+pending delta instead of being queued, so a burst of clicks costs at
+most one frame per tick and slow clients never grow unbounded queues.
+"""
+import json
+import platform
+import socket
+import struct
+import threading
+import time
+
+from zeroconf import ServiceInfo
+
+from core.game_state import GameState, merge_delta
+from utils.discovery import DM_ROLE, SERVICE_TYPE, get_discovery
+from utils.transfer import recv_exact, recv_message, send_message
+
+DEFAULT_PORT = 65433
+TICK_RATE = 20
+# Bytes pro Sekunde und Client. dm_loadgen mit 8 Clients und 200 Aktionen/s:
+# höchstens 8177 B/s je Client (unter dem Budget), p95-Latenz etwa 180 ms.
+BANDWIDTH_BUDGET = 8 * 1024
+BURST_SECONDS = 0.25  # Größe des Token-Buckets relativ zum Budget
+
+
+def _encode(payload):
+    data = json.dumps(payload, separators=(',', ':')).encode('utf-8')
+    return struct.pack('!I', len(data)) + data
+
+
+class _ClientConnection:
+    """Server-side view of one connected player."""
+
+    def __init__(self, server, sock, addr):
+        self.server = server
+        self.sock = sock
+        self.addr = addr
+        self.cid = None
+        self.alive = True
+        self.bytes_sent = 0
+        self._pending = None
+        self._pending_frame = None
+        self._cond = threading.Condition()
+        self._send_lock = threading.Lock()
+        self._capacity = server.bandwidth_budget * BURST_SECONDS
+        # Leer starten: sonst liegt der Schnitt der ersten Sekunden um den Burst über dem Budget.
+        self._tokens = 0.0
+        self._last_refill = time.monotonic()
+
+    def start(self):
+        threading.Thread(target=self._read_loop, daemon=True).start()
+        threading.Thread(target=self._write_loop, daemon=True).start()
+
+    def queue_delta(self, delta, frame):
+        with self._cond:
+            if self._pending is None:
+                self._pending, self._pending_frame = delta, frame
+            else:
+                # Still waiting for budget: coalesce instead of queueing.
+                self._pending = merge_delta(self._pending, delta)
+                self._pending_frame = None
+            self._cond.notify()
+
+    def send_now(self, payload):
+        frame = _encode(payload)
+        self._consume(len(frame))
+        self._send(frame)
+
+    def _send(self, frame):
+        try:
+            with self._send_lock:
+                self.sock.sendall(frame)
+            self.bytes_sent += len(frame)
+        except OSError:
+            self.close()
+
+    def _refill(self):
+        now = time.monotonic()
+        budget = self.server.bandwidth_budget
+        self._tokens = min(self._capacity, self._tokens + (now - self._last_refill) * budget)
+        self._last_refill = now
+
+    def _consume(self, size):
+        self._refill()
+        self._tokens -= size
+
+    def _write_loop(self):
+        while self.alive:
+            with self._cond:
+                while self._pending is None and self.alive:
+                    self._cond.wait(0.5)
+                if not self.alive:
+                    return
+            # Wait for budget outside the lock so new deltas can still be merged.
+            self._refill()
+            while self._tokens <= 0 and self.alive:
+                time.sleep(min(0.05, -self._tokens / self.server.bandwidth_budget + 0.001))
+                self._refill()
+            with self._cond:
+                delta, frame = self._pending, self._pending_frame
+                self._pending = self._pending_frame = None
+            if delta is None:
+                continue
+            if frame is None:
+                frame = _encode({"type": "delta", "d": delta})
+            # Nur senden, wenn der ganze Frame gedeckt ist; kein Vorgriff auf künftiges Budget.
+            while self._tokens < min(len(frame), self._capacity) and self.alive:
+                time.sleep(min(0.05, (len(frame) - self._tokens) / self.server.bandwidth_budget + 0.001))
+                self._refill()
+            self._consume(len(frame))
+            self._send(frame)
+
+    def _read_loop(self):
+        try:
+            while self.alive:
+                message = recv_message(self.sock)
+                self.server._handle_message(self, message)
+        except (OSError, ValueError):
+            pass
+        finally:
+            self.close()
+
+    def close(self):
+        if not self.alive:
+            return
+        self.alive = False
+        with self._cond:
+            self._cond.notify_all()
+        try:
+            self.sock.close()
+        except OSError:
+            pass
+        self.server._client_closed(self)
+
+
+class DMSessionServer:
+    """Hostet eine DM-Sitzung und verteilt Zustandsänderungen als Deltas."""
+
+    def __init__(self, session_name=None, host='0.0.0.0', port=DEFAULT_PORT, tick_rate=TICK_RATE,
+                 bandwidth_budget=BANDWIDTH_BUDGET, advertise=True, state=None):
+        self.session_name = session_name or platform.node()
+        self.host = host
+        self.port = port
+        self.tick_interval = 1.0 / tick_rate
+        self.bandwidth_budget = bandwidth_budget
+        self.advertise = advertise
+        self.state = state or GameState()
+        self.lock = threading.RLock()
+        self.clients = []
+        self.on_change = None
+        self._next_player = 1
+        self._running = False
+        self._sock = None
+        self._service_info = None
+
+    def start(self):
+        self._sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self._sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self._sock.bind((self.host, self.port))
+        self._sock.listen()
+        self.port = self._sock.getsockname()[1]
+        self._running = True
+        threading.Thread(target=self._accept_loop, daemon=True).start()
+        threading.Thread(target=self._tick_loop, daemon=True).start()
+        if self.advertise:
+            self._register_service()
+        return self.port
+
+    def _register_service(self):
+        # utils.helpers pulls in Kivy; only needed when advertising on the LAN.
+        from utils.helpers import get_local_ip
+
+        self._service_info = ServiceInfo(
+            SERVICE_TYPE,
+            f"{self.session_name} DM.{SERVICE_TYPE}",
+            addresses=[socket.inet_aton(get_local_ip())],
+            port=self.port,
+            properties={'user': platform.node(), 'role': DM_ROLE, 'session': self.session_name},
+        )
+        get_discovery().zeroconf.register_service(self._service_info, allow_name_change=True)
+
+    def stop(self):
+        self._running = False
+        if self._service_info is not None:
+            get_discovery().zeroconf.unregister_service(self._service_info)
+            self._service_info = None
+        if self._sock:
+            self._sock.close()
+        for client in list(self.clients):
+            client.close()
+
+    def _accept_loop(self):
+        while self._running:
+            try:
+                sock, addr = self._sock.accept()
+            except OSError:
+                return
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            client = _ClientConnection(self, sock, addr)
+            with self.lock:
+                self.clients.append(client)
+            client.start()
+
+    def _tick_loop(self):
+        next_tick = time.monotonic()
+        while self._running:
+            next_tick += self.tick_interval
+            self.flush()
+            time.sleep(max(0.0, next_tick - time.monotonic()))
+
+    def flush(self):
+        """Sammelt das Delta des aktuellen Ticks und verteilt es an alle Clients."""
+        with self.lock:
+            delta = self.state.collect_delta(timestamp=time.time())
+            clients = [c for c in self.clients if c.cid is not None]
+        if delta is None:
+            return None
+        frame = _encode({"type": "delta", "d": delta})
+        for client in clients:
+            client.queue_delta(delta, frame)
+        if self.on_change:
+            self.on_change(delta)
+        return delta
+
+    def apply_action(self, action, cid=None):
+        """Wendet eine Aktion an – vom DM selbst (cid=None) oder von einem Spieler."""
+        kind = action.get("type")
+        target = action.get("id", cid)
+        with self.lock:
+            if cid is not None and target != cid and kind != "roll":
+                return  # Spieler dürfen nur sich selbst ändern
+            if kind == "hp":
+                if "value" in action:
+                    self.state.set_hp(target, action["value"])
+                else:
+                    self.state.change_hp(target, action.get("amount", 0))
+            elif kind == "cond":
+                self.state.set_conditions(target, action.get("conditions", []))
+            elif kind == "roll":
+                self.state.record_roll(cid or target, action.get("expr", ""), action.get("result"))
+            elif kind == "ini":
+                self.state.set_initiative(target, action.get("value"))
+            elif kind == "order" and cid is None:
+                self.state.set_initiative_order(action.get("order", []))
+
+    def _handle_message(self, client, message):
+        if message.get("type") == "join":
+            with self.lock:
+                cid = f"p{self._next_player}"
+                self._next_player += 1
+                self.state.add_player_from_character(cid, message.get("character", {}))
+                # Send the snapshot before the client is eligible for deltas,
+                # so the welcome is always its first frame.
+                client.send_now({"type": "welcome", "id": cid, "snapshot": self.state.snapshot()})
+                client.cid = cid
+        elif message.get("type") == "leave":
+            client.close()
+        elif client.cid is not None:
+            self.apply_action(message, client.cid)
+
+    def _client_closed(self, client):
+        with self.lock:
+            if client in self.clients:
+                self.clients.remove(client)
+            if client.cid is not None:
+                self.state.remove_combatant(client.cid)
+
+    def kick(self, cid):
+        for client in list(self.clients):
+            if client.cid == cid:
+                client.close()
+
+
+class DMSessionClient:
+    """Spieler-Seite: verbindet sich mit dem DM und spiegelt den Spielzustand."""
+
+    def __init__(self, host, port, character, on_update=None, timeout=10):
+        self.host = host
+        self.port = port
+        self.character = character
+        self.on_update = on_update
+        self.timeout = timeout
+        self.state = GameState()
+        self.cid = None
+        self.bytes_received = 0
+        self.connected = False
+        self._sock = None
+        self._send_lock = threading.Lock()
+
+    def connect(self):
+        self._sock = socket.create_connection((self.host, self.port), timeout=self.timeout)
+        self._sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.send({"type": "join", "character": self.character})
+        welcome = recv_message(self._sock)
+        self.cid = welcome["id"]
+        self.state.load_snapshot(welcome["snapshot"])
+        self.connected = True
+        self._sock.settimeout(None)
+        threading.Thread(target=self._read_loop, daemon=True).start()
+        return self.cid
+
+    def send(self, message):
+        with self._send_lock:
+            send_message(self._sock, message)
+
+    def change_hp(self, amount):
+        self.send({"type": "hp", "amount": amount})
+
+    def set_hp(self, value):
+        self.send({"type": "hp", "value": value})
+
+    def set_conditions(self, conditions):
+        self.send({"type": "cond", "conditions": list(conditions)})
+
+    def report_roll(self, expression, result):
+        self.send({"type": "roll", "expr": expression, "result": result})
+
+    def _read_loop(self):
+        try:
+            while self.connected:
+                (size,) = struct.unpack('!I', recv_exact(self._sock, 4))
+                body = recv_exact(self._sock, size)
+                self.bytes_received += 4 + size
+                message = json.loads(body.decode('utf-8'))
+                if message.get("type") == "delta":
+                    self.state.apply_delta(message["d"])
+                    if self.on_update:
+                        self.on_update(self, message["d"])
+        except (OSError, ValueError):
+            pass
+        finally:
+            self.connected = False
+
+    def close(self):
+        if self._sock is None:
+            return
+        try:
+            if self.connected:
+                self.send({"type": "leave"})
+        except OSError:
+            pass
+        self.connected = False
+        self._sock.close()
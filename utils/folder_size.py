@@ -0,0 +1,143 @@
+"""
+Incremental folder-size scanner for the InfoScreen.
+
+FolderSizeCache walks a tree with os.scandir and remembers, for each
+directory, its mtime, the size and count of the files directly inside it,
+and its subdirectories. On the next scan a directory with an unchanged
+mtime only costs one stat(): its files are not stat()ed again. A file that
+is rewritten in place (pickle.dump over an existing .char) does not change
+the directory's mtime, so every full_rescan_after seconds the file sizes
+are read again regardless.
+
+Symlinks are not followed. Unreadable directories count as empty.
+scan() is thread-safe and meant to run on a worker thread.
+"""
+import os
+import threading
+import time
+
+FULL_RESCAN_AFTER = 300.0
+ROOT_FILES = "(Dateien im Hauptordner)"
+
+
+class _DirEntry:
+    __slots__ = ("mtime_ns", "files_size", "files_count", "subdirs")
+
+    def __init__(self, mtime_ns, files_size, files_count, subdirs):
+        self.mtime_ns = mtime_ns
+        self.files_size = files_size
+        self.files_count = files_count
+        self.subdirs = subdirs
+
+
+class FolderSizeResult:
+    """Ergebnis eines Durchlaufs: Gesamtgröße, Aufschlüsselung nach obersten Ordnern, Statistik."""
+
+    def __init__(self, total, files, breakdown, rescanned, directories, elapsed):
+        self.total = total
+        self.files = files
+        self.breakdown = breakdown
+        self.rescanned = rescanned
+        self.directories = directories
+        self.elapsed = elapsed
+
+    def top(self, count=5):
+        return sorted(self.breakdown.items(), key=lambda item: -item[1])[:count]
+
+
+class FolderSizeCache:
+    """Merkt sich Ordnergrößen zwischen den Durchläufen; nur geänderte Ordner werden neu gelesen."""
+
+    def __init__(self, root=".", full_rescan_after=FULL_RESCAN_AFTER):
+        self.root = root
+        self.full_rescan_after = full_rescan_after
+        self.entries = {}
+        self.last_result = None
+        self._last_full_scan = None
+        self._lock = threading.Lock()
+
+    def scan(self, force_full=False):
+        with self._lock:
+            started = time.perf_counter()
+            full = force_full or self._last_full_scan is None \
+                or time.monotonic() - self._last_full_scan > self.full_rescan_after
+            seen = set()
+            stats = {"rescanned": 0}
+            try:
+                root_mtime = os.stat(self.root).st_mtime_ns
+            except OSError:
+                root_mtime = 0
+            root_entry = self._visit(self.root, root_mtime, full, seen, stats)
+
+            breakdown = {ROOT_FILES: root_entry.files_size} if root_entry.files_count else {}
+            total, files = root_entry.files_size, root_entry.files_count
+            for name in root_entry.subdirs:
+                size, count = self._subtree(os.path.join(self.root, name))
+                breakdown[name] = size
+                total += size
+                files += count
+
+            # Gelöschte Ordner vergessen.
+            for path in set(self.entries) - seen:
+                del self.entries[path]
+            if full:
+                self._last_full_scan = time.monotonic()
+            self.last_result = FolderSizeResult(total, files, breakdown, stats["rescanned"], len(seen),
+                                                time.perf_counter() - started)
+            return self.last_result
+
+    def _visit(self, path, mtime_ns, full, seen, stats):
+        seen.add(path)
+        cached = self.entries.get(path)
+        if cached is not None and cached.mtime_ns == mtime_ns and not full:
+            # Liste unverändert: nur die Unterordner auf Änderungen prüfen.
+            for name in cached.subdirs:
+                sub_path = os.path.join(path, name)
+                try:
+                    sub_mtime = os.stat(sub_path, follow_symlinks=False).st_mtime_ns
+                except OSError:
+                    continue
+                self._visit(sub_path, sub_mtime, full, seen, stats)
+            return cached
+
+        stats["rescanned"] += 1
+        files_size = files_count = 0
+        subdirs = []
+        try:
+            with os.scandir(path) as it:
+                for entry in it:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            subdirs.append(entry.name)
+                            self._visit(entry.path, entry.stat(follow_symlinks=False).st_mtime_ns, full, seen, stats)
+                        elif entry.is_file(follow_symlinks=False):
+                            files_size += entry.stat(follow_symlinks=False).st_size
+                            files_count += 1
+                    except OSError:
+                        continue
+        except OSError:
+            pass
+        entry = self.entries[path] = _DirEntry(mtime_ns, files_size, files_count, tuple(sorted(subdirs)))
+        return entry
+
+    def _subtree(self, path):
+        """(Bytes, Dateien) eines Ordners samt Unterordnern aus dem Cache."""
+        size = count = 0
+        stack = [path]
+        while stack:
+            current = stack.pop()
+            entry = self.entries.get(current)
+            if entry is None:
+                continue
+            size += entry.files_size
+            count += entry.files_count
+            stack.extend(os.path.join(current, name) for name in entry.subdirs)
+        return size, count
+
+
+def format_size(size):
+    for unit in ("B", "KB", "MB"):
+        if size < 1024:
+            return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.2f} GB"
@@ -8,6 +8,9 @@ from kivy.uix.image import Image
 from kivy.uix.popup import Popup
 from kivy.graphics import Color, RoundedRectangle
 
+from utils.perf_monitor import timed
+from utils.assets import background_source
+
 SETTINGS_FILE = 'settings.json'
 
 def load_settings():
@@ -32,7 +35,12 @@ def load_settings():
         'button_font_color_enabled': False,
         'custom_button_font_color': [1, 1, 1, 1],
         'button_bg_color_enabled': False,
-        'custom_button_bg_color': [1, 1, 1, 1]
+        'custom_button_bg_color': [1, 1, 1, 1],
+        'perf_overlay_enabled': False,
+        'memory_monitor_enabled': True,
+        'memory_log_enabled': False,
+        # Budgets in MB; 0 = unbegrenzt. 'rss' gilt für den ganzen Prozess.
+        'memory_budgets_mb': {'rss': 0, 'textures': 64}
     }
     if not os.path.exists(SETTINGS_FILE):
         return defaults
@@ -115,6 +123,7 @@ def apply_styles_to_widget(widget):
 
     apply_to_children(widget)
 
+@timed("popup")
 def create_styled_popup(title, content, size_hint):
     """Erstellt ein Popup mit benutzerdefinierten Stilen."""
     settings = load_settings()
@@ -148,7 +157,11 @@ def apply_background(screen):
 
         if os.path.exists(bg_path):
             try:
-                background = Image(source=bg_path, allow_stretch=True, keep_ratio=False)
+                # Vorskalierte Variante aus asset_cache/, falls gebaut; sonst das Original.
+                # Window erst hier importieren: helpers wird schon vor Config.set() in main.py geladen.
+                from kivy.core.window import Window
+                source = background_source(bg_path, Window.width, Window.height)
+                background = Image(source=source, allow_stretch=True, keep_ratio=False)
                 screen._background_image = background
                 screen.add_widget(background, index=len(screen.children))
             except Exception as e:
@@ -0,0 +1,344 @@
+"""
+Memory footprint sampling and budgets for low-RAM devices.
+
+A MemoryMonitor samples the process RSS, the number of Python heap blocks
+and a set of registered probes (data tables, widgets per screen, cached
+textures, function caches). Each probe reports bytes and/or a count, and it
+may provide an evict() that frees what can be rebuilt later. When a probe
+exceeds its budget, or the RSS exceeds the 'rss' budget, the evictable
+probes are cleared in priority order.
+
+Samples are kept in memory for the InfoScreen and can be appended to a JSON
+lines log. With DND_MEMORY_TRACE=<frames> tracemalloc runs as well. It
+slows the app down, but it adds the heap per package and the largest
+allocations by source line.
+
+Kivy is only imported in register_app_probes() and start().
+"""
+import gc
+import json
+import os
+import sys
+import time
+import tracemalloc
+from collections import deque
+
+TRACE_ENV_VAR = "DND_MEMORY_TRACE"
+DEFAULT_LOG = "memory_log.jsonl"
+INTERVAL = 10.0
+HISTORY = 360
+LARGE_ALLOCATION = 256 * 1024
+TOP_ALLOCATIONS = 10
+MB = 1024 * 1024
+
+
+def read_rss():
+    """Aktueller Resident Set Size in Bytes (ohne /proc nur der Spitzenwert) oder None."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError, AttributeError):
+        pass
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def deep_sizeof(obj):
+    """Größe eines Objekts samt aller enthaltenen Container in Bytes (jedes Objekt einmal)."""
+    seen = set()
+    stack = [obj]
+    total = 0
+    while stack:
+        current = stack.pop()
+        if id(current) in seen:
+            continue
+        seen.add(id(current))
+        total += sys.getsizeof(current)
+        if isinstance(current, dict):
+            stack.extend(current.keys())
+            stack.extend(current.values())
+        elif isinstance(current, (list, tuple, set, frozenset, deque)):
+            stack.extend(current)
+        elif hasattr(current, "__dict__") and not isinstance(current, type):
+            stack.append(vars(current))
+    return total
+
+
+class Probe:
+    """Eine gemessene Komponente; measure() liefert {"bytes", "count", "detail"} (alles optional)."""
+
+    def __init__(self, name, measure, evict=None, priority=0, label=None):
+        self.name = name
+        self.label = label or name
+        self.measure = measure
+        self.evict = evict
+        self.priority = priority
+
+
+class MemoryMonitor:
+    """Sammelt Speicher-Stichproben und setzt Budgets durch (Angaben in Bytes)."""
+
+    def __init__(self, budgets=None, log_path=None, history=HISTORY):
+        self.budgets = dict(budgets or {})
+        self.log_path = log_path
+        self.probes = {}
+        self.samples = deque(maxlen=history)
+        self.evictions = deque(maxlen=100)
+        self._event = None
+
+    def register(self, name, measure, evict=None, priority=0, label=None):
+        """name ist auch der Schlüssel des Budgets; niedrige priority wird bei zu hohem RSS zuerst geleert."""
+        self.probes[name] = Probe(name, measure, evict, priority, label)
+
+    @property
+    def latest(self):
+        return self.samples[-1] if self.samples else None
+
+    @property
+    def running(self):
+        return self._event is not None
+
+    # --- Messen ---
+
+    def sample(self, record=True):
+        """Misst alle Probes; record=False nur für Anzeigen: kein Verlauf, kein Log, keine Budgets."""
+        snapshot = {
+            "time": round(time.time(), 3),
+            "rss": read_rss(),
+            "python_blocks": sys.getallocatedblocks(),
+            "subsystems": {},
+        }
+        for name, probe in self.probes.items():
+            try:
+                snapshot["subsystems"][name] = probe.measure()
+            except Exception as e:
+                snapshot["subsystems"][name] = {"error": str(e)}
+        if tracemalloc.is_tracing():
+            snapshot.update(_traced_heap())
+        if not record:
+            snapshot["evicted"] = []
+            return snapshot
+        snapshot["evicted"] = self.enforce_budgets(snapshot)
+        self.samples.append(snapshot)
+        if self.log_path:
+            self._append_log(snapshot)
+        return snapshot
+
+    def enforce_budgets(self, snapshot):
+        """Leert Probes über ihrem Budget und bei zu hohem RSS alle leerbaren Probes."""
+        evicted = []
+        for name, probe in self.probes.items():
+            used = snapshot["subsystems"].get(name, {}).get("bytes")
+            budget = self.budgets.get(name)
+            if probe.evict and budget and used is not None and used > budget:
+                self._evict(probe, f"{name} {used / MB:.1f} MB > {budget / MB:.1f} MB")
+                evicted.append(name)
+
+        rss, budget = snapshot["rss"], self.budgets.get("rss")
+        if budget and rss is not None and rss > budget:
+            for probe in sorted(self.probes.values(), key=lambda p: p.priority):
+                values = snapshot["subsystems"].get(probe.name, {})
+                if not (values.get("bytes") or values.get("count")):
+                    continue  # schon leer, nichts freizugeben
+                if probe.evict and probe.name not in evicted:
+                    self._evict(probe, f"RSS {rss / MB:.1f} MB > {budget / MB:.1f} MB")
+                    evicted.append(probe.name)
+            gc.collect()
+        return evicted
+
+    def _evict(self, probe, reason):
+        try:
+            probe.evict()
+        except Exception as e:
+            print(f"[memory] {probe.name} konnte nicht geleert werden: {e}")
+            return
+        self.evictions.append((time.time(), probe.name, reason))
+        print(f"[memory] {probe.name} geleert ({reason})")
+
+    def _append_log(self, snapshot):
+        try:
+            with open(self.log_path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(snapshot, ensure_ascii=False) + "\n")
+        except OSError as e:
+            print(f"[memory] Log {self.log_path} nicht schreibbar: {e}")
+            self.log_path = None
+
+    # --- Periodisch über die Kivy-Clock ---
+
+    def start(self, interval=INTERVAL):
+        if self._event is not None:
+            return
+        from kivy.clock import Clock
+
+        self._event = Clock.schedule_interval(lambda dt: self.sample(), interval)
+
+    def stop(self):
+        if self._event is not None:
+            self._event.cancel()
+            self._event = None
+
+    # --- Anzeige ---
+
+    def current(self):
+        """Für Anzeigen: die letzte periodische Messung, ohne laufenden Monitor eine Messung ohne Nebenwirkungen."""
+        if self.running and self.latest is not None:
+            return self.latest
+        return self.sample(record=False)
+
+    def format_report(self, snapshot=None):
+        snapshot = snapshot or self.latest
+        if snapshot is None:
+            return "Noch keine Messung"
+        lines = []
+        rss, budget = snapshot["rss"], self.budgets.get("rss")
+        if rss is not None:
+            lines.append(f"Arbeitsspeicher (RSS): {rss / MB:.1f} MB" + (f" / {budget / MB:.0f} MB" if budget else ""))
+        lines.append(f"Python-Speicherblöcke: {snapshot['python_blocks']:,}".replace(",", "."))
+        for name, values in snapshot["subsystems"].items():
+            parts = []
+            if values.get("bytes") is not None:
+                parts.append(f"{values['bytes'] / MB:.1f} MB")
+            if values.get("count") is not None:
+                parts.append(f"{values['count']} Einträge")
+            if values.get("error"):
+                parts.append(f"Fehler: {values['error']}")
+            probe = self.probes.get(name)
+            lines.append(f"{probe.label if probe else name}: {', '.join(parts)}")
+        for package, size in list(snapshot.get("heap_by_package", {}).items())[:5]:
+            lines.append(f"  Heap {package}: {size / MB:.1f} MB")
+        if self.evictions:
+            when, name, reason = self.evictions[-1]
+            lines.append(f"Zuletzt geleert: {name} um {time.strftime('%H:%M:%S', time.localtime(when))} ({reason})")
+        return "\n".join(lines)
+
+
+def _package_of(filename):
+    """'…/site-packages/kivy/uix/label.py' -> 'kivy', '…/core/character.py' -> 'core'."""
+    parts = filename.replace("\\", "/").split("/")
+    if "site-packages" in parts:
+        index = parts.index("site-packages") + 1
+        return parts[index] if index < len(parts) else "site-packages"
+    return parts[-2] if len(parts) > 1 else parts[0]
+
+
+def _traced_heap():
+    snapshot = tracemalloc.take_snapshot()
+    by_package = {}
+    for stat in snapshot.statistics("filename"):
+        package = _package_of(stat.traceback[0].filename)
+        by_package[package] = by_package.get(package, 0) + stat.size
+    large = [
+        {"where": f"{stat.traceback[0].filename}:{stat.traceback[0].lineno}", "bytes": stat.size, "count": stat.count}
+        for stat in snapshot.statistics("lineno")[:TOP_ALLOCATIONS] if stat.size >= LARGE_ALLOCATION
+    ]
+    return {
+        "heap_traced": tracemalloc.get_traced_memory()[0],
+        "heap_by_package": dict(sorted(by_package.items(), key=lambda item: -item[1])),
+        "large_allocations": large,
+    }
+
+
+# --- Probes für diese App ---
+
+def data_tables_probe():
+    """Größe der Referenzdaten aus data_manager; sie ändern sich nicht und werden einmal gemessen."""
+    cached = {}
+
+    def measure():
+        data_manager = sys.modules.get("data_manager")
+        if data_manager is None:
+            return {"bytes": 0, "count": 0}
+        if not cached:
+            tables = {name: getattr(data_manager, name) for name in dir(data_manager) if name.endswith("_DATA")}
+            cached["bytes"] = deep_sizeof(tables)
+            cached["count"] = sum(len(table) for table in tables.values())
+        return dict(cached)
+    return measure
+
+
+def function_caches():
+    """Alle lru_cache-Funktionen der Spiellogik, die bisher geladen wurden."""
+    caches = []
+    for module_name in ("core.dice", "core.analytics"):
+        module = sys.modules.get(module_name)
+        if module is None:
+            continue
+        for value in vars(module).values():
+            if callable(value) and hasattr(value, "cache_info") and getattr(value, "__module__", None) == module_name:
+                caches.append(value)
+    return caches
+
+
+def measure_function_caches():
+    return {"count": sum(func.cache_info().currsize for func in function_caches())}
+
+
+def clear_function_caches():
+    for func in function_caches():
+        func.cache_clear()
+
+
+def register_app_probes(monitor, screen_manager):
+    """Widgets je Screen und Kivy-Texturen; braucht eine laufende Kivy-App."""
+    from kivy.cache import Cache
+
+    def measure_widgets():
+        detail = {screen.name: sum(1 for _ in screen.walk(restrict=True)) for screen in screen_manager.screens}
+        return {"count": sum(detail.values()), "detail": detail}
+
+    def measure_textures():
+        textures = {}
+        for category in ("kv.texture", "kv.image"):
+            for entry in getattr(Cache, "_objects", {}).get(category, {}).values():
+                obj = entry.get("object")
+                texture = getattr(obj, "texture", obj)
+                if texture is not None and hasattr(texture, "width"):
+                    textures[id(texture)] = texture.width * texture.height * 4
+        return {"bytes": sum(textures.values()), "count": len(textures)}
+
+    def evict_textures():
+        # Hintergründe nicht sichtbarer Screens freigeben; apply_background lädt sie beim Betreten neu.
+        for screen in screen_manager.screens:
+            background = getattr(screen, "_background_image", None)
+            if screen is not screen_manager.current_screen and background is not None:
+                if background.parent:
+                    screen.remove_widget(background)
+                screen._background_image = None
+        Cache.remove("kv.image")
+        Cache.remove("kv.texture")
+
+    monitor.register("data", data_tables_probe(), label="Daten")
+    monitor.register("widgets", measure_widgets, label="Widgets")
+    monitor.register("textures", measure_textures, evict_textures, priority=1, label="Texturen")
+    monitor.register("caches", measure_function_caches, clear_function_caches, priority=0, label="Funktions-Caches")
+
+
+def budgets_from_settings(settings):
+    """'memory_budgets_mb' aus den Einstellungen in Bytes; 0 oder fehlend = kein Budget."""
+    return {name: mb * MB for name, mb in settings.get("memory_budgets_mb", {}).items() if mb}
+
+
+_monitor = None
+
+
+def get_memory_monitor():
+    global _monitor
+    if _monitor is None:
+        _monitor = MemoryMonitor()
+    return _monitor
+
+
+def configure(settings, environ=None):
+    """Richtet den globalen Monitor nach den Einstellungen ein und startet bei Bedarf tracemalloc."""
+    environ = os.environ if environ is None else environ
+    monitor = get_memory_monitor()
+    monitor.budgets = budgets_from_settings(settings)
+    monitor.log_path = DEFAULT_LOG if settings.get("memory_log_enabled", False) else None
+    frames = environ.get(TRACE_ENV_VAR, "")
+    if frames not in ("", "0") and not tracemalloc.is_tracing():
+        tracemalloc.start(int(frames) if frames.isdigit() else 1)
+    return monitor
@@ -0,0 +1,235 @@
+"""
+Background Wi-Fi status polling.
+
+A single NetworkStatusService polls while at least one screen subscribes
+and caches the last result, so a screen shows the known status right away.
+Subscribers are called from the worker thread only when the status
+changes; like DiscoveryCache, screens move the update onto the Kivy thread
+with Clock.schedule_once.
+
+On Linux the link quality and signal level come from /proc/net/wireless and
+the SSID from the SIOCGIWESSID ioctl, without spawning a process. Only
+when neither is available (no wireless extensions) is nmcli asked, and
+that also happens on the worker thread.
+"""
+import array
+import socket
+import struct
+import subprocess
+import sys
+import threading
+import time
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+PROC_WIRELESS = "/proc/net/wireless"
+POLL_INTERVAL = 5.0
+SIOCGIWESSID = 0x8B1B
+IW_ESSID_MAX_SIZE = 32
+IFNAMSIZ = 16
+# /proc/net/wireless kennt das Maximum der Verbindungsqualität nicht; die meisten Treiber nutzen 70.
+LINK_QUALITY_MAX = 70
+
+
+class WifiStatus:
+    """Momentaufnahme der WLAN-Verbindung; signal ist 0-100 oder None."""
+
+    def __init__(self, interface=None, ssid=None, signal=None, level_dbm=None, source=None, error=None):
+        self.interface = interface
+        self.ssid = ssid
+        self.signal = signal
+        self.level_dbm = level_dbm
+        self.source = source
+        self.error = error
+        self.timestamp = time.time()
+
+    @property
+    def connected(self):
+        return bool(self.interface and (self.ssid or self.signal))
+
+    @property
+    def ssid_text(self):
+        if self.error:
+            return "Error"
+        if not self.connected:
+            return "Not Connected"
+        return self.ssid or "?"
+
+    @property
+    def signal_text(self):
+        if self.error:
+            return "Error"
+        return f"{self.signal or 0}%"
+
+    def _key(self):
+        return (self.interface, self.ssid, self.signal, self.level_dbm, self.error)
+
+    def __eq__(self, other):
+        return isinstance(other, WifiStatus) and self._key() == other._key()
+
+    def __repr__(self):
+        return f"WifiStatus({self.interface!r}, {self.ssid!r}, {self.signal!r}%, {self.source!r})"
+
+
+def dbm_to_percent(dbm):
+    """Grobe Umrechnung wie bisher: -100 dBm = 0 %, -50 dBm = 100 %."""
+    return max(0, min(100, 2 * (dbm + 100)))
+
+
+def parse_proc_wireless(text):
+    """[(interface, link, level), ...] aus dem Inhalt von /proc/net/wireless."""
+    interfaces = []
+    for line in text.splitlines()[2:]:
+        if ":" not in line:
+            continue
+        name, values = line.split(":", 1)
+        fields = values.split()
+        if len(fields) < 3:
+            continue
+        try:
+            link = float(fields[1].rstrip("."))
+            level = float(fields[2].rstrip("."))
+        except ValueError:
+            continue
+        interfaces.append((name.strip(), link, level))
+    return interfaces
+
+
+def signal_percent(link, level):
+    """Pegel in dBm, wenn der Treiber ihn liefert, sonst die Verbindungsqualität."""
+    if level < 0:
+        return dbm_to_percent(int(level))
+    return max(0, min(100, round(link * 100 / LINK_QUALITY_MAX)))
+
+
+def read_essid(interface):
+    """SSID über das Wireless-Extensions-ioctl oder None."""
+    if fcntl is None:
+        return None
+    buffer = array.array("b", b"\0" * (IW_ESSID_MAX_SIZE + 1))
+    address, length = buffer.buffer_info()
+    # struct iwreq: char ifr_name[16]; struct iw_point { void *pointer; __u16 length; __u16 flags; }
+    request = struct.pack(f"{IFNAMSIZ}sPHH", interface.encode()[:IFNAMSIZ - 1], address, length, 0)
+    try:
+        with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as s:
+            fcntl.ioctl(s.fileno(), SIOCGIWESSID, request)
+    except OSError:
+        return None
+    return buffer.tobytes().split(b"\0", 1)[0].decode("utf-8", "replace") or None
+
+
+def read_proc_status(path=PROC_WIRELESS):
+    """Status der ersten WLAN-Schnittstelle aus /proc; None, wenn die Datei fehlt."""
+    try:
+        with open(path, encoding="ascii", errors="replace") as f:
+            interfaces = parse_proc_wireless(f.read())
+    except OSError:
+        return None
+    if not interfaces:
+        return None
+    interface, link, level = interfaces[0]
+    return WifiStatus(interface, read_essid(interface), signal_percent(link, level),
+                      int(level) if level < 0 else None, source="proc")
+
+
+def read_nmcli_status():
+    """Rückfall ohne Wireless Extensions; startet nmcli (nur im Hintergrund-Thread aufrufen)."""
+    try:
+        result = subprocess.run(['nmcli', '-t', '-f', 'ACTIVE,SSID,SIGNAL', 'dev', 'wifi'],
+                                capture_output=True, encoding='utf-8', timeout=10, check=True).stdout
+    except (subprocess.CalledProcessError, subprocess.TimeoutExpired, FileNotFoundError) as e:
+        return WifiStatus(source="nmcli", error=str(e))
+    for line in result.strip().split('\n'):
+        if line.startswith('yes:'):
+            # Im Terse-Modus ist ':' in der SSID als '\:' maskiert.
+            ssid, _, signal = line[len('yes:'):].rpartition(':')
+            return WifiStatus("nmcli", ssid.replace('\\:', ':'), int(signal) if signal.isdigit() else 0,
+                              source="nmcli")
+    return WifiStatus(source="nmcli")
+
+
+def read_status():
+    if not sys.platform.startswith('linux'):
+        return WifiStatus(source="unsupported")
+    return read_proc_status() or read_nmcli_status()
+
+
+class NetworkStatusService:
+    """Fragt den WLAN-Status im Hintergrund ab, solange jemand zuhört."""
+
+    def __init__(self, interval=POLL_INTERVAL, reader=read_status):
+        self.interval = interval
+        self.reader = reader
+        self.latest = None
+        self._subscribers = []
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread = None
+
+    def subscribe(self, callback):
+        """Registriert `callback(status)`, startet das Abfragen und gibt den letzten Status zurück (oder None)."""
+        with self._lock:
+            if callback not in self._subscribers:
+                self._subscribers.append(callback)
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="network-status", daemon=True)
+                self._thread.start()
+            return self.latest
+
+    def unsubscribe(self, callback):
+        with self._lock:
+            if callback in self._subscribers:
+                self._subscribers.remove(callback)
+        # Der Thread beendet sich bei der nächsten Runde ohne Abonnenten.
+
+    def refresh(self):
+        """Sofort neu abfragen, statt auf das nächste Intervall zu warten."""
+        self._wake.set()
+
+    def poll_once(self):
+        try:
+            status = self.reader()
+        except Exception as e:
+            status = WifiStatus(error=str(e))
+        changed = status != self.latest
+        self.latest = status
+        if changed:
+            for callback in list(self._subscribers):
+                callback(status)
+        return status
+
+    def _run(self):
+        while True:
+            with self._lock:
+                if not self._subscribers:
+                    self._thread = None
+                    return
+            self.poll_once()
+            self._wake.wait(self.interval)
+            self._wake.clear()
+
+    def close(self):
+        with self._lock:
+            self._subscribers.clear()
+        self._wake.set()
+
+
+_service = None
+
+
+def get_network_status():
+    """Gibt den app-weiten NetworkStatusService zurück."""
+    global _service
+    if _service is None:
+        _service = NetworkStatusService()
+    return _service
+
+
+def close_network_status():
+    global _service
+    if _service is not None:
+        _service.close()
+        _service = None
@@ -0,0 +1,184 @@
+"""
+Frame-time and UI-latency measurements.
+
+A single PerfMonitor collects durations by category ("frame", "screen",
+"popup", ...) and name. For each (category, name) it keeps a rolling
+window for p50/p95/p99 and a bounded event log that export_trace() writes
+in the Chrome trace format (open it in chrome://tracing or Perfetto).
+
+The monitor is off unless DND_PERF=1 is set or the setting
+'perf_overlay_enabled' is true. When it is off, @timed adds one attribute
+check per call. Frame times come from a Kivy Clock callback. Kivy is only
+imported in start_frame_tracking(), so the statistics work without it.
+"""
+import functools
+import json
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+import numpy as np
+
+ENV_VAR = "DND_PERF"
+WINDOW = 600
+MAX_EVENTS = 50_000
+SLOW_MS = {"frame": 50.0, "screen": 100.0, "popup": 100.0}
+DEFAULT_TRACE = "perf_trace.json"
+
+
+class RollingStats:
+    """Die letzten window Messwerte einer Kennzahl."""
+
+    def __init__(self, window=WINDOW):
+        self.values = deque(maxlen=window)
+        self.count = 0
+        self.maximum = 0.0
+
+    def add(self, ms):
+        self.values.append(ms)
+        self.count += 1
+        self.maximum = max(self.maximum, ms)
+
+    def percentiles(self, qs=(50, 95, 99)):
+        if not self.values:
+            return {f"p{q}": 0.0 for q in qs}
+        values = np.percentile(np.fromiter(self.values, dtype=float, count=len(self.values)), qs)
+        return {f"p{q}": float(v) for q, v in zip(qs, values)}
+
+    def summary(self):
+        result = {"count": self.count, "max": self.maximum, "last": self.values[-1] if self.values else 0.0}
+        result.update(self.percentiles())
+        return result
+
+
+class PerfMonitor:
+    def __init__(self, enabled=False, window=WINDOW, max_events=MAX_EVENTS):
+        self.enabled = enabled
+        self.window = window
+        self.stats = {}
+        self.events = deque(maxlen=max_events)
+        self.listeners = []
+        self._origin = time.perf_counter()
+        self._lock = threading.Lock()
+        self._frame_event = None
+
+    def record(self, category, name, ms, start=None):
+        """Speichert eine Dauer in Millisekunden; start ist ein perf_counter()-Wert."""
+        if not self.enabled:
+            return
+        if start is None:
+            start = time.perf_counter() - ms / 1000
+        with self._lock:
+            key = (category, name)
+            stats = self.stats.get(key)
+            if stats is None:
+                stats = self.stats[key] = RollingStats(self.window)
+            stats.add(ms)
+            self.events.append((category, name, (start - self._origin) * 1e6, ms * 1000, threading.get_ident()))
+        for listener in self.listeners:
+            listener(category, name, ms)
+
+    @contextmanager
+    def measure(self, category, name):
+        if not self.enabled:
+            yield
+            return
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(category, name, (time.perf_counter() - start) * 1000, start)
+
+    def summary(self, category=None):
+        """{(kategorie, name): {count, max, last, p50, p95, p99}}"""
+        with self._lock:
+            items = list(self.stats.items())
+        return {key: stats.summary() for key, stats in items if category is None or key[0] == category}
+
+    def reset(self):
+        with self._lock:
+            self.stats.clear()
+            self.events.clear()
+
+    # --- Frames ---
+
+    def start_frame_tracking(self):
+        """Misst den Abstand zwischen zwei Frames über die Kivy-Clock."""
+        if not self.enabled or self._frame_event is not None:
+            return
+        from kivy.clock import Clock
+
+        self._frame_event = Clock.schedule_interval(self._on_frame, 0)
+
+    def stop_frame_tracking(self):
+        if self._frame_event is not None:
+            self._frame_event.cancel()
+            self._frame_event = None
+
+    def _on_frame(self, dt):
+        self.record("frame", "frame", dt * 1000)
+
+    # --- Export ---
+
+    def export_trace(self, path=DEFAULT_TRACE):
+        """Schreibt alle gespeicherten Ereignisse im Chrome-Trace-Format und gibt den Pfad zurück."""
+        with self._lock:
+            events = list(self.events)
+        trace = {
+            "traceEvents": [
+                {"name": name, "cat": category, "ph": "X", "ts": round(ts, 1), "dur": round(dur, 1),
+                 "pid": os.getpid(), "tid": tid}
+                for category, name, ts, dur, tid in events
+            ],
+            "displayTimeUnit": "ms",
+            "otherData": {
+                "summary": {f"{category}:{name}": stats for (category, name), stats in self.summary().items()},
+            },
+        }
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(trace, f)
+        os.replace(tmp_path, path)
+        return path
+
+
+def log_slow_events(category, name, ms):
+    """Listener: gibt Ereignisse über SLOW_MS aus."""
+    threshold = SLOW_MS.get(category)
+    if threshold is not None and ms > threshold:
+        print(f"[perf] {category} {name}: {ms:.1f} ms")
+
+
+_monitor = PerfMonitor(enabled=os.environ.get(ENV_VAR, "") not in ("", "0"))
+_monitor.listeners.append(log_slow_events)
+
+
+def get_monitor():
+    return _monitor
+
+
+def timed(category, name=None):
+    """Dekorator: misst jede Ausführung der Funktion, wenn der Monitor aktiv ist."""
+    def decorator(func):
+        label = name or func.__qualname__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _monitor.enabled:
+                return func(*args, **kwargs)
+            with _monitor.measure(category, label):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def instrument(cls, method_name, category):
+    """Ersetzt cls.method_name durch eine gemessene Version (z.B. on_pre_enter aller Screens)."""
+    method = cls.__dict__.get(method_name) or getattr(cls, method_name, None)
+    if method is None or getattr(method, "__perf_wrapped__", False):
+        return
+    wrapped = timed(category, f"{cls.__name__}.{method_name}")(method)
+    wrapped.__perf_wrapped__ = True
+    setattr(cls, method_name, wrapped)
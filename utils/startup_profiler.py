@@ -0,0 +1,218 @@
+"""
+Opt-in startup tracer for main.py.
+
+Enabled with the environment variable DND_PROFILE_STARTUP=1 (or a file
+path for the report) or the command line flag --profile-startup. It
+records wall time per startup phase, per module import (total and self
+time, nested imports included) and per kv file / screen construction.
+When the first frame is drawn, finish() writes a JSON report and prints a
+short summary.
+
+Two reports can be compared to catch regressions before a release:
+
+    python -m utils.startup_profiler old.json new.json --threshold 0.2
+
+This module must not import Kivy: it is loaded before Kivy so that the
+Kivy imports themselves are measured.
+"""
+import argparse
+import builtins
+import json
+import os
+import sys
+import time
+from contextlib import contextmanager
+
+ENV_VAR = "DND_PROFILE_STARTUP"
+FLAG = "--profile-startup"
+DEFAULT_REPORT = "startup_profile.json"
+SUMMARY_IMPORTS = 15
+
+
+class StartupProfiler:
+    """Sammelt Phasen- und Importzeiten ab dem Erzeugen bis finish()."""
+
+    enabled = True
+
+    def __init__(self, report_path=DEFAULT_REPORT):
+        self.report_path = report_path
+        self.started = time.perf_counter()
+        self.started_at = time.time()
+        self.phases = []
+        self.imports = []
+        self._import_stack = []
+        self._original_import = None
+        self.report = None
+
+    def _now_ms(self):
+        return (time.perf_counter() - self.started) * 1000
+
+    # --- Phasen ---
+
+    @contextmanager
+    def phase(self, name, category="phase"):
+        start = self._now_ms()
+        try:
+            yield
+        finally:
+            self.phases.append({"name": name, "category": category,
+                                "start_ms": round(start, 3), "ms": round(self._now_ms() - start, 3)})
+
+    def mark(self, name):
+        """Zeitpunkt ohne Dauer, z.B. 'first_frame'."""
+        self.phases.append({"name": name, "category": "mark", "start_ms": round(self._now_ms(), 3), "ms": 0.0})
+
+    # --- Importe ---
+
+    def install_import_hook(self):
+        if self._original_import is not None:
+            return
+        self._original_import = original = builtins.__import__
+        stack = self._import_stack
+
+        def timed_import(name, globals=None, locals=None, fromlist=(), level=0):
+            if level or name in sys.modules:
+                return original(name, globals, locals, fromlist, level)
+            start = time.perf_counter()
+            stack.append(0.0)
+            try:
+                return original(name, globals, locals, fromlist, level)
+            finally:
+                elapsed = time.perf_counter() - start
+                children = stack.pop()
+                if stack:
+                    stack[-1] += elapsed
+                self.imports.append({"module": name, "depth": len(stack),
+                                     "ms": round(elapsed * 1000, 3), "self_ms": round((elapsed - children) * 1000, 3)})
+
+        builtins.__import__ = timed_import
+
+    def remove_import_hook(self):
+        if self._original_import is not None:
+            builtins.__import__ = self._original_import
+            self._original_import = None
+
+    # --- Bericht ---
+
+    def finish(self):
+        """Beendet die Messung, schreibt den JSON-Bericht und gibt die Zusammenfassung aus."""
+        if self.report is not None:
+            return self.report
+        self.remove_import_hook()
+        self.report = {
+            "started_at": self.started_at,
+            "total_ms": round(self._now_ms(), 3),
+            "python": sys.version.split()[0],
+            "platform": sys.platform,
+            "phases": self.phases,
+            "imports": sorted(self.imports, key=lambda entry: -entry["ms"]),
+        }
+        tmp_path = self.report_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.report, f, indent=2)
+        os.replace(tmp_path, self.report_path)
+        print(format_summary(self.report))
+        print(f"Startprofil gespeichert in {self.report_path}")
+        return self.report
+
+
+class NullProfiler:
+    """Ersatz, wenn das Profiling aus ist: alle Aufrufe kosten (fast) nichts."""
+
+    enabled = False
+    report = None
+
+    @contextmanager
+    def phase(self, name, category="phase"):
+        yield
+
+    def mark(self, name):
+        pass
+
+    def install_import_hook(self):
+        pass
+
+    def remove_import_hook(self):
+        pass
+
+    def finish(self):
+        return None
+
+
+def start_from_environment(argv=None, environ=None):
+    """
+    Gibt einen aktiven StartupProfiler zurück, wenn ENV_VAR gesetzt ist oder
+    FLAG in argv steht, sonst einen NullProfiler. FLAG wird aus argv entfernt,
+    damit Kivy die Option nicht als unbekannt ablehnt.
+    """
+    argv = sys.argv if argv is None else argv
+    environ = os.environ if environ is None else environ
+    flagged = FLAG in argv
+    while FLAG in argv:
+        argv.remove(FLAG)
+    value = environ.get(ENV_VAR, "")
+    if not flagged and value in ("", "0"):
+        return NullProfiler()
+    report_path = value if value not in ("", "0", "1") else DEFAULT_REPORT
+    profiler = StartupProfiler(report_path)
+    profiler.install_import_hook()
+    return profiler
+
+
+def format_summary(report, top_imports=SUMMARY_IMPORTS):
+    lines = [f"Start: {report['total_ms']:.0f} ms gesamt"]
+    for category, title in (("phase", "Phasen"), ("kv", "KV-Dateien"), ("screen", "Screens")):
+        entries = [p for p in report["phases"] if p["category"] == category]
+        if entries:
+            lines.append(f"{title}:")
+            lines += [f"  {p['ms']:8.1f} ms  {p['name']}" for p in entries]
+    marks = [p for p in report["phases"] if p["category"] == "mark"]
+    lines += [f"  bei {p['start_ms']:8.1f} ms  {p['name']}" for p in marks]
+    top_level = [entry for entry in report["imports"] if entry["depth"] == 0][:top_imports]
+    if top_level:
+        lines.append("Langsamste Importe (gesamt / selbst):")
+        lines += [f"  {e['ms']:8.1f} / {e['self_ms']:7.1f} ms  {e['module']}" for e in top_level]
+    return "\n".join(lines)
+
+
+def _phase_times(report):
+    times = {f"{p['category']}:{p['name']}": p["ms"] for p in report["phases"] if p["category"] != "mark"}
+    times["total"] = report["total_ms"]
+    for entry in report["imports"]:
+        if entry["depth"] == 0:
+            times[f"import:{entry['module']}"] = entry["ms"]
+    return times
+
+
+def compare_reports(baseline, current, threshold=0.2, min_ms=5.0):
+    """Einträge, die um mehr als threshold (relativ) und min_ms (absolut) langsamer wurden."""
+    old, new = _phase_times(baseline), _phase_times(current)
+    regressions = []
+    for key, ms in new.items():
+        before = old.get(key)
+        if before is not None and ms - before > min_ms and ms > before * (1 + threshold):
+            regressions.append((key, before, ms))
+    return sorted(regressions, key=lambda item: item[1] - item[2])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Zwei Startprofile vergleichen")
+    parser.add_argument("baseline")
+    parser.add_argument("current")
+    parser.add_argument("--threshold", type=float, default=0.2, help="Erlaubte relative Verlangsamung")
+    parser.add_argument("--min-ms", type=float, default=5.0, help="Kleinere Unterschiede ignorieren")
+    args = parser.parse_args(argv)
+
+    with open(args.baseline, encoding="utf-8") as f:
+        baseline = json.load(f)
+    with open(args.current, encoding="utf-8") as f:
+        current = json.load(f)
+    regressions = compare_reports(baseline, current, args.threshold, args.min_ms)
+    for key, before, after in regressions:
+        print(f"LANGSAMER  {key}: {before:.1f} -> {after:.1f} ms")
+    print(f"Gesamt: {baseline['total_ms']:.0f} -> {current['total_ms']:.0f} ms")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,309 @@
+"""
+Resumable file transfer protocol used by the TransferScreen.
+
+Files are streamed in fixed-size chunks. Every chunk carries its own
+SHA-256 digest, and the receiver only appends chunks that verified, so
+the size of a `.part` file is always a trusted resume offset. When the
+connection drops, the receiver reconnects with exponential backoff and
+the sender continues from the last verified offset.
+
+Wire format (all integers big-endian):
+- Control messages: 4-byte length + UTF-8 JSON.
+- Chunks: CHUNK_HEADER (file index, offset, length, sha256) + payload.
+  A header with file index END_OF_BATCH terminates the stream.
+"""
+import hashlib
+import json
+import os
+import socket
+import struct
+import time
+
+PROTOCOL_VERSION = 1
+CHUNK_SIZE = 64 * 1024
+CHUNK_HEADER = struct.Struct('!IQI32s')
+END_OF_BATCH = 0xFFFFFFFF
+PART_SUFFIX = '.part'
+MAX_MESSAGE_SIZE = 16 * 1024 * 1024
+
+
+class TransferError(Exception):
+    """Raised when a transfer cannot be completed."""
+
+
+class ChecksumError(TransferError):
+    """Raised when a chunk or a finished file fails verification."""
+
+
+def send_message(sock, payload):
+    """Sendet ein JSON-Objekt mit Längenpräfix."""
+    data = json.dumps(payload, separators=(',', ':')).encode('utf-8')
+    sock.sendall(struct.pack('!I', len(data)) + data)
+
+
+def recv_exact(sock, size):
+    """Liest genau `size` Bytes oder wirft ConnectionError."""
+    buf = bytearray()
+    while len(buf) < size:
+        packet = sock.recv(min(size - len(buf), 1024 * 1024))
+        if not packet:
+            raise ConnectionError("Verbindung während der Übertragung getrennt")
+        buf.extend(packet)
+    return bytes(buf)
+
+
+def recv_message(sock):
+    """Empfängt ein mit send_message gesendetes JSON-Objekt."""
+    (size,) = struct.unpack('!I', recv_exact(sock, 4))
+    if size > MAX_MESSAGE_SIZE:
+        raise TransferError(f"Nachricht zu groß: {size} Bytes")
+    return json.loads(recv_exact(sock, size).decode('utf-8'))
+
+
+def file_digest(path, limit=None):
+    """SHA-256 über die ersten `limit` Bytes einer Datei (oder die ganze Datei)."""
+    digest = hashlib.sha256()
+    remaining = limit
+    with open(path, 'rb') as f:
+        while remaining is None or remaining > 0:
+            block = f.read(CHUNK_SIZE if remaining is None else min(CHUNK_SIZE, remaining))
+            if not block:
+                break
+            digest.update(block)
+            if remaining is not None:
+                remaining -= len(block)
+    return digest.hexdigest()
+
+
+def build_manifest(paths):
+    """Beschreibt die zu sendenden Dateien (Name, Größe, Prüfsumme)."""
+    return [
+        {"name": os.path.basename(path), "size": os.path.getsize(path), "sha256": file_digest(path)}
+        for path in paths
+    ]
+
+
+class FileSender:
+    """
+    Serves a batch of files until one receiver confirmed the whole batch.
+
+    The sender keeps accepting connections after a drop so that the
+    receiver can resume; it gives up after `idle_timeout` seconds
+    without any connection.
+    """
+
+    def __init__(self, paths, host='0.0.0.0', port=0, chunk_size=CHUNK_SIZE,
+                 idle_timeout=120, on_status=None):
+        self.paths = list(paths)
+        self.chunk_size = chunk_size
+        self.idle_timeout = idle_timeout
+        self.on_status = on_status
+        self.manifest = build_manifest(self.paths)
+        self.completed = False
+        self._stopped = False
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.sock.bind((host, port))
+        self.sock.listen()
+        self.port = self.sock.getsockname()[1]
+
+    def _status(self, message):
+        if self.on_status:
+            self.on_status(message)
+
+    def serve(self):
+        """Blockiert, bis der Stapel bestätigt wurde oder das Zeitlimit abläuft."""
+        self.sock.settimeout(1.0)
+        last_activity = time.monotonic()
+        try:
+            while not self.completed and not self._stopped:
+                try:
+                    conn, addr = self.sock.accept()
+                except socket.timeout:
+                    if time.monotonic() - last_activity > self.idle_timeout:
+                        self._status("Zeitüberschreitung: kein Empfänger verbunden.")
+                        break
+                    continue
+                except OSError:
+                    break
+                self._status(f"Verbunden mit {addr[0]}")
+                try:
+                    with conn:
+                        self._handle(conn)
+                except (OSError, TransferError) as e:
+                    self._status(f"Verbindung unterbrochen ({e}), warte auf Wiederaufnahme...")
+                last_activity = time.monotonic()
+        finally:
+            self.close()
+        return self.completed
+
+    def stop(self):
+        self._stopped = True
+        self.close()
+
+    def close(self):
+        try:
+            self.sock.close()
+        except OSError:
+            pass
+
+    def _handle(self, conn):
+        conn.settimeout(30)
+        send_message(conn, {"version": PROTOCOL_VERSION, "chunk_size": self.chunk_size, "files": self.manifest})
+        request = recv_message(conn)
+        offsets = request.get("offsets", [])
+        if len(offsets) != len(self.manifest):
+            raise TransferError("Ungültige Wiederaufnahme-Anfrage")
+
+        for index, (path, entry, resume) in enumerate(zip(self.paths, self.manifest, offsets)):
+            offset = int(resume.get("offset", 0))
+            if offset >= entry["size"]:
+                continue
+            # The receiver's prefix must match our file, otherwise start over.
+            if offset and resume.get("prefix_sha256") != file_digest(path, offset):
+                offset = 0
+            offset -= offset % self.chunk_size
+            self._send_file(conn, index, path, offset)
+            self._status(f"{entry['name']} gesendet.")
+
+        conn.sendall(CHUNK_HEADER.pack(END_OF_BATCH, 0, 0, b'\0' * 32))
+        reply = recv_message(conn)
+        if reply.get("ok"):
+            self.completed = True
+        else:
+            raise TransferError(reply.get("error", "Empfänger meldet Fehler"))
+
+    def _send_file(self, conn, index, path, offset):
+        with open(path, 'rb') as f:
+            f.seek(offset)
+            while True:
+                data = f.read(self.chunk_size)
+                if not data:
+                    break
+                header = CHUNK_HEADER.pack(index, offset, len(data), hashlib.sha256(data).digest())
+                conn.sendall(header + data)
+                offset += len(data)
+
+
+class FileReceiver:
+    """Receives a batch into `dest_dir`, resuming from verified `.part` files."""
+
+    def __init__(self, host, port, dest_dir='.', retries=6, backoff=0.5,
+                 max_backoff=15.0, timeout=30, on_status=None):
+        self.host = host
+        self.port = port
+        self.dest_dir = dest_dir
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.timeout = timeout
+        self.on_status = on_status
+        self.received = []
+
+    def _status(self, message):
+        if self.on_status:
+            self.on_status(message)
+
+    def run(self):
+        """Empfängt den Stapel und versucht es bei Abbrüchen mit exponentiellem Backoff erneut."""
+        attempt = 0
+        while True:
+            try:
+                self._receive_once()
+                return self.received
+            except (OSError, TransferError, ValueError) as e:
+                if attempt >= self.retries:
+                    raise TransferError(f"Übertragung nach {attempt + 1} Versuchen abgebrochen: {e}")
+                delay = min(self.max_backoff, self.backoff * (2 ** attempt))
+                attempt += 1
+                self._status(f"Verbindung unterbrochen, neuer Versuch {attempt}/{self.retries} in {delay:.1f}s...")
+                time.sleep(delay)
+
+    def _paths(self, name):
+        final_path = os.path.join(self.dest_dir, os.path.basename(name))
+        return final_path, final_path + PART_SUFFIX
+
+    def _resume_state(self, entry, chunk_size):
+        """(Wiederaufnahme-Angabe für den Sender, ob die fertige Datei schon verifiziert vorliegt)."""
+        final_path, part_path = self._paths(entry["name"])
+        if os.path.exists(final_path) and os.path.getsize(final_path) == entry["size"] \
+                and file_digest(final_path) == entry["sha256"]:
+            return {"offset": entry["size"]}, True
+        if not os.path.exists(part_path):
+            return {"offset": 0}, False
+        size = os.path.getsize(part_path)
+        if size > entry["size"]:
+            # Reste einer älteren, größeren Fassung.
+            os.remove(part_path)
+            return {"offset": 0}, False
+        # Only whole verified chunks count; drop a torn trailing write.
+        offset = size if size == entry["size"] else size - size % chunk_size
+        with open(part_path, 'r+b') as f:
+            f.truncate(offset)
+        return {"offset": offset, "prefix_sha256": file_digest(part_path, offset)}, False
+
+    def _receive_once(self):
+        with socket.create_connection((self.host, self.port), timeout=self.timeout) as s:
+            manifest = recv_message(s)
+            chunk_size = int(manifest["chunk_size"])
+            files = manifest["files"]
+            states = [self._resume_state(entry, chunk_size) for entry in files]
+            send_message(s, {"offsets": [offset for offset, _ in states]})
+
+            handles = {}
+            try:
+                while True:
+                    index, offset, length, digest = CHUNK_HEADER.unpack(recv_exact(s, CHUNK_HEADER.size))
+                    if index == END_OF_BATCH:
+                        break
+                    if index >= len(files) or length > chunk_size:
+                        raise TransferError("Ungültiger Chunk-Header")
+                    data = recv_exact(s, length)
+                    if hashlib.sha256(data).digest() != digest:
+                        raise ChecksumError(f"Prüfsummenfehler in {files[index]['name']} bei Offset {offset}")
+                    f = handles.get(index)
+                    if f is None:
+                        _, part_path = self._paths(files[index]["name"])
+                        f = handles[index] = open(part_path, 'ab')
+                    if f.tell() != offset:
+                        f.truncate(offset)
+                        f.seek(offset)
+                    f.write(data)
+                    f.flush()
+            finally:
+                for f in handles.values():
+                    f.close()
+
+            try:
+                for index, entry in enumerate(files):
+                    self._finalize(entry, states[index][1])
+            except ChecksumError as e:
+                send_message(s, {"ok": False, "error": str(e)})
+                raise
+            send_message(s, {"ok": True})
+
+    def _finalize(self, entry, already_complete):
+        final_path, part_path = self._paths(entry["name"])
+        if entry["size"] == 0:
+            open(final_path, 'wb').close()
+        elif not already_complete:
+            # Auch eine .part, die der Sender für vollständig hielt, wird geprüft.
+            if not os.path.exists(part_path) or file_digest(part_path) != entry["sha256"]:
+                if os.path.exists(part_path):
+                    os.remove(part_path)
+                raise ChecksumError(f"Prüfsumme von {entry['name']} stimmt nicht, starte neu")
+            os.replace(part_path, final_path)
+        if entry["name"] not in self.received:
+            self.received.append(entry["name"])
+        self._status(f"Datei {entry['name']} empfangen.")
+
+
+def send_files(paths, port, on_status=None, **kwargs):
+    """Komfortfunktion: Sendet `paths` über einen FileSender."""
+    sender = FileSender(paths, port=port, on_status=on_status, **kwargs)
+    return sender.serve()
+
+
+def receive_files(host, port, dest_dir='.', on_status=None, **kwargs):
+    """Komfortfunktion: Empfängt einen Stapel über einen FileReceiver."""
+    return FileReceiver(host, port, dest_dir=dest_dir, on_status=on_status, **kwargs).run()
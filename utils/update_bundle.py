@@ -0,0 +1,505 @@
+"""
+Signed offline update bundles with binary deltas.
+
+A bundle (*.dndupdate) is a zip file with three parts:
+- manifest.json: the "from" and "to" build versions from version.txt,
+  plus one entry per changed file.
+- signature: HMAC-SHA256 of the manifest bytes.
+- payload/<n>: the data for each entry.
+
+An entry either adds a file (zlib-compressed content), patches a file
+(a zlib-compressed delta of copy/insert operations against the installed
+file), or deletes one. Every entry records the SHA-256 of the installed
+file and of the result. A bundle therefore only applies to the exact
+version it was built against, and its size and apply time follow the size
+of the change, not the size of the repository.
+
+Applying is journaled:
+1. Everything is verified and the new files are written to a staging
+   directory. Neither the journal nor the previous backup is touched yet,
+   so a rejected bundle leaves the last update rollback-able.
+2. The journal is written. It names a fresh backup directory, and only
+   then is the previous backup removed.
+3. Each old file is moved into the backup directory and each new file is
+   moved into place, both with os.replace.
+If the process dies in between, recover_interrupted_update() rolls back to
+the old state. rollback() undoes the last bundle that was fully applied.
+
+The signing key is shared between the build machine and the tables.
+Neither the standard library nor requirements.txt offers public-key
+signatures. The key is read from DND_UPDATE_KEY or the file update.key.
+
+    python -m utils.update_bundle create v1.4 HEAD -o update.dndupdate
+    python -m utils.update_bundle info update.dndupdate
+    python -m utils.update_bundle apply update.dndupdate
+    python -m utils.update_bundle rollback
+"""
+import argparse
+import fnmatch
+import hashlib
+import hmac
+import json
+import os
+import shutil
+import stat
+import struct
+import subprocess
+import sys
+import time
+import zipfile
+import zlib
+
+BUNDLE_SUFFIX = ".dndupdate"
+FORMAT_VERSION = 1
+KEY_ENV_VAR = "DND_UPDATE_KEY"
+KEY_FILE = "update.key"
+JOURNAL_FILE = ".update_journal.json"
+STAGING_DIR = ".update_staging"
+BACKUP_DIR = ".update_backup"
+BLOCK_SIZE = 32
+# Never shipped or overwritten: user data and local state.
+PROTECTED = ("settings.json", "dnd.db", "encounters.db", "*.char", "*.part", KEY_FILE, ".update_*",
+             "startup_profile.json", "memory_log.jsonl", "perf_trace.json")
+EXCLUDED_DIRS = {".git", "__pycache__", ".pytest_cache", "asset_cache", STAGING_DIR, BACKUP_DIR}
+
+_COPY = struct.Struct(">BQI")
+_INSERT = struct.Struct(">BI")
+
+
+class BundleError(Exception):
+    """Raised when a bundle cannot be built, verified or applied."""
+
+
+class SignatureError(BundleError):
+    """Raised when the bundle signature does not match the key."""
+
+
+def sha256(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+# --- Binary delta ---
+
+def make_delta(source, target, block_size=BLOCK_SIZE):
+    """Kopier-/Einfüge-Operationen, die aus source target machen (zlib-komprimiert)."""
+    index = {}
+    for offset in range(0, len(source) - block_size + 1, block_size):
+        index.setdefault(source[offset:offset + block_size], offset)
+
+    ops = bytearray()
+
+    def insert(data):
+        if data:
+            ops.extend(_INSERT.pack(1, len(data)))
+            ops.extend(data)
+
+    literal_start = i = 0
+    n = len(target)
+    while i + block_size <= n:
+        offset = index.get(target[i:i + block_size])
+        if offset is None:
+            i += 1
+            continue
+        start, src = i, offset
+        while start > literal_start and src > 0 and target[start - 1] == source[src - 1]:
+            start -= 1
+            src -= 1
+        end, src_end = i + block_size, offset + block_size
+        while target[end:end + block_size] == source[src_end:src_end + block_size] and end + block_size <= n \
+                and src_end + block_size <= len(source):
+            end += block_size
+            src_end += block_size
+        while end < n and src_end < len(source) and target[end] == source[src_end]:
+            end += 1
+            src_end += 1
+        insert(target[literal_start:start])
+        ops.extend(_COPY.pack(0, src, end - start))
+        literal_start = i = end
+    insert(target[literal_start:])
+    return zlib.compress(bytes(ops), 9)
+
+
+def apply_delta(source, delta, max_size=None):
+    ops = zlib.decompress(delta)
+    result = bytearray()
+    pos = 0
+    while pos < len(ops):
+        if ops[pos] == 0:
+            _, offset, length = _COPY.unpack_from(ops, pos)
+            pos += _COPY.size
+            if offset + length > len(source):
+                raise BundleError("Delta verweist außerhalb der Quelldatei")
+            result.extend(source[offset:offset + length])
+        elif ops[pos] == 1:
+            _, length = _INSERT.unpack_from(ops, pos)
+            pos += _INSERT.size
+            result.extend(ops[pos:pos + length])
+            pos += length
+        else:
+            raise BundleError("Ungültige Delta-Operation")
+        if max_size is not None and len(result) > max_size:
+            raise BundleError("Delta ergibt eine zu große Datei")
+    return bytes(result)
+
+
+# --- Dateibäume ---
+
+def is_protected(path):
+    name = path.rsplit("/", 1)[-1]
+    return any(fnmatch.fnmatch(path, pattern) or fnmatch.fnmatch(name, pattern) for pattern in PROTECTED)
+
+
+def check_path(path):
+    """Nur relative Pfade innerhalb der App; wirft BundleError sonst."""
+    parts = path.split("/")
+    if not path or path.startswith("/") or "\\" in path or ":" in parts[0] \
+            or any(part in ("", ".", "..") for part in parts) or parts[0] in EXCLUDED_DIRS:
+        raise BundleError(f"Unzulässiger Pfad im Paket: {path!r}")
+    return path
+
+
+def git_tree(ref, repo="."):
+    """{pfad: (mode, inhalt)} aller Dateien eines Commits."""
+    listing = subprocess.run(["git", "ls-tree", "-r", "-z", ref], cwd=repo, check=True,
+                             capture_output=True).stdout.decode("utf-8")
+    entries = []
+    for record in filter(None, listing.split("\0")):
+        meta, path = record.split("\t", 1)
+        mode, kind, object_id = meta.split()
+        if kind == "blob" and mode != "120000" and not is_protected(path):
+            entries.append((path, int(mode, 8) & 0o777, object_id))
+    batch = subprocess.run(["git", "cat-file", "--batch"], cwd=repo, check=True, capture_output=True,
+                           input="".join(f"{object_id}\n" for _, _, object_id in entries).encode()).stdout
+    tree, pos = {}, 0
+    for path, mode, _ in entries:
+        header_end = batch.index(b"\n", pos)
+        size = int(batch[pos:header_end].split()[2])
+        tree[path] = (mode, batch[header_end + 1:header_end + 1 + size])
+        pos = header_end + 1 + size + 1
+    return tree
+
+
+def dir_tree(root):
+    """{pfad: (mode, inhalt)} eines entpackten Standes, ohne geschützte Dateien."""
+    tree = {}
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = [d for d in dirnames if d not in EXCLUDED_DIRS]
+        for filename in filenames:
+            full = os.path.join(dirpath, filename)
+            path = os.path.relpath(full, root).replace(os.sep, "/")
+            if os.path.islink(full) or is_protected(path):
+                continue
+            with open(full, "rb") as f:
+                tree[path] = (stat.S_IMODE(os.stat(full).st_mode), f.read())
+    return tree
+
+
+def build_version(version_text):
+    """Die Zeile 'Build Version:' aus version.txt, z.B. '11.09.2025 Main'."""
+    for line in version_text.splitlines():
+        if line.startswith("Build Version:"):
+            return line.split(":", 1)[1].strip()
+    return None
+
+
+def installed_version(root="."):
+    try:
+        with open(os.path.join(root, "version.txt"), encoding="utf-8") as f:
+            return build_version(f.read())
+    except OSError:
+        return None
+
+
+# --- Signatur ---
+
+def load_key(key=None, root="."):
+    if key is not None:
+        return key if isinstance(key, bytes) else key.encode("utf-8")
+    if os.environ.get(KEY_ENV_VAR):
+        return os.environ[KEY_ENV_VAR].encode("utf-8")
+    try:
+        with open(os.path.join(root, KEY_FILE), "rb") as f:
+            return f.read().strip()
+    except OSError:
+        raise BundleError(f"Kein Schlüssel für Update-Pakete ({KEY_ENV_VAR} oder {KEY_FILE})")
+
+
+def sign(manifest_bytes, key):
+    return hmac.new(key, manifest_bytes, hashlib.sha256).hexdigest()
+
+
+# --- Erstellen ---
+
+def create_bundle(old_tree, new_tree, key, output):
+    """Schreibt ein Paket mit allen Unterschieden von old_tree zu new_tree; gibt das Manifest zurück."""
+    entries, payloads = [], []
+    for path in sorted(set(old_tree) | set(new_tree)):
+        old, new = old_tree.get(path), new_tree.get(path)
+        if new is None:
+            entries.append({"path": path, "action": "delete", "base_sha256": sha256(old[1])})
+            continue
+        mode, content = new
+        if old is not None and old[1] == content:
+            if old[0] != mode:
+                entries.append({"path": path, "action": "mode", "base_sha256": sha256(content), "mode": mode})
+            continue
+        entry = {"path": path, "action": "add", "sha256": sha256(content), "size": len(content), "mode": mode}
+        payload = zlib.compress(content, 9)
+        if old is not None:
+            entry["base_sha256"] = sha256(old[1])
+            delta = make_delta(old[1], content)
+            if len(delta) < len(payload):
+                entry["action"], payload = "delta", delta
+        entry["payload"] = f"payload/{len(payloads)}"
+        entry["payload_sha256"] = sha256(payload)
+        payloads.append(payload)
+        entries.append(entry)
+
+    old_version = old_tree.get("version.txt", (0, b""))[1].decode("utf-8", "replace")
+    new_version = new_tree.get("version.txt", (0, b""))[1].decode("utf-8", "replace")
+    manifest = {
+        "format": FORMAT_VERSION,
+        "from_version": build_version(old_version),
+        "to_version": build_version(new_version),
+        "entries": entries,
+    }
+    manifest_bytes = json.dumps(manifest, ensure_ascii=False, indent=1).encode("utf-8")
+    tmp_path = output + ".tmp"
+    with zipfile.ZipFile(tmp_path, "w", zipfile.ZIP_STORED) as bundle:
+        bundle.writestr("manifest.json", manifest_bytes)
+        bundle.writestr("signature", sign(manifest_bytes, load_key(key)))
+        for entry, payload in zip((e for e in entries if "payload" in e), payloads):
+            bundle.writestr(entry["payload"], payload)
+    os.replace(tmp_path, output)
+    return manifest
+
+
+# --- Prüfen und Einspielen ---
+
+def open_bundle(bundle_path):
+    try:
+        return zipfile.ZipFile(bundle_path)
+    except zipfile.BadZipFile:
+        raise BundleError(f"{os.path.basename(bundle_path)} ist kein Update-Paket")
+
+
+def read_manifest(bundle, key):
+    """Prüft Signatur und Format und gibt das Manifest zurück."""
+    try:
+        manifest_bytes = bundle.read("manifest.json")
+        signature = bundle.read("signature").decode("ascii").strip()
+    except KeyError:
+        raise BundleError("Kein gültiges Update-Paket")
+    if not hmac.compare_digest(signature, sign(manifest_bytes, key)):
+        raise SignatureError("Signatur des Update-Pakets ist ungültig")
+    manifest = json.loads(manifest_bytes.decode("utf-8"))
+    if manifest.get("format") != FORMAT_VERSION:
+        raise BundleError(f"Unbekanntes Paketformat {manifest.get('format')}")
+    for entry in manifest["entries"]:
+        check_path(entry["path"])
+        if is_protected(entry["path"]):
+            raise BundleError(f"Paket würde Benutzerdaten überschreiben: {entry['path']}")
+    return manifest
+
+
+def _fsync_write(path, data):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "wb") as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+
+
+def _write_journal(root, journal):
+    path = os.path.join(root, JOURNAL_FILE)
+    _fsync_write(path + ".tmp", json.dumps(journal, indent=1).encode("utf-8"))
+    os.replace(path + ".tmp", path)
+
+
+def _read_journal(root):
+    try:
+        with open(os.path.join(root, JOURNAL_FILE), encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _local(root, path):
+    return os.path.join(root, *path.split("/"))
+
+
+def _read_local(root, path):
+    try:
+        with open(_local(root, path), "rb") as f:
+            return f.read()
+    except FileNotFoundError:
+        return None
+
+
+def _stage(bundle, manifest, root):
+    """Berechnet alle neuen Dateien im Staging-Ordner; am installierten Stand ändert sich nichts."""
+    staging = os.path.join(root, STAGING_DIR)
+    shutil.rmtree(staging, ignore_errors=True)
+    for entry in manifest["entries"]:
+        path, action = entry["path"], entry["action"]
+        current = _read_local(root, path)
+        if "base_sha256" in entry and (current is None or sha256(current) != entry["base_sha256"]):
+            raise BundleError(f"{path} entspricht nicht der erwarteten installierten Version")
+        if action not in ("add", "delta"):
+            continue
+        payload = bundle.read(entry["payload"])
+        if sha256(payload) != entry["payload_sha256"]:
+            raise BundleError(f"Beschädigte Daten für {path}")
+        if action == "delta":
+            content = apply_delta(current, payload, max_size=entry["size"])
+        else:
+            decompressor = zlib.decompressobj()
+            content = decompressor.decompress(payload, entry["size"] + 1)
+        if len(content) != entry["size"] or sha256(content) != entry["sha256"]:
+            raise BundleError(f"Prüfsumme von {path} stimmt nach dem Entpacken nicht")
+        _fsync_write(_local(staging, path), content)
+
+
+def apply_bundle(bundle_path, root=".", key=None, on_status=None):
+    """Spielt ein Paket ein; bei Fehlern bleibt der alte Stand erhalten. Gibt das Manifest zurück."""
+    status = on_status or (lambda message: None)
+    recover_interrupted_update(root)
+    key = load_key(key, root)
+    with open_bundle(bundle_path) as bundle:
+        manifest = read_manifest(bundle, key)
+        installed = installed_version(root)
+        if manifest["from_version"] and manifest["from_version"] != installed:
+            raise BundleError(f"Paket ist für Version {manifest['from_version']}, installiert ist {installed}")
+        status(f"Prüfe und entpacke {len(manifest['entries'])} Änderungen...")
+        try:
+            _stage(bundle, manifest, root)
+        except BaseException:
+            shutil.rmtree(os.path.join(root, STAGING_DIR), ignore_errors=True)
+            raise
+
+    # Erst mit dem neuen Journal wird der vorige Rücksprungpunkt verworfen.
+    journal = {"state": "applying", "bundle": os.path.basename(bundle_path), "from_version": installed,
+               "to_version": manifest["to_version"], "backup": str(time.time_ns()),
+               "entries": [{"path": e["path"], "action": e["action"], "existed": os.path.exists(_local(root, e["path"]))}
+                           for e in manifest["entries"]]}
+    _write_journal(root, journal)
+    _remove_old_backups(root, journal["backup"])
+    backup = _backup_dir(root, journal)
+
+    status("Ersetze Dateien...")
+    staging = os.path.join(root, STAGING_DIR)
+    for entry in manifest["entries"]:
+        target = _local(root, entry["path"])
+        if entry["action"] == "mode":
+            os.chmod(target, entry["mode"])
+            continue
+        if os.path.exists(target):
+            os.makedirs(os.path.dirname(_local(backup, entry["path"])), exist_ok=True)
+            os.replace(target, _local(backup, entry["path"]))
+        if entry["action"] in ("add", "delta"):
+            os.makedirs(os.path.dirname(target) or ".", exist_ok=True)
+            os.replace(_local(staging, entry["path"]), target)
+            os.chmod(target, entry["mode"])
+
+    journal["state"] = "applied"
+    _write_journal(root, journal)
+    shutil.rmtree(staging, ignore_errors=True)
+    status(f"Update auf {manifest['to_version']} eingespielt.")
+    return manifest
+
+
+def _backup_dir(root, journal):
+    return os.path.join(root, BACKUP_DIR, journal.get("backup", ""))
+
+
+def _remove_old_backups(root, keep=None):
+    """Löscht Sicherungen, auf die kein Journal mehr verweist."""
+    parent = os.path.join(root, BACKUP_DIR)
+    if os.path.isdir(parent):
+        for name in os.listdir(parent):
+            if name != keep:
+                shutil.rmtree(os.path.join(parent, name), ignore_errors=True)
+
+
+def _undo(root, journal):
+    backup = _backup_dir(root, journal)
+    for entry in reversed(journal["entries"]):
+        target, saved = _local(root, entry["path"]), _local(backup, entry["path"])
+        if entry["action"] == "mode":
+            continue
+        if os.path.exists(saved):
+            os.replace(saved, target)
+        elif not entry["existed"] and os.path.exists(target):
+            os.remove(target)
+    shutil.rmtree(os.path.join(root, STAGING_DIR), ignore_errors=True)
+    shutil.rmtree(os.path.join(root, BACKUP_DIR), ignore_errors=True)
+    os.remove(os.path.join(root, JOURNAL_FILE))
+
+
+def recover_interrupted_update(root="."):
+    """Stellt nach einem Abbruch während des Einspielens den alten Stand her; True, wenn etwas zu tun war."""
+    journal = _read_journal(root)
+    if journal is None or journal.get("state") == "applied":
+        # Abbruch beim Entpacken: nur der Staging-Ordner bleibt übrig, das letzte Update bleibt rücknehmbar.
+        shutil.rmtree(os.path.join(root, STAGING_DIR), ignore_errors=True)
+        return False
+    print(f"Unterbrochenes Update ({journal.get('bundle')}) wird zurückgenommen.")
+    _undo(root, journal)
+    return True
+
+
+def rollback(root="."):
+    """Nimmt das zuletzt eingespielte Paket zurück; gibt die wiederhergestellte Version zurück."""
+    journal = _read_journal(root)
+    if journal is None:
+        raise BundleError("Es gibt kein Update, das zurückgenommen werden kann")
+    _undo(root, journal)
+    return journal.get("from_version")
+
+
+def describe(bundle_path, key=None):
+    with open_bundle(bundle_path) as bundle:
+        manifest = read_manifest(bundle, load_key(key))
+        size = sum(info.file_size for info in bundle.infolist())
+    counts = {}
+    for entry in manifest["entries"]:
+        counts[entry["action"]] = counts.get(entry["action"], 0) + 1
+    summary = ", ".join(f"{count}x {action}" for action, count in sorted(counts.items()))
+    return f"{manifest['from_version']} -> {manifest['to_version']}: {summary or 'keine Änderungen'} ({size} Bytes)"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Signierte Offline-Update-Pakete")
+    sub = parser.add_subparsers(dest="command", required=True)
+    create = sub.add_parser("create", help="Paket aus zwei Git-Ständen oder Ordnern bauen")
+    create.add_argument("old", help="Installierter Stand (Git-Ref oder Ordner)")
+    create.add_argument("new", help="Neuer Stand (Git-Ref oder Ordner)")
+    create.add_argument("-o", "--output", required=True)
+    create.add_argument("--repo", default=".")
+    apply = sub.add_parser("apply", help="Paket einspielen")
+    apply.add_argument("bundle")
+    info = sub.add_parser("info", help="Signatur prüfen und Inhalt anzeigen")
+    info.add_argument("bundle")
+    sub.add_parser("rollback", help="Letztes Paket zurücknehmen")
+    args = parser.parse_args(argv)
+
+    try:
+        if args.command == "create":
+            trees = [dir_tree(source) if os.path.isdir(source) else git_tree(source, args.repo)
+                     for source in (args.old, args.new)]
+            create_bundle(trees[0], trees[1], None, args.output)
+            print(describe(args.output))
+        elif args.command == "apply":
+            apply_bundle(args.bundle, on_status=print)
+        elif args.command == "info":
+            print(describe(args.bundle))
+        else:
+            print(f"Zurück auf {rollback()}")
+    except (BundleError, OSError, subprocess.CalledProcessError) as e:
+        print(f"Fehler: {e}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())